@@ -47,6 +47,7 @@ class FundingRateFetcher:
                     'symbol': symbol,
                     'fundingRate': funding_rate,
                     'fundingDatetime': funding_datetime,
+                    'fundingTimestamp': funding_timestamp,
                 }
             except Exception:
                 return None
@@ -114,6 +115,7 @@ class FundingRateFetcher:
                     'symbol': row['symbol'],
                     'fundingRate': row['fundingRate'],
                     'fundingDatetime': row['fundingDatetime'],
+                    'fundingTimestamp': row['fundingTimestamp'],
                     'position': position,
                     'price': price,
                     'volume': volume,
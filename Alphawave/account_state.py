@@ -0,0 +1,81 @@
+import time
+import threading
+
+
+class AccountStateCache:
+    """
+    Balance and position snapshots for a sync ccxt client, refreshed by a background thread.
+    Readers get the last snapshot in O(1) together with its age; `refresh()` forces an update and
+    `on_fill()` schedules one without blocking the caller.
+    """
+
+    def __init__(self, exchange, symbols=None, interval=15.0, quote='USDT'):
+        self.exchange = exchange
+        self.symbols = symbols
+        self.interval = interval
+        self.quote = quote
+        self.balance = {}
+        self.positions = {}
+        self.balance_updated_at = None
+        self.positions_updated_at = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def quote_balance(self):
+        return self.balance.get(self.quote, {})
+
+    def position(self, symbol):
+        return self.positions.get(symbol)
+
+    def age(self):
+        updated = [t for t in (self.balance_updated_at, self.positions_updated_at) if t is not None]
+        return time.time() - min(updated) if len(updated) == 2 else None
+
+    def is_stale(self, max_age=None):
+        age = self.age()
+        return age is None or age > (max_age if max_age is not None else 2 * self.interval)
+
+    def refresh(self):
+        # 스냅샷 시각은 응답이 아니라 요청을 보낸 시각으로 기록 (체결 전에 보낸 조회가 최신으로 보이지 않도록)
+        with self._lock:
+            try:
+                requested_at = time.time()
+                balance = self.exchange.fetch_balance()
+                self.balance = balance
+                self.balance_updated_at = requested_at
+            except Exception as e:
+                print(f"[{self.exchange.id}] balance refresh failed: {e}")
+            try:
+                requested_at = time.time()
+                positions = self.exchange.fetch_positions(self.symbols)
+                self.positions = {
+                    position['symbol']: position for position in positions
+                    if position.get('contracts')
+                }
+                self.positions_updated_at = requested_at
+            except Exception as e:
+                print(f"[{self.exchange.id}] position refresh failed: {e}")
+
+    def on_fill(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
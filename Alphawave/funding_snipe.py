@@ -0,0 +1,206 @@
+import json
+import math
+import time
+import asyncio
+import pandas as pd
+import ccxt.async_support as ccxt
+
+from timed_execution import AsyncTimedExecutor, OrderOutcomeUnknown
+
+
+class SnipeJob:
+    """
+    One funding snipe: enter `side` on `symbol` at `funding_timestamp + entry_offset` (seconds, exchange clock)
+    and close the position `hold` seconds later.
+    """
+
+    def __init__(self, exchange, symbol, side, entry_offset, hold, funding_timestamp, funding_rate=None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.side = side
+        self.entry_offset = entry_offset
+        self.hold = hold
+        self.funding_timestamp = funding_timestamp
+        self.funding_rate = funding_rate
+
+    @property
+    def entry_time(self):
+        return self.funding_timestamp / 1000 + self.entry_offset
+
+    @property
+    def close_side(self):
+        return 'sell' if self.side == 'buy' else 'buy'
+
+    def __repr__(self):
+        return (f"SnipeJob({self.exchange}, {self.symbol}, {self.side}, "
+                f"entry {self.entry_offset:+.1f}s, hold {self.hold:.1f}s)")
+
+
+def jobs_from_funding_rates(df, entry_offset=-2.0, hold=4.0, exchanges=None, min_abs_rate=0.0):
+    """
+    Builds one job per row of FundingRateFetcher.additional_data: long when funding is negative
+    (shorts pay longs), short when positive.
+    """
+    jobs = []
+    for _, row in df.iterrows():
+        if exchanges is not None and row['exchange'] not in exchanges:
+            continue
+        funding_timestamp = row.get('fundingTimestamp')
+        if pd.isna(funding_timestamp) or not funding_timestamp or pd.isna(row['fundingRate']) \
+                or abs(row['fundingRate']) < min_abs_rate:
+            continue
+        side = 'buy' if row['fundingRate'] < 0 else 'sell'
+        jobs.append(SnipeJob(row['exchange'], row['symbol'], side, entry_offset, hold,
+                             int(funding_timestamp), row['fundingRate']))
+    return jobs
+
+
+class FundingSnipeScheduler:
+    """
+    Runs many SnipeJobs concurrently on one event loop with one async ccxt client per exchange.
+    Balances are fetched once per exchange and split evenly across that exchange's jobs.
+    """
+
+    def __init__(self, credentials, leverage=1, buffer=0.9, quote='USDT'):
+        self.credentials = credentials
+        self.leverage = leverage
+        self.buffer = buffer
+        self.quote = quote
+        self.clients = {}
+        self.executors = {}
+        self.balances = {}
+        self.results = []
+
+    async def client(self, exchange_id):
+        if exchange_id not in self.clients:
+            exchange = getattr(ccxt, exchange_id)({
+                **self.credentials.get(exchange_id, {}),
+                'enableRateLimit': True,
+                'options': {'defaultType': 'swap'},
+            })
+            await exchange.load_markets()
+            self.clients[exchange_id] = exchange
+            self.executors[exchange_id] = AsyncTimedExecutor(exchange)
+        return self.clients[exchange_id]
+
+    async def snapshot_balances(self, exchange_ids):
+        async def fetch(exchange_id):
+            exchange = await self.client(exchange_id)
+            balance = await exchange.fetch_balance()
+            self.balances[exchange_id] = balance['free'].get(self.quote, 0.0) or 0.0
+        await asyncio.gather(*(fetch(exchange_id) for exchange_id in exchange_ids))
+        return self.balances
+
+    async def prepare(self, exchange, job, allocation):
+        if exchange.has.get('setPositionMode'):
+            try:
+                await exchange.set_position_mode(False, job.symbol)
+            except ccxt.BaseError:
+                pass
+        try:
+            await exchange.set_leverage(self.leverage, job.symbol)
+        except ccxt.BaseError as e:
+            print(f"[{job.exchange}] set_leverage failed for {job.symbol}: {e}")
+        ticker = await exchange.fetch_ticker(job.symbol)
+        contract_size = exchange.market(job.symbol).get('contractSize') or 1.0
+        return math.floor(allocation * self.leverage / (ticker['last'] * contract_size))
+
+    async def place_order(self, executor, job, amount):
+        return await executor.execute_at(job.entry_time, job.symbol, job.side, amount,
+                                         params={'reduceOnly': False})
+
+    async def close_position(self, executor, job, amount):
+        return await executor.execute_at(job.entry_time + job.hold, job.symbol, job.close_side, amount,
+                                         params={'reduceOnly': True})
+
+    async def run_job(self, job, allocation):
+        result = {'job': repr(job), 'exchange': job.exchange, 'symbol': job.symbol, 'side': job.side,
+                  'fundingRate': job.funding_rate, 'entry': None, 'exit': None, 'error': None}
+        executor, to_close = None, 0
+        try:
+            exchange = await self.client(job.exchange)
+            executor = self.executors[job.exchange]
+            amount = await self.prepare(exchange, job, allocation)
+            if amount <= 0:
+                raise ValueError(f"Allocation {allocation:.2f} too small for {job.symbol}.")
+
+            entry_order, entry_timing = await self.place_order(executor, job, amount)
+            to_close = entry_order.get('filled') or amount
+            result['entry'] = {**entry_timing, 'filled': to_close,
+                               'average': entry_order.get('average')}
+        except Exception as e:
+            # 진입 주문이 나갔는데 결과를 모르면 reduceOnly 청산을 시도, 보내기 전 실패나 거절이면 청산하지 않음
+            if isinstance(e, OrderOutcomeUnknown):
+                to_close = amount
+            result['error'] = f"{type(e).__name__}: {e}"
+            print(f"[{job.exchange}] {job.symbol} snipe failed: {result['error']}")
+
+        if executor is not None and to_close > 0:
+            try:
+                exit_order, exit_timing = await self.close_position(executor, job, to_close)
+                result['exit'] = {**exit_timing, 'filled': exit_order.get('filled'),
+                                  'average': exit_order.get('average')}
+            except Exception as e:
+                error = f"exit {type(e).__name__}: {e}"
+                result['error'] = f"{result['error']}; {error}" if result['error'] else error
+                print(f"[{job.exchange}] {job.symbol} exit failed, close manually: {error}")
+        self.results.append(result)
+        return result
+
+    async def run(self, jobs):
+        now = time.time()
+        jobs = [job for job in jobs if job.entry_time > now + 5]
+        exchange_ids = sorted({job.exchange for job in jobs})
+        await self.snapshot_balances(exchange_ids)
+
+        jobs_per_exchange = {exchange_id: sum(1 for job in jobs if job.exchange == exchange_id)
+                             for exchange_id in exchange_ids}
+        tasks = []
+        for job in jobs:
+            allocation = self.balances.get(job.exchange, 0.0) * self.buffer / jobs_per_exchange[job.exchange]
+            tasks.append(self.run_job(job, allocation))
+        print(f"Scheduled {len(tasks)} snipe jobs on {len(exchange_ids)} exchanges.")
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.close()
+        return self.results
+
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
+        self.clients.clear()
+        self.executors.clear()
+
+
+def load_config(file_path):
+    try:
+        with open(file_path, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        print(f"Could not load configuration file {file_path}.")
+        return {}
+
+
+if __name__ == "__main__":
+    from FundingRateFetcher import FundingRateFetcher
+
+    """
+    Parameter description:
+    config_snipe.json: {"bitget": {"apiKey": ..., "secret": ..., "password": ...}, ...}
+    entry_offset: Seconds relative to the funding timestamp to enter (negative is before).
+    hold: Seconds to hold the position before closing.
+    """
+
+    credentials = load_config('./config_snipe.json')
+    mkts = ['bybit', 'gateio', 'mexc', 'okx', 'bitget']
+    fetcher = FundingRateFetcher(mkts, top_n=5, max_workers=10)
+    fetcher.run()
+
+    jobs = jobs_from_funding_rates(fetcher.additional_data, entry_offset=-2.0, hold=4.0,
+                                   exchanges=set(credentials), min_abs_rate=0.001)
+    for job in jobs:
+        print(job)
+
+    scheduler = FundingSnipeScheduler(credentials, leverage=1, buffer=0.9)
+    results = asyncio.run(scheduler.run(jobs))
+    print(json.dumps(results, indent=2, default=str))
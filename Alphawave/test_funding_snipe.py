@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from funding_snipe import SnipeJob, FundingSnipeScheduler
+from timed_execution import OrderOutcomeUnknown
+
+
+def run_job(entry_error=None):
+    scheduler = FundingSnipeScheduler({})
+    job = SnipeJob('bitget', 'BTC/USDT:USDT', 'buy', -2.0, 4.0, 1700000000000, -0.001)
+    scheduler.executors['bitget'] = object()
+    closed = []
+
+    async def client(exchange_id):
+        return None
+
+    async def prepare(exchange, job, allocation):
+        return 3
+
+    async def place_order(executor, job, amount):
+        if entry_error:
+            raise entry_error
+        return {'filled': 2, 'average': 100.0}, {}
+
+    async def close_position(executor, job, amount):
+        closed.append(amount)
+        return {'filled': amount, 'average': 101.0}, {}
+
+    scheduler.client, scheduler.prepare = client, prepare
+    scheduler.place_order, scheduler.close_position = place_order, close_position
+    result = asyncio.run(scheduler.run_job(job, 1000.0))
+    return result, closed
+
+
+def test_filled_entry_is_closed():
+    result, closed = run_job()
+    assert closed == [2]
+    assert result['error'] is None
+
+
+@pytest.mark.parametrize('error', [ValueError("below minimum"), OSError("presign")])
+def test_failure_before_send_skips_exit(error):
+    result, closed = run_job(error)
+    assert closed == []
+    assert result['error']
+
+
+def test_unknown_outcome_is_closed():
+    result, closed = run_job(OrderOutcomeUnknown("timed out"))
+    assert closed == [3]
@@ -0,0 +1,98 @@
+import ccxt
+import pytest
+
+from timed_execution import TimedExecutor, OrderOutcomeUnknown, implicit_endpoint
+
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def stub_bitget(uta=False):
+    exchange = ccxt.bitget({'apiKey': 'key', 'secret': 'secret', 'password': 'pass', 'options': {'uta': uta}})
+    exchange.set_markets([{
+        'id': 'BTCUSDT', 'symbol': SYMBOL, 'base': 'BTC', 'quote': 'USDT', 'settle': 'USDT',
+        'baseId': 'BTC', 'quoteId': 'USDT', 'settleId': 'USDT',
+        'type': 'swap', 'spot': False, 'margin': False, 'swap': True, 'future': False, 'option': False,
+        'contract': True, 'linear': True, 'inverse': False, 'contractSize': 1.0, 'active': True,
+        'precision': {'amount': 0.001, 'price': 0.1}, 'limits': {'amount': {'min': 0.001}}, 'info': {},
+    }])
+    exchange.nonce = lambda: 1700000000000
+    exchange.sent = []
+
+    def fetch(url, method='GET', headers=None, body=None):
+        exchange.sent.append({'url': url, 'method': method, 'headers': headers, 'body': body})
+        return {'code': '00000', 'data': {'orderId': '1', 'clientOid': 'c'}, 'requestTime': 1700000000001}
+
+    exchange.fetch = fetch
+    return exchange
+
+
+def test_implicit_endpoint():
+    exchange = stub_bitget()
+    assert implicit_endpoint(exchange, 'private_mix_post_v2_mix_order_place_order') == \
+        ('v2/mix/order/place-order', ['private', 'mix'], 'POST')
+    assert implicit_endpoint(exchange, 'no_such_method') is None
+
+
+def test_presigned_request_matches_create_order():
+    exchange = stub_bitget()
+    prepared = TimedExecutor(exchange).presign_order(SYMBOL, 'buy', 0.01, {'reduceOnly': False})
+    exchange.create_order(SYMBOL, 'market', 'buy', 0.01, None, {'reduceOnly': False})
+
+    signed, sent = prepared['signed'], exchange.sent[-1]
+    assert signed is not None
+    assert (signed['url'], signed['method'], signed['body']) == (sent['url'], sent['method'], sent['body'])
+    assert signed['headers']['ACCESS-SIGN'] == sent['headers']['ACCESS-SIGN']
+
+
+def test_unified_account_is_not_presigned():
+    prepared = TimedExecutor(stub_bitget(uta=True)).presign_order(SYMBOL, 'buy', 0.01)
+    assert prepared['signed'] is None
+
+
+def test_presign_failure_falls_back_to_create_order(monkeypatch):
+    exchange = stub_bitget()
+
+    def broken_sign(*args, **kwargs):
+        raise TypeError("sign() changed")
+
+    monkeypatch.setattr(exchange, 'sign', broken_sign)
+    prepared = TimedExecutor(exchange).presign_order(SYMBOL, 'buy', 0.01)
+    assert prepared['signed'] is None
+
+
+def test_validate_order_rejects_small_amount():
+    exchange = stub_bitget()
+    exchange.markets[SYMBOL]['limits']['amount']['min'] = 0.05
+    with pytest.raises(ValueError):
+        TimedExecutor(exchange).presign_order(SYMBOL, 'buy', 0.01)
+
+
+def test_send_errors_without_response_are_outcome_unknown():
+    exchange = stub_bitget()
+    executor = TimedExecutor(exchange)
+    prepared = executor.presign_order(SYMBOL, 'buy', 0.01)
+
+    def timeout(*args, **kwargs):
+        raise ccxt.RequestTimeout("timed out")
+
+    exchange.fetch = timeout
+    with pytest.raises(OrderOutcomeUnknown):
+        executor.send(prepared)
+
+    def rejected(*args, **kwargs):
+        raise ccxt.InsufficientFunds("no margin")
+
+    exchange.fetch = rejected
+    with pytest.raises(ccxt.InsufficientFunds):
+        executor.send(prepared)
+
+
+def test_clock_estimate_is_reused(monkeypatch):
+    executor = TimedExecutor(stub_bitget(), samples=1)
+    calls = []
+    monkeypatch.setattr(executor.exchange, 'fetch_time', lambda: calls.append(1) or 1700000000000)
+    first = executor.clock_estimate()
+    assert executor.clock_estimate() is first
+    assert executor.clock_estimate(max_age=-1) is not first
+    assert len(calls) == 2
@@ -0,0 +1,305 @@
+import time
+import asyncio
+import threading
+import ccxt
+from datetime import datetime
+
+
+# 거래소별 주문 엔드포인트 (미리 서명해 둘 수 있는 경우): (ccxt implicit API 메서드 이름, 필요한 exchange.options)
+# bitget 통합계정(uta)은 create_order가 v3 엔드포인트를 쓰므로 클래식 계정으로 확인된 경우만 사전 서명
+PRESIGN_ENDPOINTS = {
+    'bitget': {'swap': ('private_mix_post_v2_mix_order_place_order', {'uta': False})},
+}
+
+
+def implicit_endpoint(exchange, name):
+    """
+    Returns (path, api, method) of a ccxt implicit API method, or None when the installed ccxt does not have it.
+    """
+    for cls in type(exchange).__mro__:
+        entry = cls.__dict__.get(name)
+        if entry is not None and all(hasattr(entry, attr) for attr in ('path', 'api', 'method')):
+            return entry.path, entry.api, entry.method
+    return None
+
+
+class OrderOutcomeUnknown(ccxt.NetworkError):
+    """
+    The order request was sent but no usable response came back, so it may or may not have been filled.
+    """
+
+
+class TimedExecutor:
+    """
+    Sends one market order as close as possible to a target time on the exchange clock.
+    The clock offset is estimated from the lowest-RTT `fetch_time` round trip, the order is validated and,
+    where the endpoint is known, signed in advance. The wait is a coarse sleep with keep-alive pings
+    followed by a busy spin over the last `spin_window` seconds, aimed so the request arrives at the target.
+    One executor can serve concurrent calls: each call holds its own (offset, rtt, measured_at) estimate,
+    and estimates younger than `estimate_max_age` seconds are reused instead of syncing again.
+    """
+
+    def __init__(self, exchange, samples=9, spin_window=0.05, keepalive_interval=10.0, presign_lead=1.0,
+                 estimate_max_age=60.0, resync_max_age=5.0):
+        self.exchange = exchange
+        self.samples = samples
+        self.spin_window = spin_window
+        self.keepalive_interval = keepalive_interval
+        self.presign_lead = presign_lead
+        self.estimate_max_age = estimate_max_age
+        self.resync_max_age = resync_max_age
+        self.estimate = None
+        self._estimate_lock = threading.Lock()
+        self.records = []
+
+    def measure_clock(self):
+        best = None
+        for _ in range(self.samples):
+            t0 = time.time()
+            server_ms = self.exchange.fetch_time()
+            t1 = time.time()
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms / 1000 - (t0 + t1) / 2)
+        rtt, offset = best
+        print(f"[{self.exchange.id}] clock offset {offset * 1000:+.1f}ms, rtt {rtt * 1000:.1f}ms")
+        return offset, rtt, time.time()
+
+    def clock_estimate(self, max_age=None):
+        """
+        Returns (offset, rtt, measured_at), syncing only when the shared estimate is older than `max_age`.
+        """
+        max_age = self.estimate_max_age if max_age is None else max_age
+        with self._estimate_lock:
+            if self.estimate is None or time.time() - self.estimate[2] > max_age:
+                self.estimate = self.measure_clock()
+            return self.estimate
+
+    @staticmethod
+    def exchange_time(estimate):
+        return time.time() + estimate[0]
+
+    def validate_order(self, symbol, side, amount):
+        market = self.exchange.market(symbol)
+        amount = float(self.exchange.amount_to_precision(symbol, amount))
+        min_amount = (market.get('limits', {}).get('amount') or {}).get('min')
+        if amount <= 0 or (min_amount and amount < min_amount):
+            raise ValueError(f"Order amount {amount} below minimum {min_amount} for {symbol}.")
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Unknown order side: {side}")
+        return market, amount
+
+    def presign_order(self, symbol, side, amount, params=None):
+        market, amount = self.validate_order(symbol, side, amount)
+        name, options = PRESIGN_ENDPOINTS.get(self.exchange.id, {}).get(market['type'], (None, {}))
+        endpoint = None
+        if name and all(self.exchange.options.get(key) == value for key, value in options.items()):
+            endpoint = implicit_endpoint(self.exchange, name)
+        prepared = {'symbol': symbol, 'side': side, 'amount': amount, 'params': params or {},
+                    'market': market, 'signed': None}
+        if endpoint and hasattr(self.exchange, 'create_order_request'):
+            path, api, method = endpoint
+            try:
+                request = self.exchange.create_order_request(
+                    symbol, 'market', side, amount, None, params or {})
+                prepared['signed'] = self.exchange.sign(path, api, method, request)
+            except Exception as e:
+                # 서명 형식이 바뀐 ccxt 버전이면 일반 create_order로 보냄
+                print(f"[{self.exchange.id}] presign failed, sending through create_order: {e}")
+        return prepared
+
+    def send(self, prepared):
+        """
+        Sends the prepared order. Errors other than an exchange rejection are raised as OrderOutcomeUnknown,
+        since the order may have reached the exchange.
+        """
+        try:
+            return self._send(prepared)
+        except ccxt.ExchangeError:
+            raise
+        except Exception as e:
+            raise OrderOutcomeUnknown(f"{type(e).__name__}: {e}") from e
+
+    def _send(self, prepared):
+        signed = prepared['signed']
+        if signed:
+            response = self.exchange.fetch(
+                signed['url'], signed['method'], signed['headers'], signed['body'])
+            order = self.exchange.parse_order(
+                response.get('data', {}), prepared['market'])
+            order['ackTimestamp'] = self.exchange.safe_integer(
+                response, 'requestTime')
+            return order
+        order = self.exchange.create_order(
+            symbol=prepared['symbol'], type='market', side=prepared['side'],
+            amount=prepared['amount'], params=prepared['params'])
+        order['ackTimestamp'] = order.get('timestamp')
+        return order
+
+    def _keep_warm(self, stop):
+        while not stop.wait(self.keepalive_interval):
+            try:
+                self.exchange.fetch_time()
+            except Exception:
+                pass
+
+    def wait_until(self, target_ts, estimate):
+        """
+        Blocks until the request sent now would reach the exchange at `target_ts` (exchange epoch seconds).
+        """
+        offset, rtt, _ = estimate
+        send_at = target_ts - offset - rtt / 2
+        while True:
+            remaining = send_at - time.time()
+            if remaining <= self.spin_window:
+                break
+            time.sleep(min(remaining - self.spin_window, 1.0))
+        while time.time() < send_at:
+            pass
+
+    def execute_at(self, target_time, symbol, side, amount, params=None):
+        target_ts = target_time.timestamp() if isinstance(
+            target_time, datetime) else float(target_time)
+
+        stop = threading.Event()
+        keeper = threading.Thread(target=self._keep_warm, args=(stop,), daemon=True)
+        keeper.start()
+        try:
+            estimate = self.clock_estimate()
+            if target_ts - self.exchange_time(estimate) > 30:
+                self.wait_until(target_ts - 10, estimate)
+                estimate = self.clock_estimate(self.resync_max_age)
+            self.wait_until(target_ts - self.presign_lead, estimate)
+        finally:
+            stop.set()
+            keeper.join()
+        prepared = self.presign_order(symbol, side, amount, params)
+
+        self.wait_until(target_ts, estimate)
+        sent_local = time.time()
+        order = self.send(prepared)
+        acked_local = time.time()
+
+        return order, self._record(prepared, order, target_ts, estimate, sent_local, acked_local)
+
+    def _record(self, prepared, order, target_ts, estimate, sent_local, acked_local):
+        offset, rtt, _ = estimate
+        sent_exchange = sent_local + offset + rtt / 2
+        ack_ts = order.get('ackTimestamp')
+        record = {
+            'exchange': self.exchange.id,
+            'symbol': prepared['symbol'],
+            'side': prepared['side'],
+            'amount': prepared['amount'],
+            'presigned': prepared['signed'] is not None,
+            'target': target_ts,
+            'sendErrorMs': (sent_exchange - target_ts) * 1000,
+            'ackTimestamp': ack_ts,
+            'ackErrorMs': (ack_ts / 1000 - target_ts) * 1000 if ack_ts else None,
+            'roundTripMs': (acked_local - sent_local) * 1000,
+            'orderId': order.get('id'),
+        }
+        self.records.append(record)
+        ack_error = f"{record['ackErrorMs']:+.1f}ms" if record['ackErrorMs'] is not None else 'n/a'
+        print(f"[{self.exchange.id}] {record['side']} {record['symbol']} sent {record['sendErrorMs']:+.2f}ms from target, "
+              f"exchange ack {ack_error}, round trip {record['roundTripMs']:.1f}ms")
+        return record
+
+
+class AsyncTimedExecutor(TimedExecutor):
+    """
+    TimedExecutor for ccxt.async_support clients, so many timed orders can share one event loop.
+    The final spin yields to the loop between clock checks instead of blocking it.
+    """
+
+    def __init__(self, exchange, **kwargs):
+        super().__init__(exchange, **kwargs)
+        self._estimate_lock = asyncio.Lock()
+
+    async def measure_clock(self):
+        best = None
+        for _ in range(self.samples):
+            t0 = time.time()
+            server_ms = await self.exchange.fetch_time()
+            t1 = time.time()
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms / 1000 - (t0 + t1) / 2)
+        rtt, offset = best
+        print(f"[{self.exchange.id}] clock offset {offset * 1000:+.1f}ms, rtt {rtt * 1000:.1f}ms")
+        return offset, rtt, time.time()
+
+    async def clock_estimate(self, max_age=None):
+        max_age = self.estimate_max_age if max_age is None else max_age
+        async with self._estimate_lock:
+            if self.estimate is None or time.time() - self.estimate[2] > max_age:
+                self.estimate = await self.measure_clock()
+            return self.estimate
+
+    async def send(self, prepared):
+        try:
+            return await self._send(prepared)
+        except ccxt.ExchangeError:
+            raise
+        except Exception as e:
+            raise OrderOutcomeUnknown(f"{type(e).__name__}: {e}") from e
+
+    async def _send(self, prepared):
+        signed = prepared['signed']
+        if signed:
+            response = await self.exchange.fetch(
+                signed['url'], signed['method'], signed['headers'], signed['body'])
+            order = self.exchange.parse_order(
+                response.get('data', {}), prepared['market'])
+            order['ackTimestamp'] = self.exchange.safe_integer(
+                response, 'requestTime')
+            return order
+        order = await self.exchange.create_order(
+            symbol=prepared['symbol'], type='market', side=prepared['side'],
+            amount=prepared['amount'], params=prepared['params'])
+        order['ackTimestamp'] = order.get('timestamp')
+        return order
+
+    async def _keep_warm(self, stop):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.keepalive_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await self.exchange.fetch_time()
+                except Exception:
+                    pass
+
+    async def wait_until(self, target_ts, estimate):
+        offset, rtt, _ = estimate
+        send_at = target_ts - offset - rtt / 2
+        while True:
+            remaining = send_at - time.time()
+            if remaining <= self.spin_window:
+                break
+            await asyncio.sleep(min(remaining - self.spin_window, 1.0))
+        while time.time() < send_at:
+            await asyncio.sleep(0)
+
+    async def execute_at(self, target_time, symbol, side, amount, params=None):
+        target_ts = target_time.timestamp() if isinstance(
+            target_time, datetime) else float(target_time)
+
+        stop = asyncio.Event()
+        keeper = asyncio.create_task(self._keep_warm(stop))
+        try:
+            estimate = await self.clock_estimate()
+            if target_ts - self.exchange_time(estimate) > 30:
+                await self.wait_until(target_ts - 10, estimate)
+                estimate = await self.clock_estimate(self.resync_max_age)
+            await self.wait_until(target_ts - self.presign_lead, estimate)
+        finally:
+            stop.set()
+            await keeper
+        prepared = self.presign_order(symbol, side, amount, params)
+
+        await self.wait_until(target_ts, estimate)
+        sent_local = time.time()
+        order = await self.send(prepared)
+        acked_local = time.time()
+        return order, self._record(prepared, order, target_ts, estimate, sent_local, acked_local)
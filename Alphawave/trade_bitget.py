@@ -2,6 +2,8 @@ import math
 import ccxt
 import time
 from datetime import datetime, timedelta
+from timed_execution import TimedExecutor
+from account_state import AccountStateCache
 
 
 def place_order(exchange, symbol, leverage, side, amount, target_time):
@@ -13,38 +15,36 @@ def place_order(exchange, symbol, leverage, side, amount, target_time):
         market = exchange.market(symbol)
         exchange.set_leverage(leverage, symbol)
 
-        # 타겟타임까지 기다리기
-        while datetime.now() < target_time:
-            time.sleep(0.1)
-        
+        # 거래소 시계 기준 타겟타임에 맞춰 주문 (사전 서명 + 정밀 대기)
         params = {'reduceOnly': False}       # 마켓오더 생성
-        order = exchange.create_order(
-            symbol=symbol,
-            type='market',
-            side=side,
-            amount=amount,
-            params=params
-        )
+        executor = TimedExecutor(exchange)
+        order, timing = executor.execute_at(
+            target_time, symbol, side, amount, params=params)
 
         return order
 
-    except ccxt.BaseError as e:
+    except (ccxt.BaseError, ValueError) as e:
         return None
     
 import time
 
-def close_position(exchange, symbol, side, delay_seconds):
+def close_position(exchange, symbol, side, delay_seconds, account_state, filled_at):
 
     try:
-        # 포지션 닫을 때까지 기다리기
+        # 체결 직후 포지션 스냅샷 갱신은 대기 시간 동안 백그라운드에서 진행
+        account_state.on_fill()
         time.sleep(delay_seconds)
 
-        # 닫을 포지션 정보 가지고 오기
-        positions = exchange.fetch_positions([symbol])
-        print(positions)
+        # 닫을 포지션 정보는 캐시에서 읽기 (체결 이후 갱신되지 않았을 때만 직접 조회)
+        if account_state.positions_updated_at is None or account_state.positions_updated_at < filled_at:
+            account_state.refresh()
         position_side = 'long' if side == 'sell' else 'short' 
-        position = positions[0]
+        position = account_state.position(symbol)
 
+        if not position:
+            # 캐시에 없으면 체결이 아직 반영되지 않았을 수 있으므로 직접 조회
+            positions = exchange.fetch_positions([symbol])
+            position = next((p for p in positions if p['symbol'] == symbol and p.get('contracts')), None)
         if not position:
             # print(f"No open {position_side} position found for {symbol}.")
             return None
@@ -85,7 +85,6 @@ exchange = ccxt.bitget({
     'options': {'defaultType': 'swap'},  # 선물 트레이딩 옵션
 })
 
-balance = exchange.fetch_balance()
 
 # 파라미터 입력
 symbol = 'XVG/USDT:USDT'  
@@ -93,8 +92,13 @@ leverage = 1
 side = 'buy'  # 'sell' for short
 close_side = 'sell' if side == 'buy' else 'buy'
 
+# 잔고/포지션 스냅샷 (백그라운드 갱신)
+account_state = AccountStateCache(exchange, symbols=[symbol])
+account_state.refresh()
+account_state.start()
+
 # 매매 개수 구하기
-usdt_balance = balance['total']['USDT']
+usdt_balance = account_state.quote_balance()['total']
 coin_price = exchange.fetch_ticker(symbol)['last']  
 buffer = 0.9
 amount = math.floor((usdt_balance / coin_price) * buffer)
@@ -114,6 +118,9 @@ print(f"매수 목표 시간: {target_time}")
 market_order = place_order(exchange, symbol, leverage, side, amount, target_time)
 if market_order:
     print("매수 주문 완료:", market_order)
-    close_order = close_position(exchange, symbol, close_side, delay_seconds=delay_seconds)
+    close_order = close_position(exchange, symbol, close_side, delay_seconds=delay_seconds,
+                                 account_state=account_state, filled_at=time.time())
     if close_order:
-        print("포지션 청산 완료", close_order)
\ No newline at end of file
+        print("포지션 청산 완료", close_order)
+
+account_state.stop()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import pytz
+from datetime import datetime, timedelta
+
+
+class BroadcastScheduler:
+    """
+    Wall-clock aligned refresh/broadcast cycle driven by a telegram JobQueue.
+    At most one pre-warm job and one broadcast job are pending at any time. Fire times are computed from
+    the KST clock on every cycle, callbacks never sleep, and a refresh that is still running when the next
+    one is due is skipped rather than overlapped.
+    """
+
+    PREWARM_JOB = 'funding_prewarm'
+    BROADCAST_JOB = 'funding_broadcast'
+
+    def __init__(self, refresh, broadcast, estimator, metrics, announce=None, interval_minutes=30, tz='Asia/Seoul'):
+        self.refresh = refresh
+        self.broadcast = broadcast
+        self.announce = announce
+        self.estimator = estimator
+        self.metrics = metrics
+        self.interval_minutes = interval_minutes
+        self.tz = pytz.timezone(tz)
+        self.job_queue = None
+        self.refresh_task = None
+        self.refresh_boundary = None
+        self.refresh_started = None
+        self.pending_send = None
+        self.ready_at = None
+        self.skipped_refreshes = 0
+
+    def next_boundary(self, now=None):
+        now = now or datetime.now(self.tz)
+        minutes = now.hour * 60 + now.minute
+        next_minutes = (minutes // self.interval_minutes + 1) * \
+            self.interval_minutes
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(minutes=next_minutes)
+
+    def start(self, job_queue):
+        self.job_queue = job_queue
+        self._schedule_cycle()
+
+    def active_jobs(self):
+        if self.job_queue is None:
+            return []
+        return [(job.name, job.next_t) for job in self.job_queue.jobs()]
+
+    def _replace_job(self, callback, when, name, data=None):
+        for job in self.job_queue.get_jobs_by_name(name):
+            job.schedule_removal()
+        return self.job_queue.run_once(callback, when=when, name=name, data=data)
+
+    def _schedule_cycle(self, after=None):
+        now = datetime.now(self.tz)
+        boundary = self.next_boundary(max(now, after) if after else now)
+        lead_time = self.estimator.lead_time()
+        prewarm_at = max(boundary - timedelta(seconds=lead_time), now)
+        self._replace_job(self._prewarm, prewarm_at,
+                          self.PREWARM_JOB, data=boundary)
+        self._replace_job(self._broadcast, boundary,
+                          self.BROADCAST_JOB, data=boundary)
+        logging.info(
+            f"Next update at {boundary}. Pre-warming {lead_time:.1f}s ahead at {prewarm_at}.")
+        return boundary
+
+    async def _prewarm(self, context):
+        if self.refresh_task and not self.refresh_task.done():
+            self.skipped_refreshes += 1
+            logging.warning(
+                f"Previous refresh still running, skipping pre-warm for {context.job.data}.")
+            return
+        self.ready_at = None
+        self.refresh_boundary = context.job.data
+        self.refresh_started = datetime.now(self.tz)
+        self.refresh_task = asyncio.create_task(self.refresh())
+        self.refresh_task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task):
+        if task.cancelled() or task.exception() is not None:
+            logging.error(
+                f"Scheduled funding rate refresh failed: {task.exception() if not task.cancelled() else 'cancelled'}")
+            return
+        self.ready_at = datetime.now(self.tz)
+
+    async def _broadcast(self, context):
+        boundary = context.job.data
+        next_boundary = self._schedule_cycle(after=boundary)
+
+        task = self.refresh_task
+        # 이 boundary를 위해 시작된 refresh가 없으면(pre-warm skip) 이전 결과를 다시 보내지 않는다
+        if task is None or self.refresh_boundary != boundary:
+            logging.error(f"No refresh was started for {boundary}, skipping broadcast.")
+        elif task.cancelled() or (task.done() and task.exception() is not None):
+            logging.error(f"No fresh snapshot for {boundary}, skipping broadcast.")
+        elif not task.done():
+            if self.pending_send is not task:
+                logging.warning(
+                    f"Refresh for {boundary} overran the boundary, broadcasting on completion.")
+                self.pending_send = task
+                task.add_done_callback(
+                    lambda t: asyncio.ensure_future(self._send(context, boundary, t)))
+        else:
+            await self._send(context, boundary, task)
+
+        if self.announce:
+            await self.announce(context, next_boundary)
+
+    async def _send(self, context, boundary, task):
+        if task.cancelled() or task.exception() is not None:
+            return
+        try:
+            await self.broadcast(context)
+        except Exception as e:
+            logging.error(f"Error in scheduled broadcast: {e}", exc_info=True)
+            return
+        now = datetime.now(self.tz)
+        lag = (now - boundary).total_seconds()
+        lead = (boundary - (self.ready_at or now)).total_seconds()
+        duration = task.result()
+        self.metrics.record(boundary, duration, lead, lag)
+        logging.info(
+            f"Broadcast for {boundary}: lead {lead:.1f}s, lag {lag:.3f}s, refresh {duration:.1f}s.")
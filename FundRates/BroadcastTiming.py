@@ -0,0 +1,71 @@
+import math
+from collections import deque
+
+
+class RefreshDurationEstimator:
+    """
+    Exponentially weighted estimate of how long a full refresh takes.
+    The lead time is the mean plus `k` standard deviations and a fixed margin, so a refresh started
+    `lead_time()` seconds before a boundary is ready just ahead of it.
+    """
+
+    def __init__(self, initial=60.0, alpha=0.3, k=2.0, margin=5.0, min_lead=10.0, max_lead=600.0):
+        self.alpha = alpha
+        self.k = k
+        self.margin = margin
+        self.min_lead = min_lead
+        self.max_lead = max_lead
+        self.mean = initial
+        self.var = (initial / 4) ** 2
+        self.samples = 0
+
+    def observe(self, duration):
+        if self.samples == 0:
+            self.mean = duration
+            self.var = (duration / 4) ** 2
+        else:
+            diff = duration - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.samples += 1
+
+    def lead_time(self):
+        lead = self.mean + self.k * math.sqrt(self.var) + self.margin
+        return min(max(lead, self.min_lead), self.max_lead)
+
+
+class BroadcastMetrics:
+    """
+    Keeps the recent history of scheduled broadcasts.
+    lead: seconds the snapshot was ready before the boundary (negative when the refresh finished late).
+    lag: seconds between the boundary and the broadcast actually being sent.
+    """
+
+    def __init__(self, maxlen=48):
+        self.records = deque(maxlen=maxlen)
+
+    def record(self, boundary, duration, lead, lag):
+        self.records.append({
+            'boundary': boundary,
+            'duration': duration,
+            'lead': lead,
+            'lag': lag,
+        })
+
+    def summary(self):
+        if not self.records:
+            return "No scheduled broadcasts recorded yet."
+        leads = [r['lead'] for r in self.records]
+        lags = [r['lag'] for r in self.records]
+        durations = [r['duration'] for r in self.records]
+        last = self.records[-1]
+        return (
+            f"Broadcasts: {len(self.records)}\n"
+            f"Last: {last['boundary'].strftime('%m-%d %H:%M')} "
+            f"lead {last['lead']:.1f}s, lag {last['lag']:.3f}s, refresh {last['duration']:.1f}s\n"
+            f"Lead avg/min: {sum(leads) / len(leads):.1f}s / {min(leads):.1f}s\n"
+            f"Lag avg/max: {sum(lags) / len(lags):.3f}s / {max(lags):.3f}s\n"
+            f"Refresh avg/max: {sum(durations) / len(durations):.1f}s / {max(durations):.1f}s\n"
+            f"Late snapshots: {sum(1 for lead in leads if lead < 0)}"
+        )
@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import threading
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one exchange.
+    The limit grows by one after `limit` consecutive fast successes and is multiplied by `decrease` on a
+    rate-limit response or when latency exceeds `tolerance` times the learned baseline, at most once per
+    `backoff_interval` seconds so one burst of 429s only counts once.
+    """
+
+    def __init__(self, name, initial=10, min_limit=1, max_limit=64, decrease=0.5, tolerance=3.0,
+                 backoff_interval=1.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.backoff_interval = backoff_interval
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.baseline = None
+        self.successes = 0
+        self.throttled = 0
+        self.last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+        return False
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self.last_decrease < self.backoff_interval:
+            return
+        self.last_decrease = now
+        self.limit = max(self.limit * self.decrease, self.min_limit)
+        self.successes = 0
+
+    def on_success(self, latency):
+        with self._cond:
+            if self.baseline is None:
+                self.baseline = latency
+            elif latency < self.baseline:
+                self.baseline = 0.5 * self.baseline + 0.5 * latency
+            else:
+                self.baseline = 0.99 * self.baseline + 0.01 * latency
+
+            if latency > self.baseline * self.tolerance:
+                self._decrease()
+                return
+            self.successes += 1
+            if self.successes >= int(self.limit):
+                self.successes = 0
+                self.limit = min(self.limit + 1, self.max_limit)
+                self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            self.throttled += 1
+            self._decrease()
+
+    def summary(self):
+        baseline = f"{self.baseline * 1000:.0f}ms" if self.baseline else "n/a"
+        return f"{self.name}: limit {int(self.limit)}, baseline {baseline}, throttled {self.throttled}"
+
+
+class LimiterStore:
+    """
+    Persists the learned limit of every exchange so the next run starts where the last one ended.
+    """
+
+    def __init__(self, path='./cache/concurrency_limits.json'):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, limiters):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({name: int(limiter.limit)
+                       for name, limiter in limiters.items()}, file)
+        os.replace(tmp_path, self.path)
@@ -1,6 +1,7 @@
 # pip install "python-telegram-bot[job-queue]"
 
 import json
+import time
 import logging
 import asyncio
 from telegram import Update
@@ -9,6 +10,12 @@ from datetime import datetime, timedelta
 import pytz
 
 from PPFundingRateFetcher import *
+from SymbolLookup import SymbolLookup
+from BroadcastTiming import RefreshDurationEstimator, BroadcastMetrics
+from BroadcastScheduler import BroadcastScheduler
+import CommonPath  # noqa: F401
+from common.broadcast import SubscriberRegistry, FanoutDispatcher
+from SessionPool import connection_stats
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -34,12 +41,28 @@ config = load_config('./config.json')
 kamp_alphawave_bot_token = config.get('kamp_alphawave_bot_token')
 bot_myself_chat_id = config.get('bot_myself_chat_id')
 alphawave_cr_group_chat_id = config.get('alphawave_cr_group_chat_id')
+if alphawave_cr_group_chat_id is None:
+    logging.error("alphawave_cr_group_chat_id is missing from the configuration.")
+    raise Exception("Telegram group chat id not configured.")
+# 설정된 그룹과 허용된 채팅에서만 명령을 받고 브로드캐스트도 이 채팅들에만 보냄
+allowed_chat_ids = {int(chat_id) for chat_id in [alphawave_cr_group_chat_id] + config.get('allowed_chat_ids', [])}
+allowed_chats = filters.Chat(chat_id=allowed_chat_ids)
 
 mkts = ['bybit', 'gateio', 'mexc', 'okx']
 top_n = 10
 max_workers = 10
 
-fetcher = PPFundingRateFetcher(mkts=mkts, top_n=top_n, max_workers=max_workers)
+deadline = 90
+exchange_timeout = 60
+
+fetcher = PPFundingRateFetcher(mkts=mkts, top_n=top_n, max_workers=max_workers,
+                               deadline=deadline, exchange_timeout=exchange_timeout)
+symbol_lookup = SymbolLookup(fetcher, ttl=15.0)
+refresh_estimator = RefreshDurationEstimator(initial=60.0)
+broadcast_metrics = BroadcastMetrics()
+subscribers = SubscriberRegistry(
+    config.get('subscribers_path', './subscribers.json'), seed=[alphawave_cr_group_chat_id])
+fanout = FanoutDispatcher(subscribers)
 
 SYMBOL = range(1)
 
@@ -47,112 +70,101 @@ last_funding_rate_data = None
 last_funding_rate_time = None
 
 
-async def send_funding_rate(update: Update, context: ContextTypes.DEFAULT_TYPE, update_data=True):
+async def refresh_funding_rate():
     global last_funding_rate_data, last_funding_rate_time
+    logging.info("Fetching funding rate...")
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    last_funding_rate_data = await loop.run_in_executor(None, fetcher.get_funding_rate_mdstr)
+    last_funding_rate_time = datetime.now()
+    duration = loop.time() - started
+    refresh_estimator.observe(duration)
+    logging.info(f"Funding rate fetched successfully in {duration:.1f}s.")
+    return duration
+
+
+def allowed_subscribers():
+    return [chat_id for chat_id in subscribers if chat_id in allowed_chat_ids]
+
+
+async def broadcast_funding_rate(context: ContextTypes.DEFAULT_TYPE, chat_ids=None):
+    if chat_ids is None:
+        chat_ids = allowed_subscribers()
+    await fanout.broadcast(context.bot, last_funding_rate_data, chat_ids=chat_ids, parse_mode='Markdown')
+    logging.info("Funding rate messages sent successfully.")
+
+
+async def reply_chunks(update: Update, context: ContextTypes.DEFAULT_TYPE, text):
+    # 명령 응답은 요청한 채팅에만 보내되 전역 전송 한도는 브로드캐스트와 공유
+    await fanout.broadcast(context.bot, text, chat_ids=[update.effective_chat.id], parse_mode='Markdown')
+
+
+async def send_funding_rate(update: Update, context: ContextTypes.DEFAULT_TYPE, update_data=True):
     try:
-        logging.info("Fetching funding rate...")
         if update_data or not last_funding_rate_data:
-            loop = asyncio.get_running_loop()
-            last_funding_rate_data = await loop.run_in_executor(None, fetcher.get_funding_rate_mdstr)
-            last_funding_rate_time = datetime.now()
-            logging.info("Funding rate fetched successfully.")
-
-        for i in range(0, len(last_funding_rate_data), 4000):
-            await context.bot.send_message(
-                chat_id=alphawave_cr_group_chat_id,
-                text=last_funding_rate_data[i:i+4000],
-                parse_mode='Markdown'
-            )
-        logging.info("Funding rate messages sent successfully.")
+            await refresh_funding_rate()
+        await broadcast_funding_rate(context, chat_ids=[update.effective_chat.id])
     except Exception as e:
         logging.error(f"Error sending funding rate: {e}", exc_info=True)
         await context.bot.send_message(
-            chat_id=alphawave_cr_group_chat_id,
+            chat_id=update.effective_chat.id,
             text="Error while receiving funding rate!",
             parse_mode='Markdown'
         )
 
 
-async def periodic_funding_rate_update(context: ContextTypes.DEFAULT_TYPE):
-    now = datetime.now(pytz.timezone('Asia/Seoul'))
-    if now.minute < 30:
-        next_run = now.replace(minute=30, second=0, microsecond=0)
-    else:
-        next_run = now.replace(
-            minute=0, second=0, microsecond=0) + timedelta(hours=1)
-
-    wait_time = (next_run - now).total_seconds()
-
-    await context.bot.send_message(
-        chat_id=alphawave_cr_group_chat_id,
-        text=f"Next funding rate update scheduled at {next_run.strftime('%Y-%m-%d %H:%M:%S')} (KST)",
-        parse_mode='Markdown'
-    )
-
-    logging.info(
-        f"Next update at {next_run}. Waiting {wait_time / 60:.2f} minutes...")
+async def announce_next_update(context: ContextTypes.DEFAULT_TYPE, next_run):
+    await fanout.broadcast(
+        context.bot, f"Next funding rate update scheduled at {next_run.strftime('%Y-%m-%d %H:%M:%S')} (KST)",
+        chat_ids=allowed_subscribers(), parse_mode='Markdown')
 
-    await asyncio.sleep(wait_time)
-    await send_funding_rate(update=None, context=context, update_data=True)
 
-    context.job_queue.run_repeating(
-        periodic_funding_rate_update, interval=30*60, first=next_run)
+scheduler = BroadcastScheduler(
+    refresh=refresh_funding_rate,
+    broadcast=broadcast_funding_rate,
+    estimator=refresh_estimator,
+    metrics=broadcast_metrics,
+    announce=announce_next_update,
+)
 
 
 async def on_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await send_funding_rate(update, context, update_data=True)
 
 
+async def spread_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    try:
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(
+            None, lambda: fetcher.get_funding_spread_mdstr())
+        await reply_chunks(update, context, text)
+        logging.info("Funding spread messages sent successfully.")
+    except Exception as e:
+        logging.error(f"Error sending funding spreads: {e}", exc_info=True)
+        await update.message.reply_text("Error while ranking funding spreads!")
+
+
 async def prev_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     global last_funding_rate_data
     if last_funding_rate_data:
-        for i in range(0, len(last_funding_rate_data), 4000):
-            await context.bot.send_message(
-                chat_id=alphawave_cr_group_chat_id,
-                text=last_funding_rate_data[i:i+4000],
-                parse_mode='Markdown'
-            )
+        await reply_chunks(update, context, last_funding_rate_data)
     else:
         await update.message.reply_text("No previous data available. Please try /on to get the latest data.")
 
 
 async def ask_symbol(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global last_funding_rate_data
-
-    if last_funding_rate_data is None:
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="No funding rate data available. Please run /on or wait for the 30-minute cycle.",
-            parse_mode='Markdown'
-        )
-        return ConversationHandler.END
-
     await update.message.reply_text("Which symbol would you like to check?")
     return SYMBOL
 
 
 async def send_symbol_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global last_funding_rate_data
-    if last_funding_rate_data is None:
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="No funding rate data available. Please run /on or wait for the 30-minute cycle.",
-            parse_mode='Markdown'
-        )
-        return
-
     symbol = update.message.text
     try:
-        text = fetcher.get_additional_data_by_symbol_mdstr(symbol)
+        text = await symbol_lookup.lookup_mdstr(symbol)
         if text.startswith("Error"):
             await update.message.reply_text(f"No data found for symbol: {symbol}")
         else:
-            for i in range(0, len(text), 4000):
-                await context.bot.send_message(
-                    chat_id=alphawave_cr_group_chat_id,
-                    text=text[i:i+4000],
-                    parse_mode='Markdown'
-                )
+            await reply_chunks(update, context, text)
             logging.info(f"Symbol data for {symbol} sent successfully.")
     except Exception as e:
         logging.error(f"Error fetching symbol data: {e}", exc_info=True)
@@ -186,17 +198,12 @@ async def send_symbol_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     symbols.append(f"{exchange}: {symbol}")
 
         symbols_text = "\n".join(symbols)
-        for i in range(0, len(symbols_text), 4000):
-            await context.bot.send_message(
-                chat_id=alphawave_cr_group_chat_id,
-                text=symbols_text[i:i + 4000],
-                parse_mode='Markdown'
-            )
+        await reply_chunks(update, context, symbols_text)
         logging.info("Symbol list sent successfully.")
     except Exception as e:
         logging.error(f"Error fetching symbol list: {e}", exc_info=True)
         await context.bot.send_message(
-            chat_id=alphawave_cr_group_chat_id,
+            chat_id=update.effective_chat.id,
             text="Error while fetching symbol list!",
             parse_mode='Markdown'
         )
@@ -207,8 +214,14 @@ async def send_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Command Manual:\n\n"
         "/on - Fetches the latest funding rate data and updates the stored data.\n"
         "/prev - Shows the most recent funding rate data previously fetched.\n"
-        "/symbol - Lets you input a symbol to get detailed funding rate information for that specific symbol.\n"
-        "/symbol_list - Displays a list of symbols for which funding rate data is available.\n\n"
+        "/symbol - Lets you input a symbol (e.g. APE or APE/USDT:USDT) to get live funding rate information for it on every exchange.\n"
+        "/symbol_list - Displays a list of symbols for which funding rate data is available.\n"
+        "/spread - Ranks symbols by annualized funding spread between the best long and short exchange.\n"
+        "/timing - Shows how early snapshots were ready and how late broadcasts were sent.\n"
+        "/jobs - Lists the scheduled refresh and broadcast jobs.\n"
+        "/health - Shows the circuit breaker state of every exchange.\n"
+        "/subscribe - Adds this chat to the scheduled funding rate broadcasts.\n"
+        "/unsubscribe - Removes this chat from the scheduled broadcasts.\n\n"
         "Notes:\n"
         "- The funding rate data updates every 30 minutes (at half-past and on the hour).\n"
         "- You can use /prev to view the previously fetched data.\n"
@@ -225,6 +238,57 @@ async def send_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logging.error(f"Error sending info message: {e}")
 
 
+async def timing_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    text = (
+        f"{broadcast_metrics.summary()}\n"
+        f"{fanout.summary()}\n"
+        f"Next pre-warm lead: {refresh_estimator.lead_time():.1f}s\n"
+        f"Skipped overrunning refreshes: {scheduler.skipped_refreshes}"
+    )
+    await update.message.reply_text(text)
+
+
+async def health_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    lines = fetcher.breaker_summary()
+    if not lines:
+        await update.message.reply_text("No exchanges initialized.")
+        return
+    lines.append("Concurrency: " + "; ".join(fetcher.limiter_summary()))
+    lines.append(f"Requests: {fetcher.request_policy.summary()}")
+    lines.append(f"Response cache: {fetcher.response_cache.summary()}")
+    snapshot = fetcher.snapshot
+    lines.append(f"Snapshot: v{snapshot.version}, {int(time.time() - snapshot.created_at)}s old")
+    lines.extend(connection_stats.summary())
+    await update.message.reply_text("Exchange health:\n" + "\n".join(lines))
+
+
+async def jobs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    jobs = scheduler.active_jobs()
+    if not jobs:
+        await update.message.reply_text("No scheduled jobs.")
+        return
+    kst = pytz.timezone('Asia/Seoul')
+    lines = [
+        f"{name}: {next_t.astimezone(kst).strftime('%Y-%m-%d %H:%M:%S') if next_t else 'pending'}"
+        for name, next_t in jobs
+    ]
+    await update.message.reply_text("Active jobs:\n" + "\n".join(lines))
+
+
+async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if subscribers.add(update.effective_chat.id):
+        await update.message.reply_text("Subscribed to scheduled funding rate updates.")
+    else:
+        await update.message.reply_text("This chat is already subscribed.")
+
+
+async def unsubscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if subscribers.remove(update.effective_chat.id):
+        await update.message.reply_text("Unsubscribed from scheduled funding rate updates.")
+    else:
+        await update.message.reply_text("This chat is not subscribed.")
+
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Action cancelled.")
     return ConversationHandler.END
@@ -234,39 +298,45 @@ def main():
     try:
         application = ApplicationBuilder().token(kamp_alphawave_bot_token).build()
 
-        send_fund_rate_handler = CommandHandler('on', on_command)
-        prev_fund_rate_handler = CommandHandler('prev', prev_command)
-        symbol_list_handler = CommandHandler('symbol_list', send_symbol_list)
-        info_handler = CommandHandler('info', send_info)
+        send_fund_rate_handler = CommandHandler('on', on_command, filters=allowed_chats)
+        prev_fund_rate_handler = CommandHandler('prev', prev_command, filters=allowed_chats)
+        symbol_list_handler = CommandHandler('symbol_list', send_symbol_list, filters=allowed_chats)
+        info_handler = CommandHandler('info', send_info, filters=allowed_chats)
+        timing_handler = CommandHandler('timing', timing_command, filters=allowed_chats)
+        jobs_handler = CommandHandler('jobs', jobs_command, filters=allowed_chats)
+        spread_handler = CommandHandler('spread', spread_command, filters=allowed_chats)
+        health_handler = CommandHandler('health', health_command, filters=allowed_chats)
+        subscribe_handler = CommandHandler('subscribe', subscribe_command, filters=allowed_chats)
+        unsubscribe_handler = CommandHandler('unsubscribe', unsubscribe_command, filters=allowed_chats)
 
         symbol_handler = ConversationHandler(
-            entry_points=[CommandHandler('symbol', ask_symbol)],
+            entry_points=[CommandHandler('symbol', ask_symbol, filters=allowed_chats)],
             states={
                 SYMBOL: [MessageHandler(
-                    filters.TEXT & ~filters.COMMAND, send_symbol_data)]
+                    filters.TEXT & ~filters.COMMAND & allowed_chats, send_symbol_data)]
             },
-            fallbacks=[CommandHandler('cancel', cancel)]
+            fallbacks=[CommandHandler('cancel', cancel, filters=allowed_chats)]
         )
 
         application.add_handler(send_fund_rate_handler)
         application.add_handler(prev_fund_rate_handler)
         application.add_handler(symbol_list_handler)
         application.add_handler(info_handler)
+        application.add_handler(timing_handler)
+        application.add_handler(jobs_handler)
+        application.add_handler(spread_handler)
+        application.add_handler(health_handler)
+        application.add_handler(subscribe_handler)
+        application.add_handler(unsubscribe_handler)
         application.add_handler(symbol_handler)
 
-        job_queue = application.job_queue
-        now = datetime.now(pytz.timezone('Asia/Seoul'))
-        if now.minute < 30:
-            first_run = now.replace(minute=30, second=0, microsecond=0)
-        else:
-            first_run = now.replace(
-                minute=0, second=0, microsecond=0) + timedelta(hours=1)
-        job_queue.run_once(periodic_funding_rate_update,
-                           when=(first_run - now).total_seconds())
+        scheduler.start(application.job_queue)
 
         application.run_polling()
     except Exception as e:
         logging.error(f"An error occurred in main: {e}", exc_info=True)
+    finally:
+        fetcher.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class FundingHistoryStore:
+    """
+    Columnar funding-rate history on disk: <root>/<exchange>/<symbol>/{timestamp,rate}.npy.
+    Writes merge with what is stored, drop duplicate timestamps (newest value wins) and replace files atomically.
+    """
+
+    def __init__(self, root='./funding_history'):
+        self.root = root
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def safe_name(symbol):
+        return symbol.replace('/', '_').replace(':', '-')
+
+    def path(self, mkt, symbol):
+        return os.path.join(self.root, mkt, self.safe_name(symbol))
+
+    def _symbol_lock(self, mkt, symbol):
+        with self._lock:
+            return self._locks.setdefault((mkt, symbol), threading.Lock())
+
+    def load(self, mkt, symbol, mmap=True):
+        path = self.path(mkt, symbol)
+        try:
+            mode = 'r' if mmap else None
+            timestamps = np.load(os.path.join(path, 'timestamp.npy'), mmap_mode=mode)
+            rates = np.load(os.path.join(path, 'rate.npy'), mmap_mode=mode)
+            # 두 파일 교체 사이에 중단되었으면 짧은 쪽 길이에 맞춤
+            length = min(len(timestamps), len(rates))
+            return timestamps[:length], rates[:length]
+        except (OSError, ValueError):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    def last_timestamp(self, mkt, symbol):
+        timestamps, _ = self.load(mkt, symbol)
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    def append(self, mkt, symbol, timestamps, rates):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        rates = np.asarray(rates, dtype=np.float64)
+        with self._symbol_lock(mkt, symbol):
+            stored_ts, stored_rates = self.load(mkt, symbol, mmap=False)
+            all_ts = np.concatenate([stored_ts, timestamps])
+            all_rates = np.concatenate([stored_rates, rates])
+            # 뒤에서부터 unique를 잡아 같은 시각이면 새 값이 남도록 함
+            _, last = np.unique(all_ts[::-1], return_index=True)
+            keep = len(all_ts) - 1 - last
+            path = self.path(mkt, symbol)
+            os.makedirs(path, exist_ok=True)
+            for name, values in (('timestamp', all_ts[keep]), ('rate', all_rates[keep])):
+                tmp_path = os.path.join(path, f"{name}.tmp.npy")
+                np.save(tmp_path, values)
+                os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+            return len(keep) - len(stored_ts)
+
+    def to_frame(self, mkt, symbol):
+        timestamps, rates = self.load(mkt, symbol)
+        return pd.DataFrame({
+            'fundingTime': pd.to_datetime(np.asarray(timestamps), unit='ms', utc=True),
+            'fundingRate': np.asarray(rates),
+        })
+
+    def summary(self):
+        series, points = 0, 0
+        if not os.path.isdir(self.root):
+            return "0 series, 0 points"
+        for mkt in os.listdir(self.root):
+            mkt_dir = os.path.join(self.root, mkt)
+            if not os.path.isdir(mkt_dir):
+                continue
+            for name in os.listdir(mkt_dir):
+                try:
+                    points += len(np.load(os.path.join(mkt_dir, name, 'timestamp.npy'), mmap_mode='r'))
+                    series += 1
+                except (OSError, ValueError):
+                    pass
+        return f"{series} series, {points} points"
+
+
+class Checkpoint:
+    """
+    Last fetched funding timestamp per (exchange, symbol), so an interrupted backfill resumes where it stopped
+    even for pages that returned no new rows. `set` only updates memory; the file is replaced atomically every
+    `flush_every` updates or `flush_interval` seconds, and on `flush()` at the end of a run.
+    """
+
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._dirty = 0
+        self._flushed_at = time.monotonic()
+        try:
+            with open(path, 'r') as file:
+                self.positions = json.load(file)
+        except (OSError, ValueError):
+            self.positions = {}
+
+    def get(self, mkt, symbol):
+        with self._lock:
+            return self.positions.get(mkt, {}).get(symbol)
+
+    def set(self, mkt, symbol, timestamp):
+        with self._lock:
+            self.positions.setdefault(mkt, {})[symbol] = int(timestamp)
+            self._dirty += 1
+            due = (self._dirty >= self.flush_every
+                   or time.monotonic() - self._flushed_at >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        # 직렬화만 잠금 안에서 하고 파일 쓰기는 별도 잠금으로 처리해 다른 스레드의 set을 막지 않음
+        with self._file_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps(self.positions)
+                self._dirty = 0
+                self._flushed_at = time.monotonic()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                file.write(data)
+            os.replace(tmp_path, self.path)
+
+
+class FundingHistoryBackfill:
+    """
+    Pulls funding-rate history for every swap symbol on every exchange of a FundingRateFetcher.
+    Symbols are paginated independently and run in parallel through the fetcher's per-exchange pools,
+    concurrency limiters, circuit breakers and retries. Each symbol starts after the later of its stored
+    last timestamp and its checkpoint, so re-runs only top up what is missing.
+    """
+
+    def __init__(self, fetcher, store=None, days=180, page_limit=100, checkpoint_path=None):
+        self.fetcher = fetcher
+        self.store = store or FundingHistoryStore()
+        self.days = days
+        self.page_limit = page_limit
+        self.checkpoint = Checkpoint(checkpoint_path or os.path.join(self.store.root, 'checkpoint.json'))
+        self.failed = []
+        self._lock = threading.Lock()
+
+    def swap_symbols(self, mkt, exchange):
+        if not exchange.has.get('fetchFundingRateHistory'):
+            print(f"{mkt} does not support funding rate history, skipping.")
+            return []
+        return [symbol for symbol in exchange.symbols
+                if 'swap' in exchange.markets[symbol].get('type', '').lower()]
+
+    def start_for(self, mkt, symbol, now_ms):
+        candidates = [now_ms - self.days * DAY_MS]
+        for known in (self.store.last_timestamp(mkt, symbol), self.checkpoint.get(mkt, symbol)):
+            if known is not None:
+                candidates.append(known + 1)
+        return max(candidates)
+
+    def backfill_symbol(self, mkt, symbol, now_ms):
+        since = self.start_for(mkt, symbol, now_ms)
+        added = 0
+        try:
+            while since < now_ms:
+                page = self.fetcher.call_exchange(
+                    mkt, 'fetch_funding_rate_history', symbol, since, self.page_limit)
+                rows = [(entry['timestamp'], entry['fundingRate']) for entry in page
+                        if entry.get('timestamp') is not None and entry['timestamp'] >= since
+                        and entry.get('fundingRate') is not None]
+                if not rows:
+                    break
+                timestamps, rates = zip(*rows)
+                added += self.store.append(mkt, symbol, timestamps, rates)
+                last = max(timestamps)
+                self.checkpoint.set(mkt, symbol, last)
+                since = last + 1
+        except Exception as e:
+            with self._lock:
+                self.failed.append((mkt, symbol, f"{type(e).__name__}: {e}"))
+            return None
+        return mkt, symbol, added
+
+    def run(self, mkts=None):
+        now_ms = int(time.time() * 1000)
+        jobs = []
+        for mkt, exchange in self.fetcher.exchanges.items():
+            if mkts and mkt not in mkts:
+                continue
+            jobs.extend((mkt, symbol, now_ms) for symbol in self.swap_symbols(mkt, exchange))
+        print(f"Backfilling funding history for {len(jobs)} symbols ({self.days} days).")
+        start = time.monotonic()
+        try:
+            results, incomplete = self.fetcher._run_jobs(jobs, self.backfill_symbol)
+        finally:
+            self.checkpoint.flush()
+        added = sum(result[2] for result in results)
+        print(f"Stored {added} new funding rates for {len(results)} symbols in {time.monotonic() - start:.1f}s "
+              f"({self.store.summary()}).")
+        if self.failed:
+            print(f"{len(self.failed)} symbols failed and will resume from their checkpoint next run.")
+        if incomplete:
+            print(f"Incomplete exchanges: {', '.join(sorted(incomplete))}")
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from FundingRateFetcher import FundingRateFetcher
+
+    parser = argparse.ArgumentParser(description="Funding rate history backfill")
+    parser.add_argument('--mkts', type=str, default='bybit,gateio,mexc,okx',
+                        help='Comma separated exchanges')
+    parser.add_argument('--days', type=int, default=180, help='History to keep for new symbols')
+    parser.add_argument('--store', type=str, default='./funding_history', help='Store directory')
+    args = parser.parse_args()
+
+    mkts = args.mkts.split(',')
+    fetcher = FundingRateFetcher(mkts, max_workers=10)
+    backfill = FundingHistoryBackfill(fetcher, store=FundingHistoryStore(args.store), days=args.days)
+    try:
+        backfill.run()
+    finally:
+        fetcher.close()
@@ -1,147 +1,413 @@
+import os
+import time
+import queue
+import itertools
+import threading
 import ccxt
 import pytz
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from SymbolIndex import MarketCache
+from FundingRecords import FundingRecordBuffer
+import CommonPath  # noqa: F401
+from common.circuit_breaker import CircuitBreaker
+from ConcurrencyLimiter import AdaptiveLimiter, LimiterStore
+from RequestPolicy import RequestPolicy
+from SessionPool import session_pool
+from TrafficLog import TrafficLog, RecordingExchange, ReplayExchange
+from ResponseCache import ResponseCache
+from FundingSnapshot import FundingSnapshot
 
 
 class FundingRateFetcher:
-    def __init__(self, mkts, top_n=10, max_workers=20):
+    # 거래소 읽기 요청별 캐시 유지 시간(초); 목록에 없는 메서드는 캐시하지 않음
+    READ_CACHE_TTLS = {
+        'fetch_funding_rate': 5.0,
+        'fetch_ticker': 2.0,
+        'fetch_order_book': 1.0,
+    }
+    STAGE_CACHE_TTL = 10.0
+    LIMITS_SAVE_INTERVAL = 300.0
+
+    def __init__(self, mkts, top_n=10, max_workers=20, cache_dir='./cache', deadline=None, exchange_timeout=None,
+                 record_path=None, replay_path=None, replay_pace='fast', replay_speed=1.0):
         self.mkts = mkts
         self.top_n = top_n
         self.max_workers = max_workers
+        self.deadline = deadline
+        self.exchange_timeout = exchange_timeout
         self.kst = pytz.timezone('Asia/Seoul')
-        self.funding_rates = pd.DataFrame()
-        self.funding_rates_per_exchange = pd.DataFrame()
-        self.deduped_top_funding_rates = pd.DataFrame()
-        self.additional_data = pd.DataFrame()
+        self.snapshot = FundingSnapshot()
+        self._publish_lock = threading.Lock()
+        self._rates_versions = itertools.count(1)
         self.exchanges = {}
+        self.breakers = {}
+        self.limiters = {}
+        # 재생 시에는 헤지 요청이 녹화 응답을 중복 소비하지 않도록 헤지를 끔
+        self.request_policy = RequestPolicy(hedge_budget=0.0) if replay_path else RequestPolicy()
+        self.market_cache = MarketCache(cache_dir)
+        self.limiter_store = LimiterStore(os.path.join(cache_dir, 'concurrency_limits.json'))
+        self._limits_saved_at = time.monotonic()
+        self.symbol_index = None
+        self.response_cache = ResponseCache()
+        self.traffic_log = TrafficLog(record_path) if record_path and not replay_path else None
+        self.replay_path = replay_path
+        self.replay_pace = replay_pace
+        self.replay_speed = replay_speed
         self._initialize_exchanges()
 
     def __len__(self):
-        return len(self.funding_rates)
+        return len(self.snapshot.funding_rates)
+
+    # 이전 속성 이름은 현재 스냅샷의 읽기 전용 뷰로 유지
+    funding_rates = property(lambda self: self.snapshot.funding_rates)
+    funding_rates_per_exchange = property(lambda self: self.snapshot.funding_rates_per_exchange)
+    additional_data = property(lambda self: self.snapshot.additional_data)
+    deduped_top_funding_rates = property(lambda self: self.snapshot.deduped_top_funding_rates)
+    funding_spreads = property(lambda self: self.snapshot.funding_spreads)
+    main_df = property(lambda self: self.snapshot.main_df)
+    missing_exchanges = property(lambda self: self.snapshot.missing_exchanges)
+
+    def _publish(self, **changes):
+        """
+        Derives the next snapshot from the current one and swaps it in. Only writers take the lock;
+        readers just grab `self.snapshot` and keep using that reference.
+        """
+        with self._publish_lock:
+            self.snapshot = self.snapshot.evolve(**changes)
+            return self.snapshot
+
+    def _snapshot_with(self, name):
+        snapshot = self.snapshot
+        if getattr(snapshot, name).empty:
+            snapshot = self.refresh('spread' if name == 'funding_rates' else 'top')
+        return snapshot
 
     def _initialize_exchanges(self):
+        from_cache = True
+        learned_limits = self.limiter_store.load()
         for mkt in self.mkts:
             try:
+                limiter = AdaptiveLimiter(
+                    mkt, initial=learned_limits.get(mkt, self.max_workers))
+                session = session_pool.session_for(
+                    mkt, pool_size=limiter.max_limit + 8)
                 exchange_class = getattr(ccxt, mkt)
-                exchange = exchange_class({'enableRateLimit': True})
-                exchange.load_markets()
+                exchange = exchange_class(
+                    {'enableRateLimit': True, 'session': session})
+                if self.exchange_timeout:
+                    exchange.timeout = int(
+                        min(exchange.timeout, self.exchange_timeout * 1000))
+                if self.replay_path:
+                    # 녹화된 응답만 사용하므로 네트워크 연결/마켓 캐시를 거치지 않음
+                    exchange = ReplayExchange(
+                        exchange, self.replay_path, pace=self.replay_pace, speed=self.replay_speed)
+                    exchange.load_markets()
+                    from_cache, warmed = False, 0
+                else:
+                    warmed = session_pool.warm(
+                        mkt, exchange, connections=min(int(limiter.limit), 8))
+                    if self.traffic_log:
+                        exchange = RecordingExchange(exchange, self.traffic_log)
+                    markets_cached = self.market_cache.load_markets(mkt, exchange)
+                    if markets_cached and self.traffic_log:
+                        exchange.record_markets()
+                    from_cache &= markets_cached
                 self.exchanges[mkt] = exchange
-                print(f"Initialized exchange: {mkt}")
+                self.breakers[mkt] = CircuitBreaker(
+                    mkt, slow_call=self.exchange_timeout or 5.0)
+                self.limiters[mkt] = limiter
+                print(f"Initialized exchange: {mkt} ({warmed} connections warmed)")
             except Exception as e:
                 print(f"Error initializing exchange {mkt}: {str(e)}")
+        self.symbol_index = self.market_cache.load_index(
+            self.exchanges, from_cache)
+        print(f"Indexed {len(self.symbol_index)} canonical swap symbols.")
+
+    def call_exchange(self, mkt, method, *args, **kwargs):
+        ttl = self.READ_CACHE_TTLS.get(method)
+        if ttl is None:
+            return self._call_exchange(mkt, method, *args, **kwargs)
+        key = (mkt, method, args, tuple(sorted(kwargs.items())))
+        return self.response_cache.get_or_compute(
+            key, lambda: self._call_exchange(mkt, method, *args, **kwargs), ttl)
+
+    def _call_exchange(self, mkt, method, *args, **kwargs):
+        return self.request_policy.execute(
+            (mkt, method), self._call_exchange_once, mkt, method, *args, **kwargs)
+
+    def _call_exchange_once(self, mkt, method, *args, **kwargs):
+        exchange = self.exchanges[mkt]
+        limiter = self.limiters[mkt]
+        with limiter:
+            start = time.monotonic()
+            try:
+                result = self.breakers[mkt].call(
+                    getattr(exchange, method), *args, **kwargs)
+            except (ccxt.DDoSProtection, ccxt.RateLimitExceeded):
+                limiter.on_throttle()
+                raise
+            limiter.on_success(time.monotonic() - start)
+            return result
+
+    def save_concurrency_limits(self, force=False):
+        """
+        Persists the learned limits at most every LIMITS_SAVE_INTERVAL seconds; `force` saves regardless.
+        """
+        now = time.monotonic()
+        if self.replay_path or (not force and now - self._limits_saved_at < self.LIMITS_SAVE_INTERVAL):
+            return
+        self._limits_saved_at = now
+        self.limiter_store.save(self.limiters)
+
+    def limiter_summary(self):
+        return [limiter.summary() for limiter in self.limiters.values()]
+
+    def close(self):
+        self.save_concurrency_limits(force=True)
+        if self.traffic_log:
+            self.traffic_log.close()
+
+    def breaker_summary(self, only_unhealthy=False):
+        return [breaker.summary() for breaker in self.breakers.values()
+                if not only_unhealthy or breaker.state != breaker.CLOSED]
+
+    def _run_jobs(self, jobs, fn, deadline_at=None, exchange_timeout=None):
+        """
+        Runs fn(*job) for jobs of the form (mkt, ...) on one thread pool per exchange.
+        An exchange still busy after `exchange_timeout` seconds, or when the absolute monotonic `deadline_at`
+        passes, has its queued jobs cancelled and its running ones abandoned.
+        Returns (results, exchanges that did not finish).
+        """
+        start = time.monotonic()
+        completed = queue.Queue()
+        executors, pending = {}, {}
+        results, incomplete = [], set()
+        budgets = {}
+        for job in jobs:
+            mkt = job[0]
+            if mkt not in budgets:
+                budgets[mkt] = self.breakers[mkt].probe_budget() if mkt in self.breakers else None
+                if budgets[mkt] is not None:
+                    # 회로가 닫혀 있지 않으면 프로브만 보내고 나머지는 이전 값으로 채우도록 누락 처리
+                    incomplete.add(mkt)
+                    print(f"Circuit breaker for {mkt} is not closed, sending {budgets[mkt]} probe requests only.")
+            if budgets[mkt] is not None:
+                if budgets[mkt] <= 0:
+                    continue
+                budgets[mkt] -= 1
+            if mkt not in executors:
+                limiter = self.limiters.get(mkt)
+                workers = limiter.max_limit if limiter else self.max_workers
+                executors[mkt] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"fetch-{mkt}")
+                pending[mkt] = set()
+            future = executors[mkt].submit(fn, *job)
+            pending[mkt].add(future)
+            future.add_done_callback(
+                lambda f, mkt=mkt: completed.put((mkt, f)))
+
+        exchange_deadlines = {}
+        for mkt in pending:
+            candidates = [deadline_at]
+            if exchange_timeout:
+                candidates.append(start + exchange_timeout)
+            candidates = [d for d in candidates if d is not None]
+            exchange_deadlines[mkt] = min(candidates) if candidates else None
+
+        pending = {mkt: futures for mkt, futures in pending.items() if futures}
+        while pending:
+            now = time.monotonic()
+            for mkt in [m for m in pending if exchange_deadlines[m] is not None and exchange_deadlines[m] <= now]:
+                for future in pending.pop(mkt):
+                    future.cancel()
+                incomplete.add(mkt)
+                print(f"Deadline passed for {mkt}, abandoning outstanding requests.")
+            if not pending:
+                break
+            deadlines = [exchange_deadlines[m] for m in pending if exchange_deadlines[m] is not None]
+            timeout = max(min(deadlines) - now, 0) if deadlines else None
+            try:
+                mkt, future = completed.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if mkt not in pending or future not in pending[mkt]:
+                continue
+            pending[mkt].discard(future)
+            if not pending[mkt]:
+                del pending[mkt]
+            if not future.cancelled() and future.exception() is None:
+                result = future.result()
+                if result is not None:
+                    results.append(result)
+
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        # 도중에 회로가 열린 거래소는 거부된 요청의 행이 빠졌으므로 누락으로 표시
+        incomplete |= {mkt for mkt in executors
+                       if mkt in self.breakers and self.breakers[mkt].state != CircuitBreaker.CLOSED}
+        self.save_concurrency_limits()
+        return results, incomplete
+
+    def _deadline_at(self, deadline):
+        deadline = deadline if deadline is not None else self.deadline
+        return time.monotonic() + deadline if deadline else None
+
+    @staticmethod
+    def _reuse_stale_rows(fresh, previous, missing):
+        fresh = fresh.assign(stale=False)
+        if not missing or previous.empty:
+            return fresh
+        previous = previous[previous['exchange'].isin(missing)]
+        if 'exchange' not in fresh.columns:
+            return previous.assign(stale=True).reset_index(drop=True)
+        fetched = set(zip(fresh['exchange'], fresh['symbol']))
+        keep = [(mkt, symbol) not in fetched for mkt, symbol in zip(
+            previous['exchange'], previous['symbol'])]
+        stale = previous[keep].assign(stale=True)
+        if stale.empty:
+            return fresh
+        merged = pd.concat([fresh.astype({'exchange': str, 'symbol': str}),
+                            stale.astype({'exchange': str, 'symbol': str})], ignore_index=True)
+        if isinstance(fresh['exchange'].dtype, pd.CategoricalDtype):
+            merged = merged.astype({'exchange': 'category', 'symbol': 'category'})
+        return merged
 
-    def fetch_funding_rates(self):
-        funding_rates = []
+    def fetch_funding_rates(self, deadline_at=None, exchange_timeout=None):
+        """
+        Returns (rates_version, funding_rates, missing). Concurrent callers share one refresh,
+        and a refresh newer than STAGE_CACHE_TTL is reused.
+        """
+        def fetch():
+            rates, missing = self._fetch_funding_rates(
+                self.snapshot.funding_rates, deadline_at, exchange_timeout)
+            return next(self._rates_versions), rates, missing
+
+        return self.response_cache.get_or_compute(
+            'stage:fetch_funding_rates', fetch, self.STAGE_CACHE_TTL)
+
+    def _fetch_funding_rates(self, previous, deadline_at=None, exchange_timeout=None):
+        jobs = []
+        for mkt, exchange in self.exchanges.items():
+            swap_symbols = [
+                symbol for symbol in exchange.symbols
+                if 'swap' in exchange.markets[symbol].get('type', '').lower()
+            ]
+            jobs.extend((mkt, exchange, symbol) for symbol in swap_symbols)
+        records = FundingRecordBuffer(
+            len(jobs), exchanges=self.exchanges.keys(), symbols=[job[2] for job in jobs])
 
         def fetch_rate(mkt, exchange, symbol):
             try:
-                rate = exchange.fetch_funding_rate(symbol)
-                funding_rate = rate['fundingRate']
-                funding_timestamp = rate.get('fundingTimestamp')
-                funding_datetime = self.convert_timestamp_to_kst(
-                    timestamp=funding_timestamp) if funding_timestamp else 'Unknown'
-                return {
-                    'exchange': mkt,
-                    'symbol': symbol,
-                    'fundingRate': funding_rate,
-                    'fundingDatetime': funding_datetime,
-                }
+                rate = self.call_exchange(mkt, 'fetch_funding_rate', symbol)
+                records.append(mkt, symbol, rate['fundingRate'], rate.get('fundingTimestamp'),
+                               self.parse_funding_interval(rate))
             except Exception:
                 return None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-            for mkt, exchange in self.exchanges.items():
-                swap_symbols = [
-                    symbol for symbol in exchange.symbols
-                    if 'swap' in exchange.markets[symbol].get('type', '').lower()
-                ]
-                for symbol in swap_symbols:
-                    futures.append(executor.submit(
-                        fetch_rate, mkt, exchange, symbol))
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    funding_rates.append(result)
+        _, missing = self._run_jobs(
+            jobs, fetch_rate, deadline_at=deadline_at,
+            exchange_timeout=exchange_timeout or self.exchange_timeout)
 
-        self.funding_rates = pd.DataFrame(funding_rates)
+        funding_rates = self._reuse_stale_rows(records.to_frame(), previous, missing)
         print(
-            f"Fetched {len(self.funding_rates)} funding rates from {len(self.mkts)} exchanges.")
-
-    def get_funding_rates_per_exchange(self):
-        if self.funding_rates.empty:
-            self.fetch_funding_rates()
-        df = self.funding_rates.assign(
-            absFundingRate=self.funding_rates['fundingRate'].abs())
-        self.funding_rates_per_exchange = (
+            f"Fetched {len(records)} funding rates from {len(self.mkts)} exchanges "
+            f"({records.nbytes / 1024:.0f} KiB).")
+        if missing:
+            print(f"Reused previous funding rates for: {', '.join(sorted(missing))}")
+        return funding_rates, frozenset(missing)
+
+    def get_funding_rates_per_exchange(self, funding_rates=None):
+        if funding_rates is None:
+            funding_rates = self._snapshot_with('funding_rates').funding_rates
+        df = funding_rates.assign(
+            absFundingRate=funding_rates['fundingRate'].abs())
+        print(f"Selected top {self.top_n} funding rates per exchange.")
+        return (
             df.sort_values(['exchange', 'absFundingRate'],
                            ascending=[True, False])
-            .groupby('exchange')
+            .groupby('exchange', observed=True)
             .head(self.top_n)
             .drop(columns=['absFundingRate'])
             .reset_index(drop=True)
         )
-        print(f"Selected top {self.top_n} funding rates per exchange.")
 
-    def fetch_additional_data(self):
-        if self.funding_rates_per_exchange.empty:
-            self.get_funding_rates_per_exchange()
-        additional_data = []
+    def fetch_additional_data(self, rates_version, funding_rates_per_exchange, deadline_at=None,
+                              exchange_timeout=None):
+        """
+        Returns (additional_data, missing) for the given per-exchange selection, shared per rates version.
+        """
+        # 펀딩비가 갱신되면 버전이 바뀌어 이전 부가 데이터는 재사용하지 않음
+        return self.response_cache.get_or_compute(
+            ('stage:fetch_additional_data', rates_version),
+            lambda: self._fetch_additional_data(
+                funding_rates_per_exchange, self.snapshot.additional_data, deadline_at, exchange_timeout),
+            self.STAGE_CACHE_TTL)
 
-        def fetch_additional(row):
+    def _fetch_additional_data(self, funding_rates_per_exchange, previous, deadline_at=None, exchange_timeout=None):
+        def fetch_additional(mkt, row):
             try:
-                exchange = self.exchanges.get(row['exchange'])
-                if not exchange:
+                if mkt not in self.exchanges:
                     return None
-                ticker = exchange.fetch_ticker(row['symbol'])
-                order_book = exchange.fetch_order_book(row['symbol'], limit=1)
-                position = 'L' if row['fundingRate'] < 0 else 'S'
-                price = ticker.get('last', 0.0)
-                volume = ticker.get('baseVolume', 0.0)
-                bid = ticker.get('bid', 0.0)
-                ask = ticker.get('ask', 0.0)
-                spread = (
-                    ask - bid) if (bid is not None and ask is not None) else 0.0
-                volume_spread = (
-                    (order_book['asks'][0][1] if order_book['asks'] else 0.0) -
-                    (order_book['bids'][0][1] if order_book['bids'] else 0.0)
-                )
-                ask_bid_ratio = (ask / bid) if bid != 0 else None
-                return {
-                    'exchange': row['exchange'],
-                    'symbol': row['symbol'],
-                    'fundingRate': row['fundingRate'],
-                    'fundingDatetime': row['fundingDatetime'],
-                    'position': position,
-                    'price': price,
-                    'volume': volume,
-                    'bid': bid,
-                    'ask': ask,
-                    'spread': spread,
-                    'ask_bid_ratio': ask_bid_ratio,
-                    'volumeSpread': volume_spread,
-                }
+                ticker = self.call_exchange(mkt, 'fetch_ticker', row['symbol'])
+                order_book = self.call_exchange(
+                    mkt, 'fetch_order_book', row['symbol'], limit=1)
+                return self.build_additional_row(
+                    mkt, row['symbol'], row['fundingRate'],
+                    row['fundingTimestamp'], ticker, order_book)
             except Exception:
                 return None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(fetch_additional, row)
-                       for _, row in self.funding_rates_per_exchange.iterrows()]
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    additional_data.append(result)
-        self.additional_data = pd.DataFrame(additional_data)
+        jobs = [(row['exchange'], row)
+                for _, row in funding_rates_per_exchange.iterrows()]
+        additional_data, missing = self._run_jobs(
+            jobs, fetch_additional, deadline_at=deadline_at,
+            exchange_timeout=exchange_timeout or self.exchange_timeout)
+
+        if missing and not previous.empty:
+            wanted = set(zip(funding_rates_per_exchange['exchange'].astype(str),
+                             funding_rates_per_exchange['symbol'].astype(str)))
+            previous = previous[[key in wanted for key in zip(
+                previous['exchange'], previous['symbol'])]]
         print(
-            f"Fetched additional data for {len(self.additional_data)} symbols.")
+            f"Fetched additional data for {len(additional_data)} symbols.")
+        return self._reuse_stale_rows(pd.DataFrame(additional_data), previous, missing), frozenset(missing)
 
-    def deduplicate_symbols_by_volume(self):
-        if self.additional_data.empty:
-            self.fetch_additional_data()
-        df = self.additional_data.assign(
-            absFundingRate=self.additional_data['fundingRate'].abs())
+    @staticmethod
+    def build_additional_row(mkt, symbol, funding_rate, funding_timestamp, ticker, order_book):
+        position = 'L' if funding_rate < 0 else 'S'
+        price = ticker.get('last', 0.0)
+        volume = ticker.get('baseVolume', 0.0)
+        bid = ticker.get('bid', 0.0)
+        ask = ticker.get('ask', 0.0)
+        spread = (
+            ask - bid) if (bid is not None and ask is not None) else 0.0
+        volume_spread = (
+            (order_book['asks'][0][1] if order_book['asks'] else 0.0) -
+            (order_book['bids'][0][1] if order_book['bids'] else 0.0)
+        )
+        ask_bid_ratio = (ask / bid) if bid else None
+        return {
+            'exchange': mkt,
+            'symbol': symbol,
+            'fundingRate': funding_rate,
+            'fundingTimestamp': int(funding_timestamp or 0),
+            'position': position,
+            'price': price,
+            'volume': volume,
+            'bid': bid,
+            'ask': ask,
+            'spread': spread,
+            'ask_bid_ratio': ask_bid_ratio,
+            'volumeSpread': volume_spread,
+        }
+
+    def deduplicate_symbols_by_volume(self, additional_data=None):
+        if additional_data is None:
+            additional_data = self._snapshot_with('additional_data').additional_data
+        df = additional_data.assign(
+            absFundingRate=additional_data['fundingRate'].abs())
         if df.duplicated(subset=['symbol']).any():
             deduped = (
                 df.sort_values('volume', ascending=False)
@@ -151,9 +417,9 @@ class FundingRateFetcher:
                 .drop(columns=['absFundingRate'])
                 .reset_index(drop=True)
             )
-            self.deduped_top_funding_rates = deduped
             print(
                 f"Deduplicated to top {self.top_n} funding rates based on volume.")
+            return deduped
         else:
             top_n = (
                 df.sort_values('absFundingRate', ascending=False)
@@ -161,17 +427,128 @@ class FundingRateFetcher:
                 .drop(columns=['absFundingRate'])
                 .reset_index(drop=True)
             )
-            self.deduped_top_funding_rates = top_n
             print(
                 f"No duplicate symbols found. Selected top {self.top_n} funding rates by absolute value.")
+            return top_n
+
+    @staticmethod
+    def parse_funding_interval(rate, default=8.0):
+        interval = rate.get('interval')
+        if isinstance(interval, str) and interval.endswith('h'):
+            try:
+                return float(interval[:-1])
+            except ValueError:
+                pass
+        funding_ts = rate.get('fundingTimestamp')
+        next_ts = rate.get('nextFundingTimestamp')
+        if funding_ts and next_ts and next_ts > funding_ts:
+            return (next_ts - funding_ts) / 3_600_000
+        return default
+
+    def normalize_symbol(self, mkt, symbol):
+        return self.symbol_index.canonical(mkt, symbol) or symbol
+
+    def to_canonical_units(self, df):
+        """
+        Rescales prices and sizes of multiplied listings (e.g. 1000PEPE) to one unit of the canonical base,
+        so rows of the same coin from different listings can be compared side by side.
+        """
+        if df.empty:
+            return df
+        multipliers = np.array([self.symbol_index.multiplier(mkt, symbol)
+                                for mkt, symbol in zip(df['exchange'], df['symbol'])], dtype=np.float64)
+        if (multipliers == 1).all():
+            return df
+        prices = {col: pd.to_numeric(df[col], errors='coerce') / multipliers
+                  for col in ('price', 'bid', 'ask', 'spread') if col in df.columns}
+        sizes = {col: pd.to_numeric(df[col], errors='coerce') * multipliers
+                 for col in ('volume', 'volumeSpread') if col in df.columns}
+        return df.assign(**prices, **sizes)
+
+    def get_funding_spread_matrix(self, funding_rates=None):
+        df = funding_rates if funding_rates is not None else self._snapshot_with('funding_rates').funding_rates
+        canonical = [self.normalize_symbol(mkt, symbol)
+                     for mkt, symbol in zip(df['exchange'], df['symbol'])]
+        df = df.assign(
+            canonical=canonical,
+            annualizedRate=df['fundingRate'] * (24 * 365) / df['fundingInterval'])
+        return df.pivot_table(index='canonical', columns='exchange',
+                              values='annualizedRate', aggfunc='mean', observed=True)
+
+    def rank_funding_spreads(self, funding_rates=None):
+        matrix = self.get_funding_spread_matrix(funding_rates)
+        values = matrix.to_numpy(dtype=np.float64)
+        valid = (~np.isnan(values)).sum(axis=1) >= 2
+        values = values[valid]
+        symbols = matrix.index[valid]
+        venues = matrix.columns.to_numpy()
+
+        long_idx = np.argmin(np.where(np.isnan(values), np.inf, values), axis=1)
+        short_idx = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=1)
+        rows = np.arange(len(values))
+        long_rate = values[rows, long_idx]
+        short_rate = values[rows, short_idx]
+        spread = short_rate - long_rate
+
+        order = np.argsort(-spread, kind='stable')
+        funding_spreads = pd.DataFrame({
+            'symbol': symbols[order],
+            'longExchange': venues[long_idx[order]],
+            'shortExchange': venues[short_idx[order]],
+            'longAPR': long_rate[order],
+            'shortAPR': short_rate[order],
+            'spreadAPR': spread[order],
+        })
+        print(
+            f"Ranked funding spreads for {len(funding_spreads)} symbols listed on 2+ exchanges.")
+        return funding_spreads
+
+    def format_spread_dataframe(self, df):
+        df = df.head(self.top_n)
+        return pd.DataFrame({
+            'symb': df['symbol'],
+            'long': df['longExchange'],
+            'short': df['shortExchange'],
+            'L APR (%)': (df['longAPR'] * 100).round(2),
+            'S APR (%)': (df['shortAPR'] * 100).round(2),
+            'spr APR (%)': (df['spreadAPR'] * 100).round(2),
+        }).reset_index(drop=True)
+
+    def refresh(self, mode='top', deadline=None, exchange_timeout=None):
+        """
+        Builds the next snapshot from fresh exchange data and publishes it; returns the published snapshot.
+        """
+        deadline_at = self._deadline_at(deadline)
+        rates_version, funding_rates, missing = self.fetch_funding_rates(deadline_at, exchange_timeout)
+        if mode == 'spread':
+            funding_spreads = self.rank_funding_spreads(funding_rates)
+            snapshot = self._publish(
+                rates_version=rates_version, funding_rates=funding_rates, missing_exchanges=missing,
+                funding_spreads=funding_spreads)
+            print("Final top funding spreads obtained.")
+            return snapshot
+        elif mode != 'top':
+            raise ValueError(f"Unknown run mode: {mode}")
 
-    def run(self):
-        self.fetch_funding_rates()
-        self.get_funding_rates_per_exchange()
-        self.fetch_additional_data()
-        self.deduplicate_symbols_by_volume()
-        self.main_df = self.deduped_top_funding_rates.copy()
-        self.main_df = self.main_df.round({
+        per_exchange = self.get_funding_rates_per_exchange(funding_rates)
+        additional_data, additional_missing = self.fetch_additional_data(
+            rates_version, per_exchange, deadline_at, exchange_timeout)
+        deduped = self.deduplicate_symbols_by_volume(additional_data)
+        snapshot = self._publish(
+            rates_version=rates_version, funding_rates=funding_rates, funding_rates_per_exchange=per_exchange,
+            additional_data=additional_data, deduped_top_funding_rates=deduped,
+            main_df=self.format_top_dataframe(deduped), missing_exchanges=missing | additional_missing)
+        print("Final top funding rates obtained.")
+        return snapshot
+
+    def run(self, mode='top', deadline=None, exchange_timeout=None):
+        snapshot = self.refresh(mode, deadline, exchange_timeout)
+        if mode == 'spread':
+            return self.format_spread_dataframe(snapshot.funding_spreads)
+        return snapshot.main_df
+
+    def format_top_dataframe(self, df):
+        return self.format_dataframe(df.round({
             'fundingRate': 4,
             'price': 4,
             'volume': 4,
@@ -180,18 +557,26 @@ class FundingRateFetcher:
             'spread': 4,
             'ask_bid_ratio': 4,
             'volumeSpread': 4
-        })
-        self.main_df = self.format_dataframe(self.main_df)
-        print("Final top funding rates obtained.")
-        return self.main_df
+        }))
 
     def get_additional_data_by_symbol(self, symbol):
-        if self.additional_data.empty:
-            self.fetch_additional_data()
-        df = self.additional_data[self.additional_data['symbol'] == symbol]
+        additional_data = self._snapshot_with('additional_data').additional_data
+        key = self.symbol_index.resolve(symbol)
+        if key:
+            symbols = self.symbol_index.symbols_for(key)
+            mask = [symb in symbols.get(mkt, ()) for mkt, symb in zip(
+                additional_data['exchange'], additional_data['symbol'])]
+        else:
+            mask = additional_data['symbol'] == symbol
+        df = self.to_canonical_units(additional_data[mask])
         if df.empty:
             print(f"No data found for coin symbol: {symbol}")
             return pd.DataFrame()
+        res = self.format_symbol_data(df)
+        print(f"Data for {symbol}:")
+        return res
+
+    def format_symbol_data(self, df):
         df = df.round({
             'fundingRate': 4,
             'price': 6,
@@ -203,38 +588,36 @@ class FundingRateFetcher:
             'volumeSpread': 4
         })
         res = self.format_dataframe(df.reset_index(drop=True))
-        res = res.rename(columns=self.format_cols)
-        print(f"Data for {symbol}:")
-        return res
+        return res.rename(columns=self.format_cols)
 
-    def convert_timestamp_to_kst(self, timestamp):
-        if timestamp:
-            return datetime.fromtimestamp(timestamp / 1000, tz=pytz.utc).astimezone(self.kst).strftime('%m-%d %H:%M')
-        else:
-            return 'Unknown'
-
-    def format_volume(self, x):
-        try:
-            x = float(x)
-        except (ValueError, TypeError):
-            x = 0.0
-
-        if x >= 1e9:
-            return f"{x/1e9:.2f}B"
-        elif x >= 1e6:
-            return f"{x/1e6:.2f}M"
-        else:
-            return f"{x:.2f}"
+    def convert_timestamps_to_kst(self, timestamps):
+        timestamps = pd.to_numeric(timestamps, errors='coerce')
+        kst = pd.to_datetime(timestamps.where(timestamps > 0), unit='ms', utc=True).dt.tz_convert(self.kst)
+        return kst.dt.strftime('%m-%d %H:%M').fillna('Unknown')
+
+    @staticmethod
+    def format_volumes(volumes):
+        x = pd.to_numeric(volumes, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+        scale = np.select([x >= 1e9, x >= 1e6], [1e9, 1e6], default=1.0)
+        suffix = np.select([x >= 1e9, x >= 1e6], ['B', 'M'], default='')
+        text = np.char.add(np.char.mod('%.2f', x / scale), suffix)
+        return pd.Series(text, index=volumes.index, dtype=object)
 
     def format_dataframe(self, df):
+        # 입력 프레임은 스냅샷과 공유될 수 있으므로 수정하지 않고 새 프레임을 만듦
+        if 'fundingTimestamp' in df.columns:
+            df = df.assign(fundingDatetime=self.convert_timestamps_to_kst(
+                df['fundingTimestamp'])).drop(columns='fundingTimestamp')
+
         if 'fundingRate' in df.columns:
-            df['fundingRate (%)'] = (df['fundingRate'] * 100).round(2)
-            df.drop('fundingRate', axis=1, inplace=True)
+            df = df.assign(**{'fundingRate (%)': (df['fundingRate'] * 100).round(2)}).drop(columns='fundingRate')
 
         if 'volume' in df.columns:
-            df['volume'] = pd.to_numeric(
-                df['volume'], errors='coerce').fillna(0.0)
-            df['volume'] = df['volume'].apply(self.format_volume)
+            df = df.assign(volume=self.format_volumes(df['volume']))
+
+        if 'stale' in df.columns:
+            df = df.assign(exchange=df['exchange'].astype(str).where(
+                ~df['stale'].astype(bool), df['exchange'].astype(str) + '*')).drop(columns='stale')
 
         desired_order = ['exchange', 'symbol', 'fundingRate (%)', 'fundingDatetime', 'position',
                          'price', 'volume', 'bid', 'ask', 'spread', 'ask_bid_ratio', 'volumeSpread']
@@ -263,14 +646,34 @@ class FundingRateFetcher:
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Funding rate fetcher")
+    parser.add_argument('--record', type=str, default=None,
+                        help='Append all exchange traffic to this gzip log')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Serve exchange traffic from a recorded log instead of the network')
+    parser.add_argument('--pace', choices=['fast', 'recorded'], default='fast',
+                        help='Replay as fast as possible or at the recorded request latency')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Speed-up factor for --pace recorded')
+    args = parser.parse_args()
+
     mkts = ['bybit', 'gateio', 'mexc', 'okx']
-    fetcher = FundingRateFetcher(mkts, top_n=10, max_workers=10)
+    fetcher = FundingRateFetcher(mkts, top_n=10, max_workers=10, record_path=args.record,
+                                 replay_path=args.replay, replay_pace=args.pace, replay_speed=args.speed)
     df = fetcher.run()
     print("\nFinal Top Funding Rates:")
     print(df)
 
+    spreads = fetcher.format_spread_dataframe(fetcher.rank_funding_spreads())
+    print("\nTop Cross-Exchange Funding Spreads:")
+    print(spreads)
+
     coin = 'APE/USDT:USDT'
     coin_data = fetcher.get_additional_data_by_symbol(coin)
     if not coin_data.empty:
         print(f"\nFunding Rates for {coin}:")
         print(coin_data)
+
+    fetcher.close()
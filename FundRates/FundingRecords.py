@@ -0,0 +1,67 @@
+import threading
+import numpy as np
+import pandas as pd
+
+
+class FundingRecordBuffer:
+    """
+    Preallocated typed columns for one funding rate snapshot.
+    Worker threads fill the next free row and publish it by bumping `size` under one lock, so rows
+    [0, size) are always complete. `to_frame` copies that prefix, so workers that finish after a deadline
+    never touch a published frame.
+    Exchange and symbol are stored as categorical codes, timestamps as int64 epoch-ms (0 when unknown).
+    """
+
+    def __init__(self, capacity, exchanges, symbols):
+        self.capacity = capacity
+        self.exchange_categories = pd.Index(list(dict.fromkeys(exchanges)))
+        self.symbol_categories = pd.Index(list(dict.fromkeys(symbols)))
+        self._exchange_codes = {
+            name: code for code, name in enumerate(self.exchange_categories)}
+        self._symbol_codes = {
+            name: code for code, name in enumerate(self.symbol_categories)}
+
+        self.exchange = np.empty(capacity, dtype=np.int16)
+        self.symbol = np.empty(capacity, dtype=np.int32)
+        self.funding_rate = np.empty(capacity, dtype=np.float64)
+        self.funding_timestamp = np.empty(capacity, dtype=np.int64)
+        self.funding_interval = np.empty(capacity, dtype=np.float64)
+
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return sum(column[:self.size].nbytes for column in (
+            self.exchange, self.symbol, self.funding_rate, self.funding_timestamp, self.funding_interval))
+
+    def append(self, exchange, symbol, funding_rate, funding_timestamp, funding_interval):
+        exchange_code = self._exchange_codes[exchange]
+        symbol_code = self._symbol_codes[symbol]
+        with self._lock:
+            i = self.size
+            if i >= self.capacity:
+                raise IndexError("FundingRecordBuffer is full.")
+            self.exchange[i] = exchange_code
+            self.symbol[i] = symbol_code
+            self.funding_rate[i] = np.nan if funding_rate is None else funding_rate
+            self.funding_timestamp[i] = funding_timestamp or 0
+            self.funding_interval[i] = funding_interval
+            self.size = i + 1
+
+    def to_frame(self):
+        with self._lock:
+            n = self.size
+            columns = {
+                'exchange': self.exchange[:n].copy(),
+                'symbol': self.symbol[:n].copy(),
+                'fundingRate': self.funding_rate[:n].copy(),
+                'fundingTimestamp': self.funding_timestamp[:n].copy(),
+                'fundingInterval': self.funding_interval[:n].copy(),
+            }
+        columns['exchange'] = pd.Categorical.from_codes(columns['exchange'], categories=self.exchange_categories)
+        columns['symbol'] = pd.Categorical.from_codes(columns['symbol'], categories=self.symbol_categories)
+        return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,48 @@
+import time
+import pandas as pd
+
+
+class FundingSnapshot:
+    """
+    Immutable, versioned result of the FundingRateFetcher pipeline.
+    Attributes cannot be reassigned and the pipeline never mutates a frame after publishing it, so readers
+    hold a snapshot by reference while the next one is being built; `evolve()` derives the next version.
+    Frames are shared between versions, so readers must treat them as read-only. Frames derived from the
+    funding rates are dropped when `rates_version` changes unless the same `evolve()` call supplies them.
+    """
+
+    FRAMES = ('funding_rates', 'funding_rates_per_exchange', 'additional_data',
+              'deduped_top_funding_rates', 'funding_spreads', 'main_df')
+    DERIVED_FRAMES = FRAMES[1:]
+
+    def __init__(self, version=0, created_at=None, rates_version=0, missing_exchanges=(), **frames):
+        unknown = set(frames) - set(self.FRAMES)
+        if unknown:
+            raise TypeError(f"Unknown snapshot fields: {', '.join(sorted(unknown))}")
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'created_at', created_at if created_at is not None else time.time())
+        object.__setattr__(self, 'rates_version', rates_version)
+        object.__setattr__(self, 'missing_exchanges', frozenset(missing_exchanges))
+        for name in self.FRAMES:
+            frame = frames.get(name)
+            object.__setattr__(self, name, frame if frame is not None else pd.DataFrame())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"FundingSnapshot is immutable, use evolve() to change {name}.")
+
+    def __delattr__(self, name):
+        raise AttributeError("FundingSnapshot is immutable.")
+
+    def evolve(self, **changes):
+        fields = {name: getattr(self, name) for name in self.FRAMES}
+        if changes.get('rates_version', self.rates_version) != self.rates_version:
+            for name in self.DERIVED_FRAMES:
+                fields[name] = None
+        fields['missing_exchanges'] = self.missing_exchanges
+        fields['rates_version'] = self.rates_version
+        fields.update(changes)
+        return FundingSnapshot(version=self.version + 1, **fields)
+
+    def __repr__(self):
+        return (f"FundingSnapshot(version={self.version}, rates={len(self.funding_rates)}, "
+                f"additional={len(self.additional_data)}, missing={sorted(self.missing_exchanges)})")
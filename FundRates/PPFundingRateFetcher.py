@@ -4,8 +4,8 @@ from FundingRateFetcher import *
 
 
 class PPFundingRateFetcher(FundingRateFetcher):
-    def __init__(self, mkts, top_n=10, max_workers=20):
-        super().__init__(mkts, top_n, max_workers)
+    def __init__(self, mkts, top_n=10, max_workers=20, **kwargs):
+        super().__init__(mkts, top_n, max_workers, **kwargs)
 
     def format_dataframe_as_text(self, df: pd.DataFrame):
         formatted_rows = []
@@ -22,28 +22,56 @@ class PPFundingRateFetcher(FundingRateFetcher):
             'ask': 8,
             'spr': 8,
             'ab_r': 8,
-            'volspr': 8
+            'volspr': 8,
+            'long': 8,
+            'short': 8,
+            'L APR (%)': 10,
+            'S APR (%)': 10,
+            'spr APR (%)': 11
         }
 
-        headers = [f"{col:<{col_widths[col]}}" for col in df.columns]
+        headers = [f"{col:<{col_widths.get(col, 10)}}" for col in df.columns]
         formatted_rows.append(" | ".join(headers))
 
         for _, row in df.iterrows():
             formatted_row = []
             for col in df.columns:
                 value = row[col] if pd.notna(row[col]) else ''
-                formatted_row.append(f"{str(value):<{col_widths[col]}}")
+                formatted_row.append(f"{str(value):<{col_widths.get(col, 10)}}")
             formatted_rows.append(" | ".join(formatted_row))
 
         return "\n".join(formatted_rows)
 
     def get_funding_rate_mdstr(self):
         try:
-            res = self.run()
+            snapshot = self.refresh()
+            table_text = self.format_dataframe_as_text(snapshot.main_df)
+            return f"```\n{table_text}\n```{self.missing_exchanges_note(snapshot.missing_exchanges)}"
+        except Exception as e:
+            return f"Error generating funding rate data: {str(e)}"
+
+    def missing_exchanges_note(self, missing_exchanges=None):
+        if missing_exchanges is None:
+            missing_exchanges = self.snapshot.missing_exchanges
+        note = ""
+        if missing_exchanges:
+            note += f"\n\\* stale: {', '.join(sorted(missing_exchanges))} missed the deadline or is tripped, previous values shown."
+        for line in self.breaker_summary(only_unhealthy=True):
+            note += f"\nBreaker {line}"
+        return note
+
+    def get_funding_spread_mdstr(self, refresh=False):
+        try:
+            snapshot = self.snapshot
+            if refresh or snapshot.funding_rates.empty:
+                funding_spreads = self.refresh(mode='spread').funding_spreads
+            else:
+                funding_spreads = self.rank_funding_spreads(snapshot.funding_rates)
+            res = self.format_spread_dataframe(funding_spreads)
             table_text = self.format_dataframe_as_text(res)
             return f"```\n{table_text}\n```"
         except Exception as e:
-            return f"Error generating funding rate data: {str(e)}"
+            return f"Error generating funding spread data: {str(e)}"
 
     def get_additional_data_by_symbol_mdstr(self, symbol):
         try:
@@ -59,3 +87,4 @@ if __name__ == "__main__":
     fetcher = PPFundingRateFetcher(mkts, top_n=10, max_workers=10)
     text = fetcher.get_funding_rate_mdstr()
     print(text)
+    fetcher.close()
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import CommonPath  # noqa: F401
+from common.circuit_breaker import CircuitOpenError
+from common.request_policy import RequestPolicyBase
+
+
+class RequestPolicy(RequestPolicyBase):
+    """
+    Retry and hedging policy for idempotent sync exchange reads; hedged requests run on a shared thread pool.
+    """
+
+    def __init__(self, hedge_workers=256, **kwargs):
+        super().__init__(**kwargs)
+        self.executor = ThreadPoolExecutor(
+            max_workers=hedge_workers, thread_name_prefix='hedge')
+
+    def execute(self, key, fn, *args, idempotent=True, retry_on=None, **kwargs):
+        if not idempotent:
+            return fn(*args, **kwargs)
+        retry_on = retry_on or self.retry_on
+        attempt = 0
+        while True:
+            try:
+                return self._hedged(key, fn, *args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except retry_on:
+                if attempt >= self.max_retries:
+                    raise
+                self._count('retries')
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+
+    def _timed(self, key, fn, *args, **kwargs):
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        self.latency.observe(key, time.monotonic() - start)
+        return result
+
+    def _hedged(self, key, fn, *args, **kwargs):
+        threshold = self.hedge_threshold(key)
+        if threshold is None:
+            return self._timed(key, fn, *args, **kwargs)
+
+        primary = self.executor.submit(self._timed, key, fn, *args, **kwargs)
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self.hedge_allowed():
+            return primary.result()
+
+        hedge = self.executor.submit(self._timed, key, fn, *args, **kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedges_won')
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
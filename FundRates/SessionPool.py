@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import CommonPath  # noqa: F401
+from common.session_pool import ConnectionStats, api_hosts
+
+
+connection_stats = ConnectionStats()
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        connection_stats.record_new_connection(self.host)
+        return super()._new_conn()
+
+    def urlopen(self, method, url, *args, **kwargs):
+        connection_stats.record_request(self.host)
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        connection_stats.record_new_connection(self.host)
+        return super()._new_conn()
+
+    def urlopen(self, method, url, *args, **kwargs):
+        connection_stats.record_request(self.host)
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+class SessionPool:
+    """
+    Keep-alive requests sessions shared by every ccxt instance of the same exchange.
+    Each host of an exchange gets a connection pool of `pool_size` connections, pools only ever grow,
+    and sessions outlive fetcher rebuilds because they are held by the module-level `session_pool`.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.pool_sizes = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, key, pool_size):
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                self.sessions[key] = session
+            if pool_size > self.pool_sizes.get(key, 0):
+                adapter = CountingHTTPAdapter(
+                    pool_connections=8, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self.pool_sizes[key] = pool_size
+            return session
+
+    api_hosts = staticmethod(api_hosts)
+
+    def warm(self, key, exchange, connections=4, timeout=5):
+        session = self.sessions[key]
+        targets = [host for host in self.api_hosts(exchange)
+                   for _ in range(connections)]
+
+        def touch(url):
+            try:
+                session.head(url, timeout=timeout)
+            except requests.RequestException:
+                pass
+
+        with ThreadPoolExecutor(max_workers=max(min(len(targets), 32), 1)) as executor:
+            list(executor.map(touch, targets))
+        return len(targets)
+
+
+session_pool = SessionPool()
@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import time
+
+
+MULTIPLIER_PATTERN = re.compile(r'^(1(?:0{2,})|1M)(?=[A-Z0-9]{2,}$)')
+
+
+def split_multiplier(base):
+    """
+    Splits a ccxt base currency into (canonical base, price multiplier),
+    e.g. '1000PEPE' -> ('PEPE', 1000), '1MBABYDOGE' -> ('BABYDOGE', 1000000), 'kPEPE' -> ('PEPE', 1000).
+    """
+    if not base:
+        return base, 1
+    if base.startswith('k') and base[1:].isupper() and len(base) > 2:
+        return base[1:], 1000
+    match = MULTIPLIER_PATTERN.match(base)
+    if not match:
+        return base, 1
+    prefix = match.group(1)
+    multiplier = 1_000_000 if prefix == '1M' else int(prefix)
+    return base[len(prefix):], multiplier
+
+
+class SymbolIndex:
+    """
+    Precomputed cross-exchange index of swap markets keyed on canonical 'BASE/QUOTE:SETTLE'.
+    `entries[key][exchange]` lists that exchange's symbols with their multiplier and contract size, ordered by
+    multiplier, so an exchange listing both PEPE and 1000PEPE keeps both. `canonical_by_symbol[(exchange, symbol)]`
+    maps back, so both directions are O(1) dict lookups.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        for by_exchange in self.entries.values():
+            for mkt, listed in by_exchange.items():
+                # 예전 캐시는 거래소별로 항목 하나만 저장
+                if isinstance(listed, dict):
+                    by_exchange[mkt] = [listed]
+        self.canonical_by_symbol = {
+            (mkt, entry['symbol']): key
+            for key, by_exchange in self.entries.items()
+            for mkt, listed in by_exchange.items()
+            for entry in listed
+        }
+
+    @classmethod
+    def build(cls, exchanges):
+        entries = {}
+        for mkt, exchange in exchanges.items():
+            for symbol, market in exchange.markets.items():
+                if not market.get('swap'):
+                    continue
+                base, multiplier = split_multiplier(market.get('base'))
+                quote = market.get('quote')
+                settle = market.get('settle') or quote
+                key = f"{base}/{quote}:{settle}"
+                entries.setdefault(key, {}).setdefault(mkt, []).append({
+                    'symbol': symbol,
+                    'multiplier': multiplier,
+                    'contractSize': market.get('contractSize') or 1.0,
+                    'linear': bool(market.get('linear', True)),
+                })
+        for by_exchange in entries.values():
+            for listed in by_exchange.values():
+                listed.sort(key=lambda entry: entry['multiplier'])
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def canonical(self, mkt, symbol):
+        return self.canonical_by_symbol.get((mkt, symbol))
+
+    def multiplier(self, mkt, symbol):
+        key = self.canonical(mkt, symbol)
+        if not key:
+            return 1
+        return next(entry['multiplier'] for entry in self.entries[key][mkt] if entry['symbol'] == symbol)
+
+    def resolve(self, query):
+        """
+        Maps user input ('PEPE', '1000pepe', 'PEPE/USDT', '1000PEPE/USDT:USDT') to a canonical key.
+        """
+        query = query.strip()
+        head, _, settle = query.partition(':')
+        base, _, quote = head.partition('/')
+        base, _ = split_multiplier(base if base.startswith('k') else base.upper())
+        quote = (quote or 'USDT').upper()
+        settle = (settle or quote).upper()
+        key = f"{base.upper()}/{quote}:{settle}"
+        return key if key in self.entries else None
+
+    def symbols_for(self, key):
+        """
+        Returns {exchange: [symbols]} for a canonical key, lowest multiplier first.
+        """
+        return {mkt: [entry['symbol'] for entry in listed] for mkt, listed in self.entries.get(key, {}).items()}
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.entries, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as file:
+            return cls(json.load(file))
+
+
+class MarketCache:
+    """
+    Disk cache of `load_markets` results per exchange, stored with the symbol index built from them.
+    """
+
+    def __init__(self, cache_dir='./cache', max_age=6 * 3600):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def markets_path(self, mkt):
+        return os.path.join(self.cache_dir, f"markets_{mkt}.json")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.cache_dir, "symbol_index.json")
+
+    def is_fresh(self, path):
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.max_age
+
+    def load_markets(self, mkt, exchange):
+        path = self.markets_path(mkt)
+        if self.is_fresh(path):
+            try:
+                with open(path, 'r') as file:
+                    cached = json.load(file)
+                exchange.set_markets(cached['markets'], cached.get('currencies'))
+                return True
+            except (OSError, ValueError, KeyError):
+                pass
+        exchange.load_markets()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({'markets': exchange.markets,
+                       'currencies': exchange.currencies}, file, default=str)
+        os.replace(tmp_path, path)
+        return False
+
+    def load_index(self, exchanges, from_cache):
+        if from_cache and self.is_fresh(self.index_path):
+            try:
+                index = SymbolIndex.load(self.index_path)
+                if all(any(mkt in by_exchange for by_exchange in index.entries.values()) for mkt in exchanges):
+                    return index
+            except (OSError, ValueError):
+                pass
+        index = SymbolIndex.build(exchanges)
+        index.save(self.index_path)
+        return index
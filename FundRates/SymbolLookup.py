@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SymbolLookup:
+    """
+    On-demand per-symbol lookup across every exchange of a fetcher.
+    Ticker, order book and funding rate are requested in parallel off the event loop.
+    Results are kept for `ttl` seconds in the fetcher's shared response cache, which also coalesces
+    concurrent lookups of the same symbol and the individual exchange reads behind them.
+    Every listing of the coin is included (e.g. PEPE and 1000PEPE) with prices and sizes in canonical units.
+    """
+
+    def __init__(self, fetcher, ttl=15.0, max_workers=16):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='symbol-lookup')
+
+    def normalize_query(self, symbol):
+        return self.fetcher.symbol_index.resolve(symbol) or symbol.strip().upper()
+
+    async def lookup(self, symbol):
+        key = self.normalize_query(symbol)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.fetcher.response_cache.get_or_compute,
+            ('symbol', key), lambda: self._lookup_all(key), self.ttl)
+
+    def _lookup_all(self, query):
+        symbols = self.fetcher.symbol_index.symbols_for(query)
+        call = self.fetcher.call_exchange
+        requests = {
+            (mkt, symbol): (
+                self.executor.submit(call, mkt, 'fetch_funding_rate', symbol),
+                self.executor.submit(call, mkt, 'fetch_ticker', symbol),
+                self.executor.submit(call, mkt, 'fetch_order_book', symbol, limit=1),
+            )
+            for mkt, listed in symbols.items() if mkt in self.fetcher.exchanges
+            for symbol in listed
+        }
+        rows = [self._build_row(mkt, symbol, futures) for (mkt, symbol), futures in requests.items()]
+        rows = [row for row in rows if row]
+        logging.info(
+            f"Symbol lookup for {query}: {len(rows)}/{len(self.fetcher.exchanges)} exchanges.")
+        return self.fetcher.to_canonical_units(pd.DataFrame(rows))
+
+    def _build_row(self, mkt, symbol, futures):
+        try:
+            rate, ticker, order_book = (future.result() for future in futures)
+        except Exception as e:
+            logging.warning(f"Symbol lookup failed on {mkt} {symbol}: {e}")
+            return None
+
+        return self.fetcher.build_additional_row(
+            mkt, symbol, rate['fundingRate'], rate.get('fundingTimestamp'), ticker, order_book)
+
+    async def lookup_mdstr(self, symbol):
+        try:
+            df = await self.lookup(symbol)
+            if df.empty:
+                return f"Error: no data found for symbol: {symbol}"
+            res = self.fetcher.format_symbol_data(df)
+            table_text = self.fetcher.format_dataframe_as_text(res)
+            return f"```\n{table_text}\n```"
+        except Exception as e:
+            return f"Error generating additional symbol data: {str(e)}"
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+import time
+
+import ccxt
+import CommonPath  # noqa: F401
+from common.traffic_log import (TrafficLog, RecordedEntries, is_recorded, new_entry, markets_result,
+                                raise_recorded_error)
+
+
+class RecordingExchange:
+    """
+    Proxy around a sync ccxt exchange that writes every recorded call (arguments, result or error, timing) to a TrafficLog.
+    Everything else, including attribute assignment, passes through to the wrapped exchange.
+    """
+
+    def __init__(self, exchange, log):
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'log', log)
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if not callable(attr) or not is_recorded(name):
+            return attr
+
+        def recorded(*args, **kwargs):
+            entry = new_entry(self.exchange.id, name, args, kwargs)
+            start = time.monotonic()
+            try:
+                result = attr(*args, **kwargs)
+            except ccxt.BaseError as e:
+                entry.update(elapsed=time.monotonic() - start,
+                             error={'type': type(e).__name__, 'message': str(e)})
+                self.log.write(entry)
+                raise
+            if name == 'load_markets':
+                result = markets_result(self.exchange)
+            entry.update(elapsed=time.monotonic() - start, result=result)
+            self.log.write(entry)
+            return self.exchange.markets if name == 'load_markets' else result
+        return recorded
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
+
+    def record_markets(self):
+        """
+        Logs markets that were loaded without a request (e.g. from the disk cache) so replays can restore them.
+        """
+        entry = new_entry(self.exchange.id, 'load_markets', [], {})
+        entry.update(elapsed=0.0, result=markets_result(self.exchange))
+        self.log.write(entry)
+
+
+class ReplayExchange:
+    """
+    Serves recorded responses for one sync exchange instead of making requests.
+    With pace='recorded' each call takes its recorded duration divided by `speed`; with pace='fast'
+    responses return immediately.
+    """
+
+    def __init__(self, exchange, path, pace='fast', speed=1.0):
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'pace', pace)
+        object.__setattr__(self, 'speed', speed)
+        object.__setattr__(self, 'entries', RecordedEntries(exchange.id, path))
+
+    @property
+    def served(self):
+        return self.entries.served
+
+    def next_entry(self, name, args, kwargs):
+        return self.entries.next_entry(name, args, kwargs)
+
+    def remaining(self):
+        return self.entries.remaining()
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if not callable(attr) or not is_recorded(name):
+            return attr
+
+        def replayed(*args, **kwargs):
+            entry = self.next_entry(name, args, kwargs)
+            if self.pace == 'recorded':
+                time.sleep(entry.get('elapsed', 0.0) / self.speed)
+            raise_recorded_error(entry)
+            if name == 'load_markets':
+                self.exchange.set_markets(entry['result']['markets'], entry['result'].get('currencies'))
+                return self.exchange.markets
+            return entry['result']
+        return replayed
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+import pytz
+
+from BroadcastTiming import RefreshDurationEstimator, BroadcastMetrics
+from BroadcastScheduler import BroadcastScheduler
+
+KST = pytz.timezone('Asia/Seoul')
+
+
+def test_first_sample_replaces_initial_guess():
+    estimator = RefreshDurationEstimator(initial=60.0, k=0.0, margin=0.0, min_lead=0.0)
+    estimator.observe(20.0)
+    assert estimator.mean == 20.0
+    assert estimator.lead_time() == 20.0
+
+
+def test_estimate_tracks_slower_refreshes():
+    estimator = RefreshDurationEstimator(initial=60.0, alpha=0.5, k=2.0, margin=5.0)
+    for duration in (20.0, 20.0, 40.0):
+        estimator.observe(duration)
+    assert estimator.mean == pytest.approx(30.0)
+    assert estimator.var > 0
+    assert estimator.lead_time() > estimator.mean + estimator.margin
+
+
+def test_lead_time_is_clamped():
+    estimator = RefreshDurationEstimator(min_lead=10.0, max_lead=100.0)
+    estimator.observe(1.0)
+    assert estimator.lead_time() == 10.0
+    estimator.observe(10_000.0)
+    assert estimator.lead_time() == 100.0
+
+
+def test_metrics_summary():
+    metrics = BroadcastMetrics(maxlen=2)
+    assert metrics.summary() == "No scheduled broadcasts recorded yet."
+    boundary = KST.localize(datetime(2026, 1, 1, 9, 30))
+    for lead in (5.0, -2.0, 3.0):
+        metrics.record(boundary, 30.0, lead, 0.01)
+    assert len(metrics.records) == 2
+    assert "Late snapshots: 1" in metrics.summary()
+
+
+def test_next_boundary():
+    scheduler = BroadcastScheduler(None, None, RefreshDurationEstimator(), BroadcastMetrics())
+    now = KST.localize(datetime(2026, 1, 1, 9, 29, 59))
+    assert scheduler.next_boundary(now) == KST.localize(datetime(2026, 1, 1, 9, 30))
+    assert scheduler.next_boundary(KST.localize(datetime(2026, 1, 1, 23, 45))) == \
+        KST.localize(datetime(2026, 1, 2, 0, 0))
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.jobs_by_name = {}
+
+    def get_jobs_by_name(self, name):
+        return []
+
+    def run_once(self, callback, when, name, data=None):
+        self.jobs_by_name[name] = data
+
+
+def scheduler_with(refresh):
+    sent = []
+
+    async def broadcast(context):
+        sent.append(context)
+
+    scheduler = BroadcastScheduler(refresh, broadcast, RefreshDurationEstimator(), BroadcastMetrics())
+    scheduler.job_queue = FakeJobQueue()
+    return scheduler, sent
+
+
+def context(boundary):
+    return SimpleNamespace(job=SimpleNamespace(data=boundary))
+
+
+def test_overrun_broadcasts_once_for_its_boundary():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def refresh():
+            await release.wait()
+            return 1.0
+
+        scheduler, sent = scheduler_with(refresh)
+        first = KST.localize(datetime(2026, 1, 1, 9, 30))
+        second = KST.localize(datetime(2026, 1, 1, 10, 0))
+        await scheduler._prewarm(context(first))
+        await scheduler._broadcast(context(first))
+        # 다음 pre-warm은 건너뛰고 다음 broadcast는 이전 refresh를 다시 보내지 않음
+        await scheduler._prewarm(context(second))
+        await scheduler._broadcast(context(second))
+        release.set()
+        await asyncio.sleep(0.01)
+        return scheduler, sent
+
+    scheduler, sent = asyncio.run(scenario())
+    assert len(sent) == 1
+    assert scheduler.skipped_refreshes == 1
+    assert [record['boundary'].minute for record in scheduler.metrics.records] == [30]
+
+
+def test_skipped_prewarm_does_not_resend_old_snapshot():
+    async def scenario():
+        async def refresh():
+            return 1.0
+
+        scheduler, sent = scheduler_with(refresh)
+        first = KST.localize(datetime(2026, 1, 1, 9, 30))
+        await scheduler._prewarm(context(first))
+        await asyncio.sleep(0)
+        await scheduler._broadcast(context(first))
+        await scheduler._broadcast(context(KST.localize(datetime(2026, 1, 1, 10, 0))))
+        return sent
+
+    assert len(asyncio.run(scenario())) == 1
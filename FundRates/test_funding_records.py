@@ -0,0 +1,54 @@
+import threading
+
+import numpy as np
+import pytest
+
+from FundingRecords import FundingRecordBuffer
+
+
+def test_to_frame_types_and_values():
+    buffer = FundingRecordBuffer(4, exchanges=['okx', 'bybit', 'okx'], symbols=['BTC/USDT:USDT', 'ETH/USDT:USDT'])
+    buffer.append('okx', 'BTC/USDT:USDT', 0.0001, 1700000000000, 8.0)
+    buffer.append('bybit', 'ETH/USDT:USDT', None, None, 4.0)
+    df = buffer.to_frame()
+    assert len(buffer) == 2
+    assert df['exchange'].tolist() == ['okx', 'bybit']
+    assert list(df['exchange'].cat.categories) == ['okx', 'bybit']
+    assert df['symbol'].tolist() == ['BTC/USDT:USDT', 'ETH/USDT:USDT']
+    assert np.isnan(df['fundingRate'][1])
+    assert df['fundingTimestamp'].tolist() == [1700000000000, 0]
+    assert df['fundingTimestamp'].dtype == np.int64
+
+
+def test_frame_is_a_copy():
+    buffer = FundingRecordBuffer(2, exchanges=['okx'], symbols=['BTC/USDT:USDT'])
+    buffer.append('okx', 'BTC/USDT:USDT', 0.0001, 1, 8.0)
+    df = buffer.to_frame()
+    buffer.append('okx', 'BTC/USDT:USDT', 0.0002, 2, 8.0)
+    assert len(df) == 1
+    assert df['fundingRate'].tolist() == [0.0001]
+
+
+def test_capacity():
+    buffer = FundingRecordBuffer(1, exchanges=['okx'], symbols=['BTC/USDT:USDT'])
+    buffer.append('okx', 'BTC/USDT:USDT', 0.0001, 1, 8.0)
+    with pytest.raises(IndexError):
+        buffer.append('okx', 'BTC/USDT:USDT', 0.0001, 1, 8.0)
+    with pytest.raises(KeyError):
+        FundingRecordBuffer(1, exchanges=['okx'], symbols=[]).append('okx', 'X', 0.0, 1, 8.0)
+
+
+def test_concurrent_appends():
+    symbols = [f"S{i}/USDT:USDT" for i in range(1000)]
+    buffer = FundingRecordBuffer(len(symbols), exchanges=['okx'], symbols=symbols)
+
+    def worker(chunk):
+        for symbol in chunk:
+            buffer.append('okx', symbol, 0.0001, 1, 8.0)
+
+    threads = [threading.Thread(target=worker, args=(symbols[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(buffer.to_frame()['symbol'].tolist()) == sorted(symbols)
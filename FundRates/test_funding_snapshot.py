@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from FundingSnapshot import FundingSnapshot
+from PPFundingRateFetcher import PPFundingRateFetcher
+
+
+def frame(value):
+    return pd.DataFrame({'value': [value]})
+
+
+def test_snapshot_is_immutable():
+    snapshot = FundingSnapshot()
+    with pytest.raises(AttributeError):
+        snapshot.main_df = frame(1)
+    with pytest.raises(TypeError):
+        FundingSnapshot(unknown=frame(1))
+
+
+def test_derived_frames_are_dropped_with_new_rates():
+    snapshot = FundingSnapshot(rates_version=1, funding_rates=frame(1), additional_data=frame(1),
+                               main_df=frame(1))
+    same_rates = snapshot.evolve(funding_spreads=frame(2))
+    assert same_rates.version == 1
+    assert same_rates.main_df is snapshot.main_df and not same_rates.funding_spreads.empty
+
+    new_rates = same_rates.evolve(rates_version=2, funding_rates=frame(3), funding_spreads=frame(3))
+    assert new_rates.funding_spreads['value'].tolist() == [3]
+    assert new_rates.main_df.empty and new_rates.additional_data.empty
+
+
+def spread_fetcher(snapshot):
+    fetcher = PPFundingRateFetcher.__new__(PPFundingRateFetcher)
+    fetcher.top_n = 10
+    fetcher.snapshot = snapshot
+    fetcher._publish_lock = threading.Lock()
+    fetcher.refreshes = []
+    fetcher.rank_funding_spreads = lambda funding_rates: pd.DataFrame({
+        'symbol': ['BTC/USDT:USDT'], 'longExchange': ['bybit'], 'shortExchange': ['okx'],
+        'longAPR': [0.1], 'shortAPR': [0.2], 'spreadAPR': [0.1]})
+
+    def refresh(mode='top'):
+        fetcher.refreshes.append(mode)
+        return fetcher._publish(rates_version=snapshot.rates_version + 1, funding_rates=frame(1),
+                                funding_spreads=fetcher.rank_funding_spreads(None))
+
+    fetcher.refresh = refresh
+    return fetcher
+
+
+def test_spread_reuses_published_rates():
+    main_df = frame('top')
+    fetcher = spread_fetcher(FundingSnapshot(rates_version=1, funding_rates=frame(1), main_df=main_df))
+    assert 'BTC/USDT:USDT' in fetcher.get_funding_spread_mdstr()
+    assert fetcher.refreshes == []
+    assert fetcher.snapshot.main_df is main_df
+
+
+def test_spread_without_rates_fetches_rates_only():
+    fetcher = spread_fetcher(FundingSnapshot())
+    assert 'BTC/USDT:USDT' in fetcher.get_funding_spread_mdstr()
+    assert fetcher.refreshes == ['spread']
+    assert fetcher.snapshot.main_df.empty
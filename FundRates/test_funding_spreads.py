@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from SymbolIndex import SymbolIndex
+from FundingRateFetcher import FundingRateFetcher
+
+
+def fetcher():
+    fetcher = FundingRateFetcher.__new__(FundingRateFetcher)
+    fetcher.top_n = 10
+    fetcher.symbol_index = SymbolIndex({
+        'PEPE/USDT:USDT': {
+            'bybit': [{'symbol': '1000PEPE/USDT:USDT', 'multiplier': 1000}],
+            'okx': [{'symbol': 'PEPE/USDT:USDT', 'multiplier': 1}],
+        },
+    })
+    return fetcher
+
+
+def funding_rates(rows):
+    return pd.DataFrame(rows, columns=['exchange', 'symbol', 'fundingRate', 'fundingInterval'])
+
+
+def test_rank_funding_spreads():
+    df = funding_rates([
+        ('okx', 'BTC/USDT:USDT', 0.0001, 8.0),
+        ('bybit', 'BTC/USDT:USDT', -0.0001, 8.0),
+        ('gateio', 'BTC/USDT:USDT', 0.0002, 4.0),
+        ('okx', 'ETH/USDT:USDT', 0.0001, 8.0),
+        ('bybit', 'ETH/USDT:USDT', 0.0001, 8.0),
+        ('okx', 'SOL/USDT:USDT', 0.0005, 8.0),
+        ('okx', 'XRP/USDT:USDT', np.nan, 8.0),
+        ('bybit', 'XRP/USDT:USDT', 0.0001, 8.0),
+    ])
+    ranked = fetcher().rank_funding_spreads(df)
+    assert ranked['symbol'].tolist() == ['BTC/USDT:USDT', 'ETH/USDT:USDT']
+    btc = ranked.iloc[0]
+    assert (btc['longExchange'], btc['shortExchange']) == ('bybit', 'gateio')
+    assert btc['longAPR'] == pytest.approx(-0.0001 * 3 * 365)
+    assert btc['shortAPR'] == pytest.approx(0.0002 * 6 * 365)
+    assert btc['spreadAPR'] == pytest.approx(btc['shortAPR'] - btc['longAPR'])
+    assert ranked.iloc[1]['spreadAPR'] == 0
+
+
+def test_listings_are_matched_on_canonical_symbol():
+    df = funding_rates([
+        ('bybit', '1000PEPE/USDT:USDT', -0.0002, 8.0),
+        ('okx', 'PEPE/USDT:USDT', 0.0003, 8.0),
+    ])
+    ranked = fetcher().rank_funding_spreads(df)
+    assert ranked['symbol'].tolist() == ['PEPE/USDT:USDT']
+    assert (ranked.iloc[0]['longExchange'], ranked.iloc[0]['shortExchange']) == ('bybit', 'okx')
+
+
+def test_format_spread_dataframe_keeps_top_n():
+    spreads = fetcher()
+    spreads.top_n = 1
+    df = funding_rates([
+        ('okx', 'BTC/USDT:USDT', 0.0001, 8.0),
+        ('bybit', 'BTC/USDT:USDT', -0.0001, 8.0),
+        ('okx', 'ETH/USDT:USDT', 0.0001, 8.0),
+        ('bybit', 'ETH/USDT:USDT', 0.0001, 8.0),
+    ])
+    table = spreads.format_spread_dataframe(spreads.rank_funding_spreads(df))
+    assert table.to_dict('records') == [{'symb': 'BTC/USDT:USDT', 'long': 'bybit', 'short': 'okx',
+                                         'L APR (%)': -10.95, 'S APR (%)': 10.95, 'spr APR (%)': 21.9}]
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+import ResponseCache as response_cache
+from ResponseCache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_concurrent_callers_share_one_call():
+    cache = ResponseCache()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'rates'
+
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute('key', fetch, 0)))
+    owner.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute('key', fetch, 0)))
+               for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    while cache.coalesced < 3:
+        pass
+    release.set()
+    for thread in [owner] + waiters:
+        thread.join(5)
+    assert results == ['rates'] * 4
+    assert len(calls) == 1
+    assert cache.misses == 1 and cache.coalesced == 3
+
+
+def test_failures_are_not_cached(clock):
+    cache = ResponseCache()
+
+    def fail():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', fail, 10)
+    assert cache.get_or_compute('key', lambda: 'ok', 10) == 'ok'
+
+
+def test_ttl_expiry(clock):
+    cache = ResponseCache()
+    assert cache.get_or_compute('key', lambda: 1, 5) == 1
+    clock[0] += 4.9
+    assert cache.get_or_compute('key', lambda: 2, 5) == 1
+    clock[0] += 0.2
+    assert cache.get_or_compute('key', lambda: 3, 5) == 3
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_lru_eviction(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.get_or_compute('a', lambda: 'a', 60)
+    cache.get_or_compute('b', lambda: 'b', 60)
+    cache.get_or_compute('a', lambda: 'stale', 60)
+    cache.get_or_compute('c', lambda: 'c', 60)
+    assert cache.evictions == 1
+    assert cache.get_or_compute('a', lambda: 'new', 60) == 'a'
+    assert cache.get_or_compute('b', lambda: 'new', 60) == 'new'
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from SymbolIndex import SymbolIndex, split_multiplier
+from FundingRateFetcher import FundingRateFetcher
+
+
+def swap(symbol, base, contract_size=1.0):
+    return {'symbol': symbol, 'base': base, 'quote': 'USDT', 'settle': 'USDT', 'swap': True,
+            'linear': True, 'contractSize': contract_size}
+
+
+def build_index():
+    exchanges = {
+        'bybit': SimpleNamespace(markets={
+            'PEPE/USDT:USDT': swap('PEPE/USDT:USDT', 'PEPE'),
+            '1000PEPE/USDT:USDT': swap('1000PEPE/USDT:USDT', '1000PEPE'),
+            'BTC/USDT': {'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', 'swap': False},
+        }),
+        'okx': SimpleNamespace(markets={
+            'PEPE/USDT:USDT': swap('PEPE/USDT:USDT', 'PEPE', 10.0),
+            'BTC/USDT:USDT': swap('BTC/USDT:USDT', 'BTC', 0.01),
+        }),
+    }
+    return SymbolIndex.build(exchanges)
+
+
+@pytest.mark.parametrize('base, expected', [
+    ('1000PEPE', ('PEPE', 1000)),
+    ('1000000MOG', ('MOG', 1000000)),
+    ('1MBABYDOGE', ('BABYDOGE', 1000000)),
+    ('kPEPE', ('PEPE', 1000)),
+    ('10', ('10', 1)),
+    ('1INCH', ('1INCH', 1)),
+    ('BTC', ('BTC', 1)),
+    (None, (None, 1)),
+])
+def test_split_multiplier(base, expected):
+    assert split_multiplier(base) == expected
+
+
+def test_every_listing_is_kept():
+    index = build_index()
+    assert index.symbols_for('PEPE/USDT:USDT') == {
+        'bybit': ['PEPE/USDT:USDT', '1000PEPE/USDT:USDT'],
+        'okx': ['PEPE/USDT:USDT'],
+    }
+    assert index.canonical('bybit', '1000PEPE/USDT:USDT') == 'PEPE/USDT:USDT'
+    assert index.multiplier('bybit', '1000PEPE/USDT:USDT') == 1000
+    assert index.multiplier('okx', 'PEPE/USDT:USDT') == 1
+    assert index.multiplier('okx', 'UNKNOWN/USDT:USDT') == 1
+    assert index.canonical('bybit', 'BTC/USDT') is None
+
+
+def test_resolve():
+    index = build_index()
+    for query in ('PEPE', '1000pepe', 'pepe/usdt', '1000PEPE/USDT:USDT'):
+        assert index.resolve(query) == 'PEPE/USDT:USDT'
+    assert index.resolve('DOGE') is None
+
+
+def test_old_cache_entries_are_normalised(tmp_path):
+    path = str(tmp_path / 'symbol_index.json')
+    build_index().save(path)
+    assert SymbolIndex.load(path).symbols_for('PEPE/USDT:USDT')['bybit'] == ['PEPE/USDT:USDT', '1000PEPE/USDT:USDT']
+    old = SymbolIndex({'BTC/USDT:USDT': {'okx': {'symbol': 'BTC/USDT:USDT', 'multiplier': 1}}})
+    assert old.symbols_for('BTC/USDT:USDT') == {'okx': ['BTC/USDT:USDT']}
+
+
+def test_prices_and_sizes_in_canonical_units():
+    fetcher = FundingRateFetcher.__new__(FundingRateFetcher)
+    fetcher.symbol_index = build_index()
+    df = pd.DataFrame({
+        'exchange': ['bybit', 'bybit'],
+        'symbol': ['PEPE/USDT:USDT', '1000PEPE/USDT:USDT'],
+        'price': [0.00001, 0.01],
+        'volume': [5000.0, 5.0],
+    })
+    converted = fetcher.to_canonical_units(df)
+    assert converted['price'].tolist() == pytest.approx([0.00001, 0.00001])
+    assert converted['volume'].tolist() == pytest.approx([5000.0, 5000.0])
+    assert df['price'].tolist() == [0.00001, 0.01]
@@ -0,0 +1,74 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from SymbolIndex import SymbolIndex
+from ResponseCache import ResponseCache
+from FundingRateFetcher import FundingRateFetcher
+from SymbolLookup import SymbolLookup
+
+PRICES = {'PEPE/USDT:USDT': 0.00001, '1000PEPE/USDT:USDT': 0.01}
+
+
+def lookup_fetcher():
+    fetcher = FundingRateFetcher.__new__(FundingRateFetcher)
+    fetcher.exchanges = {'bybit': None, 'okx': None}
+    fetcher.symbol_index = SymbolIndex({'PEPE/USDT:USDT': {
+        'bybit': [{'symbol': 'PEPE/USDT:USDT', 'multiplier': 1},
+                  {'symbol': '1000PEPE/USDT:USDT', 'multiplier': 1000}],
+        'okx': [{'symbol': 'PEPE/USDT:USDT', 'multiplier': 1}],
+    }})
+    fetcher.response_cache = ResponseCache()
+    fetcher.calls = []
+    lock = threading.Lock()
+
+    def call(mkt, method, symbol, **kwargs):
+        with lock:
+            fetcher.calls.append((mkt, method, symbol))
+        time.sleep(0.05)
+        price = PRICES[symbol]
+        if method == 'fetch_funding_rate':
+            return {'fundingRate': 0.0001, 'fundingTimestamp': 1700000000000}
+        if method == 'fetch_ticker':
+            return {'last': price, 'baseVolume': 10.0, 'bid': price, 'ask': price * 1.01}
+        return {'asks': [[price, 1.0]], 'bids': [[price, 2.0]]}
+
+    fetcher._call_exchange = call
+    return fetcher
+
+
+def test_concurrent_lookups_share_requests():
+    fetcher = lookup_fetcher()
+    lookup = SymbolLookup(fetcher, ttl=60.0)
+
+    async def scenario():
+        return await asyncio.gather(lookup.lookup('pepe'), lookup.lookup('1000PEPE'))
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert len(fetcher.calls) == 9
+    assert sorted(zip(first['exchange'], first['symbol'])) == [
+        ('bybit', '1000PEPE/USDT:USDT'), ('bybit', 'PEPE/USDT:USDT'), ('okx', 'PEPE/USDT:USDT')]
+    assert first['price'].tolist() == pytest.approx([0.00001] * 3)
+
+    asyncio.run(lookup.lookup('PEPE/USDT'))
+    assert len(fetcher.calls) == 9
+    lookup.shutdown()
+
+
+def test_failed_exchange_is_left_out():
+    fetcher = lookup_fetcher()
+    call = fetcher._call_exchange
+
+    def failing(mkt, method, symbol, **kwargs):
+        if mkt == 'okx':
+            raise RuntimeError("okx down")
+        return call(mkt, method, symbol, **kwargs)
+
+    fetcher._call_exchange = failing
+    lookup = SymbolLookup(fetcher, ttl=60.0)
+    df = asyncio.run(lookup.lookup('PEPE'))
+    assert set(df['exchange']) == {'bybit'}
+    lookup.shutdown()
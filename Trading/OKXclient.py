@@ -1,13 +1,23 @@
 import ccxt.async_support as ccxt
 import json
+import time
 import logging
 import asyncio
+import common_path  # noqa: F401
+from common.circuit_breaker import CircuitBreaker
+from request_policy import RequestPolicy
+from session_pool import session_pool
+from traffic_log import TrafficLog, RecordingExchange, ReplayExchange
 
 
 class OKXClient:
-    def __init__(self, config_file_path: str = 'config_okx.json'):
-        self.config = self.load_config(config_file_path)
-        if not self.config:
+    def __init__(self, config_file_path: str = 'config_okx.json', pool_size: int = 16,
+                 record_path: str = None, replay_path: str = None, replay_pace: str = 'fast',
+                 replay_speed: float = 1.0, require_config: bool = True):
+        # 재생이나 모의 거래처럼 주문을 보내지 않는 경우에는 API 키 없이도 동작
+        require_config = require_config and not replay_path
+        self.config = self.load_config(config_file_path) or (None if require_config else {})
+        if self.config is None:
             logging.error("Configuration not loaded. Exiting...")
             raise Exception("Configuration not loaded.")
 
@@ -18,10 +28,36 @@ class OKXClient:
             'enableRateLimit': True,
             'adjustForTimeDifference': True
         })
+        self.breaker = CircuitBreaker('okx')
+        self.request_policy = RequestPolicy()
+        self.pool_size = pool_size
         self.initialized = False
+        self.traffic_log = None
+        self.replay = None
+        self.clock = time.time
+        self.sleep = asyncio.sleep
+        if replay_path:
+            self.replay = ReplayExchange(self.okx, replay_path, pace=replay_pace, speed=replay_speed)
+            self.okx = self.replay
+            self.request_policy = RequestPolicy(hedge_budget=0.0)
+            self.clock = self.replay.clock
+            self.sleep = self.replay.sleep
+        elif record_path:
+            self.traffic_log = TrafficLog(record_path)
+            self.okx = RecordingExchange(self.okx, self.traffic_log)
+
+    async def _call(self, method: str, *args, idempotent: bool = True, retry_on: tuple = None, **kwargs):
+        return await self.request_policy.execute(
+            method, self.breaker.call_async, getattr(self.okx, method), *args,
+            idempotent=idempotent, retry_on=retry_on, **kwargs)
 
     async def initialize(self):
-        await self.okx.load_markets()
+        if not self.replay:
+            self.okx.session = session_pool.session_for('okx', self.pool_size)
+            self.okx.own_session = False
+            warmed = await session_pool.warm('okx', self.okx)
+            logging.info(f"Warmed {warmed} OKX connections.")
+        await self._call('load_markets')
         self.initialized = True
 
     def load_config(self, file_path: str) -> dict:
@@ -38,7 +74,7 @@ class OKXClient:
 
     async def get_balance(self) -> dict:
         try:
-            balance = await self.okx.fetch_balance()
+            balance = await self._call('fetch_balance')
             return balance
         except ccxt.BaseError as e:
             logging.error(
@@ -47,7 +83,9 @@ class OKXClient:
 
     async def place_order(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: dict = {}):
         try:
-            order = await self.okx.create_order(
+            order = await self._call(
+                'create_order',
+                idempotent=False,
                 symbol=symbol,
                 type=order_type,
                 side=side,
@@ -60,6 +98,30 @@ class OKXClient:
             logging.error(f"An error occurred while placing order: {str(e)}")
             return None
 
+    async def fetch_order(self, order_id: str, symbol: str) -> dict:
+        return await self._call('fetch_order', order_id, symbol,
+                                retry_on=(ccxt.NetworkError, ccxt.OrderNotFound))
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        return await self._call('fetch_ticker', symbol)
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None) -> list:
+        return await self._call('fetch_ohlcv', symbol, timeframe=timeframe, since=since, limit=limit)
+
+    async def fetch_positions(self, symbols: list = None) -> list:
+        return await self._call('fetch_positions', symbols)
+
+    async def fetch_order_book(self, symbol: str, limit: int = None) -> dict:
+        return await self._call('fetch_order_book', symbol, limit)
+
+    async def fetch_time(self) -> int:
+        return await self._call('fetch_time')
+
+    def health_info(self) -> str:
+        lines = [self.breaker.summary(), f"Requests: {self.request_policy.summary()}"]
+        lines.extend(session_pool.summary())
+        return "Exchange health:\n" + "\n".join(lines)
+
     async def close_position(self, position: dict):
         """
         특정 포지션을 청산하는 메서드.
@@ -90,7 +152,7 @@ class OKXClient:
 
             order_id = order['id']
             await asyncio.sleep(0.5)
-            detailed_order = await self.okx.fetch_order(order_id, symbol)
+            detailed_order = await self.fetch_order(order_id, symbol)
 
             exit_price = (
                 detailed_order['average']
@@ -127,3 +189,5 @@ class OKXClient:
 
     async def close(self):
         await self.okx.close()
+        if self.traffic_log:
+            self.traffic_log.close()
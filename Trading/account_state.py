@@ -0,0 +1,96 @@
+import time
+import asyncio
+import logging
+
+
+class AccountStateCache:
+    """
+    Background-refreshed balance and position snapshots.
+    Readers get the last snapshot synchronously in O(1) together with its age; `refresh()` forces an
+    update and concurrent refreshes share one in-flight request. Call `on_fill()` after every fill.
+    """
+
+    def __init__(self, fetch_balance, fetch_positions, symbols=None, interval=15.0, quote='USDT'):
+        self.fetch_balance = fetch_balance
+        self.fetch_positions = fetch_positions
+        self.symbols = symbols
+        self.interval = interval
+        self.quote = quote
+        self.balance = {}
+        self.positions = {}
+        self.balance_updated_at = None
+        self.positions_updated_at = None
+        self._refresh_task = None
+        self._refresh_started = 0.0
+        self._loop_task = None
+
+    def quote_balance(self):
+        return self.balance.get(self.quote, {})
+
+    def position(self, symbol):
+        return self.positions.get(symbol)
+
+    def age(self):
+        updated = [t for t in (self.balance_updated_at, self.positions_updated_at) if t is not None]
+        return time.time() - min(updated) if len(updated) == 2 else None
+
+    def is_stale(self, max_age=None):
+        age = self.age()
+        return age is None or age > (max_age if max_age is not None else 2 * self.interval)
+
+    async def _refresh(self, now):
+        # `now`은 요청 시작 시각; 체결 전에 보낸 조회가 체결 이후 스냅샷으로 보이지 않도록 함
+        balance, positions = await asyncio.gather(
+            self.fetch_balance(), self.fetch_positions(self.symbols), return_exceptions=True)
+        if isinstance(balance, Exception):
+            logging.error(f"Failed to refresh balance: {balance}")
+        elif balance:
+            self.balance = balance
+            self.balance_updated_at = now
+        if isinstance(positions, Exception):
+            logging.error(f"Failed to refresh positions: {positions}")
+        elif positions is not None:
+            self.positions = {
+                position['symbol']: position for position in positions
+                if position.get('contracts')
+            }
+            self.positions_updated_at = now
+
+    async def refresh(self, force=True, after=None):
+        """
+        Coalesces with an in-flight refresh, unless that refresh was sent before `after` (epoch seconds);
+        then it waits for it and starts a new one.
+        """
+        if not force and not self.is_stale(self.interval):
+            return
+        task = self._refresh_task
+        if task is not None and not task.done() and after is not None and self._refresh_started < after:
+            await asyncio.shield(task)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_started = time.time()
+            self._refresh_task = asyncio.ensure_future(self._refresh(self._refresh_started))
+        await asyncio.shield(self._refresh_task)
+
+    def on_fill(self):
+        asyncio.ensure_future(self.refresh(force=True, after=time.time()))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh(force=True)
+            except Exception as e:
+                logging.error(f"Account state refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import logging
+import ccxt.async_support as ccxt
+from collections import deque
+
+
+class CandleCloseScheduler:
+    """
+    Wakes up right after each `timeframe` candle closes on the exchange clock.
+    Deadlines are absolute candle boundaries, so time spent handling a tick never shifts the next one;
+    ticks that were missed while a handler overran are skipped rather than queued.
+    """
+
+    def __init__(self, client, timeframe: str, settle: float = 0.25, resync_interval: float = 600.0,
+                 samples: int = 5, history: int = 500):
+        self.client = client
+        self.timeframe = timeframe
+        self.timeframe_ms = client.okx.parse_timeframe(timeframe) * 1000
+        self.settle = settle
+        self.resync_interval = resync_interval
+        self.samples = samples
+        self.offset = 0.0
+        self.synced_at = None
+        self.last_close = None
+        self.skipped_ticks = 0
+        self.latencies = deque(maxlen=history)
+        self.clock = getattr(client, 'clock', time.time)
+        self.sleep = getattr(client, 'sleep', asyncio.sleep)
+
+    async def sync_clock(self):
+        best = None
+        for _ in range(self.samples):
+            t0 = self.clock()
+            server_ms = await self.client.fetch_time()
+            t1 = self.clock()
+            if best is None or t1 - t0 < best[0]:
+                best = (t1 - t0, server_ms / 1000 - (t0 + t1) / 2)
+        self.offset = best[1]
+        self.synced_at = self.clock()
+        logging.info(f"Exchange clock offset {self.offset * 1000:+.1f}ms (rtt {best[0] * 1000:.1f}ms)")
+
+    def exchange_time_ms(self) -> int:
+        return int((self.clock() + self.offset) * 1000)
+
+    def next_close(self, now_ms: int = None) -> int:
+        now_ms = self.exchange_time_ms() if now_ms is None else now_ms
+        return (now_ms // self.timeframe_ms + 1) * self.timeframe_ms
+
+    async def wait_next_close(self) -> int:
+        """
+        Sleeps until just after the next candle close and returns that close time in exchange epoch ms.
+        """
+        if self.synced_at is None or self.clock() - self.synced_at > self.resync_interval:
+            try:
+                await self.sync_clock()
+            except ccxt.BaseError as e:
+                logging.error(f"Clock sync failed, keeping offset {self.offset * 1000:+.1f}ms: {e}")
+
+        close_ms = self.next_close()
+        if self.last_close is not None:
+            missed = (close_ms - self.last_close) // self.timeframe_ms - 1
+            if missed > 0:
+                self.skipped_ticks += missed
+                logging.warning(f"Skipped {missed} {self.timeframe} candle close(s).")
+
+        wake_at = close_ms / 1000 - self.offset + self.settle
+        while True:
+            remaining = wake_at - self.clock()
+            if remaining <= 0:
+                break
+            await self.sleep(remaining)
+        self.last_close = close_ms
+        return close_ms
+
+    def record_signal(self, close_ms: int) -> float:
+        latency = (self.exchange_time_ms() - close_ms) / 1000
+        self.latencies.append(latency)
+        return latency
+
+    def summary(self) -> str:
+        if not self.latencies:
+            return f"{self.timeframe} candle closes: no ticks yet"
+        ordered = sorted(self.latencies)
+        p50 = ordered[len(ordered) // 2]
+        p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+        return (f"{self.timeframe} close-to-signal latency over {len(ordered)} ticks: "
+                f"p50 {p50:.2f}s, p95 {p95:.2f}s, last {self.latencies[-1]:.2f}s, "
+                f"skipped ticks {self.skipped_ticks}, clock offset {self.offset * 1000:+.1f}ms")
@@ -0,0 +1,123 @@
+import asyncio
+import numpy as np
+
+
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def aggregate(base: np.ndarray, timeframe_ms: int, until_ms: int) -> np.ndarray:
+    """
+    Reduces base candles (rows of timestamp, open, high, low, close, volume) into `timeframe_ms` candles.
+    Only buckets that end at or before `until_ms` are returned.
+    """
+    if len(base) == 0:
+        return np.empty((0, 6))
+    buckets = base[:, TIMESTAMP].astype(np.int64) // timeframe_ms * timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(base)] - 1
+    out = np.empty((len(starts), 6))
+    out[:, TIMESTAMP] = buckets[starts]
+    out[:, OPEN] = base[starts, OPEN]
+    out[:, HIGH] = np.maximum.reduceat(base[:, HIGH], starts)
+    out[:, LOW] = np.minimum.reduceat(base[:, LOW], starts)
+    out[:, CLOSE] = base[ends, CLOSE]
+    out[:, VOLUME] = np.add.reduceat(base[:, VOLUME], starts)
+    return out[out[:, TIMESTAMP] + timeframe_ms <= until_ms]
+
+
+class CandleAggregator:
+    """
+    Keeps one closed-candle base series per symbol and derives every subscribed timeframe from it in memory.
+    Each `update()` fetches only the base candles closed since the last one; derived timeframes are
+    extended by aggregating just the base rows of their newly completed buckets.
+    """
+
+    def __init__(self, client, symbol: str, base_timeframe: str = '1m', page_limit: int = 100, margin: int = 10):
+        self.client = client
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe
+        self.base_ms = client.okx.parse_timeframe(base_timeframe) * 1000
+        self.page_limit = page_limit
+        self.margin = margin
+        self.base = np.empty((0, 6))
+        self.derived = {}
+        self.history = {}
+        self.requests = 0
+        self.lock = asyncio.Lock()
+
+    def timeframe_ms(self, timeframe: str) -> int:
+        return self.client.okx.parse_timeframe(timeframe) * 1000
+
+    def subscribe(self, timeframe: str, history: int):
+        """
+        Registers interest in the last `history` closed candles of `timeframe`.
+        """
+        timeframe_ms = self.timeframe_ms(timeframe)
+        if timeframe_ms % self.base_ms:
+            raise ValueError(f"{timeframe} is not a multiple of the {self.base_timeframe} base timeframe.")
+        self.history[timeframe] = max(self.history.get(timeframe, 0), history)
+        if timeframe != self.base_timeframe:
+            self.derived.setdefault(timeframe, np.empty((0, 6)))
+
+    def base_capacity(self) -> int:
+        needed = [history * self.timeframe_ms(tf) // self.base_ms for tf, history in self.history.items()]
+        return max(needed, default=0) + self.margin
+
+    async def _fetch_base(self, since: int, until_ms: int) -> np.ndarray:
+        pages = []
+        while since < until_ms:
+            ohlcv = await self.client.fetch_ohlcv(
+                self.symbol, timeframe=self.base_timeframe, since=since, limit=self.page_limit)
+            self.requests += 1
+            rows = np.array([candle[:6] for candle in ohlcv], dtype=float).reshape(-1, 6)
+            rows = rows[(rows[:, TIMESTAMP] >= since) & (rows[:, TIMESTAMP] + self.base_ms <= until_ms)]
+            if len(rows) == 0:
+                break
+            pages.append(rows)
+            since = int(rows[-1, TIMESTAMP]) + self.base_ms
+        return np.concatenate(pages) if pages else np.empty((0, 6))
+
+    async def update(self, until_ms: int):
+        """
+        Brings the base series and all derived timeframes up to candles closed by `until_ms`.
+        Concurrent callers for the same close share one fetch.
+        """
+        until_ms = until_ms // self.base_ms * self.base_ms
+        async with self.lock:
+            last = int(self.base[-1, TIMESTAMP]) if len(self.base) else None
+            if last is not None and last + self.base_ms >= until_ms:
+                return
+            since = last + self.base_ms if last is not None else until_ms - self.base_capacity() * self.base_ms
+            fresh = await self._fetch_base(since, until_ms)
+            if len(fresh) == 0:
+                return
+            self.base = np.concatenate([self.base, fresh])[-self.base_capacity():]
+            base_until = int(self.base[-1, TIMESTAMP]) + self.base_ms
+            for timeframe, candles in self.derived.items():
+                self.derived[timeframe] = self._extend(timeframe, candles, base_until)
+
+    def _extend(self, timeframe: str, candles: np.ndarray, until_ms: int) -> np.ndarray:
+        timeframe_ms = self.timeframe_ms(timeframe)
+        next_bucket = int(candles[-1, TIMESTAMP]) + timeframe_ms if len(candles) else None
+        if next_bucket is None:
+            # 첫 버킷은 base 시작이 버킷 경계에 걸쳐 있으면 불완전하므로 제외
+            first = -(-int(self.base[0, TIMESTAMP]) // timeframe_ms) * timeframe_ms
+            next_bucket = first
+        rows = self.base[self.base[:, TIMESTAMP] >= next_bucket]
+        new = aggregate(rows, timeframe_ms, until_ms)
+        if len(new) == 0:
+            return candles
+        return np.concatenate([candles, new])[-(self.history[timeframe] + self.margin):]
+
+    def candles(self, timeframe: str, limit: int = None) -> np.ndarray:
+        candles = self.base if timeframe == self.base_timeframe else self.derived.get(timeframe)
+        if candles is None:
+            raise KeyError(f"{timeframe} is not subscribed for {self.symbol}.")
+        return candles[-limit:] if limit else candles
+
+    def closes(self, timeframe: str, limit: int = None) -> np.ndarray:
+        return self.candles(timeframe, limit)[:, CLOSE]
+
+    def summary(self) -> str:
+        frames = ', '.join(f"{tf} {len(self.candles(tf))}" for tf in sorted(self.history, key=self.timeframe_ms))
+        return f"{self.symbol} candles from {self.base_timeframe} base ({self.requests} requests): {frames}"
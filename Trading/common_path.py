@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 스크립트를 이 디렉터리에서 실행해도 저장소 루트의 common 패키지를 import 할 수 있도록 경로 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(1, ROOT)
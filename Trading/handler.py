@@ -4,8 +4,10 @@ from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, Messa
 
 
 class TelegramHandler:
-    def __init__(self, trading_bot, telegram_sender, config_file_path='config_trading.json'):
-        self.trading_bot = trading_bot
+    def __init__(self, trading_bot=None, telegram_sender=None, config_file_path='config_trading.json',
+                 trading_bots=None):
+        self.trading_bots = trading_bots or [trading_bot]
+        self.trading_bot = self.trading_bots[0]
         self.telegram_sender = telegram_sender
         self.config = self.load_config(config_file_path)
         if not self.config:
@@ -16,14 +18,25 @@ class TelegramHandler:
 
         self.application = ApplicationBuilder().token(self.token).build()
 
-        self.application.add_handler(CommandHandler('start', self.start))
-        self.application.add_handler(
-            CommandHandler('balance', self.get_balance))
-        self.application.add_handler(
-            CommandHandler('positions', self.get_positions))
-        self.application.add_handler(CommandHandler('exit', self.exit_trading))
+        # 계좌 정보가 노출되지 않도록 설정된 그룹과 허용된 채팅에서만 명령을 받음
+        allowed = [self.config.get('alphawave_trading_group_chat_id')] + self.config.get('allowed_chat_ids', [])
+        self.allowed_chat_ids = [int(chat_id) for chat_id in allowed if chat_id]
+        allowed_chats = filters.Chat(chat_id=self.allowed_chat_ids)
+
+        commands = {
+            'start': self.start,
+            'balance': self.get_balance,
+            'positions': self.get_positions,
+            'health': self.get_health,
+            'timing': self.get_timing,
+            'subscribe': self.subscribe,
+            'unsubscribe': self.unsubscribe,
+            'exit': self.exit_trading,
+        }
+        for command, callback in commands.items():
+            self.application.add_handler(CommandHandler(command, callback, filters=allowed_chats))
         self.application.add_handler(
-            MessageHandler(filters.COMMAND, self.unknown))
+            MessageHandler(filters.COMMAND & allowed_chats, self.unknown))
 
     def load_config(self, file_path: str) -> dict:
         try:
@@ -39,24 +52,53 @@ class TelegramHandler:
 
     async def start(self, update, context: ContextTypes.DEFAULT_TYPE):
         message = "Trading bot is running."
-        await self.telegram_sender.send_message(message)
+        await self.telegram_sender.send_message(message, update.effective_chat.id)
 
     async def get_balance(self, update, context: ContextTypes.DEFAULT_TYPE):
+        account_state = self.trading_bot.account_state
+        if context.args and context.args[0] == 'refresh' or account_state.age() is None:
+            await account_state.refresh(force=True)
         balance_info = self.trading_bot.get_balance_info()
-        await self.telegram_sender.send_message(balance_info)
+        await self.telegram_sender.send_message(balance_info, update.effective_chat.id)
 
     async def get_positions(self, update, context: ContextTypes.DEFAULT_TYPE):
-        positions_info = self.trading_bot.get_positions_info()
-        await self.telegram_sender.send_message(positions_info)
+        positions_info = "\n".join(
+            f"[{bot.timeframe}] {bot.get_positions_info()}" for bot in self.trading_bots)
+        await self.telegram_sender.send_message(positions_info, update.effective_chat.id)
+
+    async def get_health(self, update, context: ContextTypes.DEFAULT_TYPE):
+        await self.telegram_sender.send_message(
+            self.trading_bot.client.health_info(), update.effective_chat.id)
+
+    async def get_timing(self, update, context: ContextTypes.DEFAULT_TYPE):
+        await self.telegram_sender.send_message(
+            "\n".join(bot.candle_scheduler.summary() for bot in self.trading_bots)
+            + "\n" + self.trading_bot.candles.summary()
+            + "\n" + self.telegram_sender.fanout.summary(), update.effective_chat.id)
+
+    async def subscribe(self, update, context: ContextTypes.DEFAULT_TYPE):
+        if self.telegram_sender.subscribers.add(update.effective_chat.id):
+            message = "Subscribed to trading alerts."
+        else:
+            message = "This chat is already subscribed."
+        await self.telegram_sender.send_message(message, update.effective_chat.id)
+
+    async def unsubscribe(self, update, context: ContextTypes.DEFAULT_TYPE):
+        if self.telegram_sender.subscribers.remove(update.effective_chat.id):
+            message = "Unsubscribed from trading alerts."
+        else:
+            message = "This chat is not subscribed."
+        await self.telegram_sender.send_message(message, update.effective_chat.id)
 
     async def exit_trading(self, update, context: ContextTypes.DEFAULT_TYPE):
         await self.telegram_sender.send_message("Exiting all positions and stopping trading.")
-        await self.trading_bot.close_all_positions()
-        self.trading_bot.running = False
+        for bot in self.trading_bots:
+            await bot.close_all_positions()
+            bot.running = False
 
     async def unknown(self, update, context: ContextTypes.DEFAULT_TYPE):
-        message = "Unknown command. Available commands: /start, /balance, /positions, /exit."
-        await self.telegram_sender.send_message(message)
+        message = "Unknown command. Available commands: /start, /balance, /positions, /health, /timing, /subscribe, /unsubscribe, /exit."
+        await self.telegram_sender.send_message(message, update.effective_chat.id)
 
     async def start_bot(self):
         await self.application.run_polling()
@@ -8,6 +8,10 @@ from OKXclient import OKXClient
 from strategy import StrategyType
 from sender import TelegramSender
 from handler import TelegramHandler
+from candles import CandleAggregator
+from account_state import AccountStateCache
+from paper_client import PaperClient, LatencyModel, FeeModel
+from session_pool import session_pool
 
 
 def parse_arguments():
@@ -18,7 +22,7 @@ def parse_arguments():
     parser.add_argument('--time_limit', type=int, default=3600,
                         help='Trading execution time in seconds')
     parser.add_argument('--timeframe', type=str, default='5m',
-                        help='Candle timeframe (e.g., 1m, 15m, 1h)')
+                        help='Candle timeframe(s), comma separated (e.g., 1m or 1m,15m,1h)')
     parser.add_argument('--strategy', type=str, default='KaufmanAMA',
                         help='Strategy to use (e.g., KaufmanAMA, MovingAverageCross)')
     parser.add_argument('--max_positions', type=int, default=5,
@@ -28,15 +32,43 @@ def parse_arguments():
     parser.add_argument('--stop_loss', type=float, default=None,
                         help='Stop loss percentage (e.g., 5 for 5%)')
     parser.add_argument('--signal_interval', type=float, default=60.0,
-                        help='Signal detection interval in seconds')
+                        help='Signal detection interval in seconds (only with --no_candle_align)')
+    parser.add_argument('--no_candle_align', action='store_true',
+                        help='Poll every signal_interval instead of after each candle close')
     parser.add_argument('--use_telegram', action='store_true',
                         help='Enable Telegram notifications')
+    parser.add_argument('--paper', action='store_true',
+                        help='Simulate order execution locally against live or replayed order books')
+    parser.add_argument('--paper_balance', type=float, default=10000.0,
+                        help='Starting quote balance for paper trading')
+    parser.add_argument('--paper_latency', type=float, default=0.05,
+                        help='Simulated order latency in seconds')
+    parser.add_argument('--paper_jitter', type=float, default=0.02,
+                        help='Standard deviation of simulated latency in seconds')
+    parser.add_argument('--paper_fee', type=float, default=0.0005,
+                        help='Simulated taker fee rate')
+    parser.add_argument('--record', type=str, default=None,
+                        help='Append all exchange traffic to this gzip log')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Replay a recorded session offline instead of trading live')
+    parser.add_argument('--pace', choices=['fast', 'recorded'], default='fast',
+                        help='Replay as fast as possible or at the recorded pace')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Speed-up factor for --pace recorded')
     return parser.parse_args()
 
 
 async def run_trading_system(args, shutdown_event):
-    client = OKXClient()
+    client = OKXClient(record_path=args.record, replay_path=args.replay,
+                       replay_pace=args.pace, replay_speed=args.speed,
+                       require_config=not args.paper)
     await client.initialize()
+    market_data = client
+    if args.paper:
+        client = PaperClient(
+            market_data, balance=args.paper_balance,
+            latency=LatencyModel(args.paper_latency, args.paper_jitter),
+            fees=FeeModel(taker=args.paper_fee))
 
     strategy_type = StrategyType(args.strategy)
 
@@ -51,40 +83,58 @@ async def run_trading_system(args, shutdown_event):
     else:
         telegram_sender = None
 
-    trader = Trading(
-        client=client,
-        symbol=args.symbol,
-        strategy_type=strategy_type,
-        timeframe=args.timeframe,
-        amount=args.amount,
-        max_positions=args.max_positions,
-        take_profit=args.take_profit,
-        stop_loss=args.stop_loss,
-        signal_interval=args.signal_interval,
-        telegram_sender=telegram_sender,
-        **strategy_kwargs
-    )
+    # 같은 심볼의 여러 타임프레임은 1분봉 시리즈 하나와 계좌 스냅샷 하나를 공유
+    candles = CandleAggregator(client, args.symbol)
+    account_state = AccountStateCache(
+        client.get_balance, client.fetch_positions, symbols=[args.symbol])
+    traders = [
+        Trading(
+            client=client,
+            symbol=args.symbol,
+            strategy_type=strategy_type,
+            timeframe=timeframe.strip(),
+            amount=args.amount,
+            max_positions=args.max_positions,
+            take_profit=args.take_profit,
+            stop_loss=args.stop_loss,
+            signal_interval=args.signal_interval,
+            align_to_candles=not args.no_candle_align,
+            telegram_sender=telegram_sender,
+            account_state=account_state,
+            candles=candles,
+            **strategy_kwargs
+        )
+        for timeframe in args.timeframe.split(',')
+    ]
 
     if args.use_telegram:
         telegram_handler = TelegramHandler(
-            trading_bot=trader, telegram_sender=telegram_sender)
+            trading_bots=traders, telegram_sender=telegram_sender)
         bot_task = asyncio.create_task(telegram_handler.start_bot())
     else:
         bot_task = None
 
-    trading_task = asyncio.create_task(trader.run(time_limit=args.time_limit))
+    # 공유 계좌 스냅샷은 모든 트레이더보다 먼저 시작하고 모두 끝난 뒤에 멈춤
+    account_state.start()
+    trading_task = asyncio.gather(
+        *(trader.run(time_limit=args.time_limit) for trader in traders))
 
-    await shutdown_event.wait()
+    if args.replay:
+        # 재생 세션은 녹화가 끝나면 스스로 종료
+        await asyncio.wait([trading_task, asyncio.ensure_future(shutdown_event.wait())],
+                           return_when=asyncio.FIRST_COMPLETED)
+        logging.info(f"Replayed {market_data.replay.served} recorded responses.")
+    else:
+        await shutdown_event.wait()
 
     logging.info("Shutting down...")
 
-    trader.running = False
+    for trader in traders:
+        trader.running = False
     if args.use_telegram:
         await telegram_handler.application.shutdown()
         await telegram_sender.bot.close()
 
-    await client.close()
-
     trading_task.cancel()
     if bot_task:
         bot_task.cancel()
@@ -94,6 +144,10 @@ async def run_trading_system(args, shutdown_event):
     except Exception as e:
         logging.error(f"Error during shutdown: {str(e)}")
 
+    await account_state.stop()
+    await client.close()
+    await session_pool.close()
+
 
 async def main():
     args = parse_arguments()
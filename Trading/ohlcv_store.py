@@ -0,0 +1,252 @@
+import io
+import os
+import time
+import asyncio
+import logging
+import argparse
+import numpy as np
+import ccxt.async_support as ccxt
+
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVStore:
+    """
+    Columnar candle store: <root>/<exchange>/<timeframe>/<symbol>/{timestamp,open,high,low,close,volume,filled}.npy.
+    Every column is a plain .npy array, so a backtester can open it with np.load(..., mmap_mode='r')
+    without parsing. Series are kept gap-free: a missing candle repeats the previous close with zero volume
+    and is flagged in `filled`. Candles newer than the stored series are appended to the column files in place;
+    only merges that replace filled or older rows rewrite the whole series.
+    """
+
+    def __init__(self, root: str = './ohlcv'):
+        self.root = root
+
+    @staticmethod
+    def safe_name(symbol: str) -> str:
+        return symbol.replace('/', '_').replace(':', '-')
+
+    def path(self, exchange_id: str, timeframe: str, symbol: str) -> str:
+        return os.path.join(self.root, exchange_id, timeframe, self.safe_name(symbol))
+
+    def load(self, exchange_id: str, timeframe: str, symbol: str, mmap: bool = True) -> dict:
+        path = self.path(exchange_id, timeframe, symbol)
+        mode = 'r' if mmap else None
+        try:
+            columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                       for name in ('timestamp',) + COLUMNS + ('filled',)}
+        except (OSError, ValueError):
+            return {}
+        length = min(len(values) for values in columns.values())
+        return {name: values[:length] for name, values in columns.items()}
+
+    def last_timestamp(self, exchange_id: str, timeframe: str, symbol: str):
+        timestamps = self.load(exchange_id, timeframe, symbol).get('timestamp')
+        return int(timestamps[-1]) if timestamps is not None and len(timestamps) else None
+
+    @staticmethod
+    def fill_gaps(timestamps: np.ndarray, values: np.ndarray, timeframe_ms: int):
+        """
+        Reindexes sorted unique candles onto a continuous grid; returns (timestamps, values, filled mask).
+        """
+        grid = np.arange(timestamps[0], timestamps[-1] + timeframe_ms, timeframe_ms, dtype=np.int64)
+        if len(grid) == len(timestamps):
+            return timestamps, values, np.zeros(len(grid), dtype=bool)
+        positions = np.searchsorted(timestamps, grid)
+        present = (positions < len(timestamps)) & (timestamps[np.minimum(positions, len(timestamps) - 1)] == grid)
+        # 빈 캔들은 직전 실제 캔들의 종가로 채움
+        source = np.maximum.accumulate(np.where(present, np.arange(len(grid)), 0))
+        real = np.searchsorted(timestamps, grid[source])
+        filled_values = np.empty((len(grid), values.shape[1]))
+        filled_values[present] = values[positions[present]]
+        previous_close = values[real, 3]
+        filled_values[~present, 0:4] = previous_close[~present, None]
+        filled_values[~present, 4] = 0.0
+        return grid, filled_values, ~present
+
+    @staticmethod
+    def _dedupe(candles: np.ndarray) -> np.ndarray:
+        # 같은 timestamp는 마지막으로 들어온 캔들을 사용
+        _, last = np.unique(candles[::-1, 0], return_index=True)
+        return candles[len(candles) - 1 - last]
+
+    @staticmethod
+    def _grown_header(file_path: str, length: int):
+        """
+        Returns (data offset, stored length, dtype, header bytes for `length` rows), or None when the column
+        cannot be grown in place because the new header would not fit in the old one.
+        """
+        fmt = np.lib.format
+        with open(file_path, 'rb') as file:
+            version = fmt.read_magic(file)
+            if version == (1, 0):
+                read_header, write_header = fmt.read_array_header_1_0, fmt.write_array_header_1_0
+            elif version == (2, 0):
+                read_header, write_header = fmt.read_array_header_2_0, fmt.write_array_header_2_0
+            else:
+                return None
+            shape, fortran_order, dtype = read_header(file)
+            offset = file.tell()
+        if len(shape) != 1 or fortran_order:
+            return None
+        header = io.BytesIO()
+        write_header(header, {'descr': fmt.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (length,)})
+        if len(header.getvalue()) != offset:
+            return None
+        return offset, shape[0], dtype, header.getvalue()
+
+    def _append_in_place(self, path: str, stored: dict, candles: np.ndarray, timeframe_ms: int):
+        """
+        Appends candles that are all newer than the stored series to the column files; returns the number
+        of rows written, or None when a full rewrite is needed.
+        """
+        length = len(stored['timestamp'])
+        anchor = np.concatenate([[stored['timestamp'][-1]], [stored[name][-1] for name in COLUMNS]])
+        candles = np.concatenate([anchor[None, :], candles])
+        timestamps, values, filled = self.fill_gaps(candles[:, 0].astype(np.int64), candles[:, 1:], timeframe_ms)
+        columns = {'timestamp': timestamps[1:], 'filled': filled[1:]}
+        columns.update({name: values[1:, i] for i, name in enumerate(COLUMNS)})
+
+        headers = {}
+        for name, column in columns.items():
+            grown = self._grown_header(os.path.join(path, f"{name}.npy"), length + len(column))
+            # load()는 가장 짧은 컬럼 길이에 맞추므로 저장된 길이가 모두 같을 때만 이어 씀
+            if grown is None or grown[1] != length:
+                return None
+            headers[name] = grown
+        for name, column in columns.items():
+            offset, _, dtype, header = headers[name]
+            data = np.ascontiguousarray(column, dtype=dtype).tobytes()
+            with open(os.path.join(path, f"{name}.npy"), 'r+b') as file:
+                # 데이터를 먼저 쓰고 헤더를 나중에 갱신해서 중간에 죽어도 이전 길이로 읽힘
+                file.seek(offset + length * dtype.itemsize)
+                file.write(data)
+                file.truncate()
+                file.flush()
+                file.seek(0)
+                file.write(header)
+        return len(timestamps) - 1
+
+    def append(self, exchange_id: str, timeframe: str, symbol: str, candles: np.ndarray, timeframe_ms: int) -> int:
+        """
+        Merges (N, 6) candles into the stored series; returns the number of new rows.
+        New candles after the stored series are appended in place, anything else rewrites the series atomically.
+        """
+        path = self.path(exchange_id, timeframe, symbol)
+        stored = self.load(exchange_id, timeframe, symbol, mmap=False)
+        if len(candles) and stored and len(stored['timestamp']):
+            candles = self._dedupe(candles)
+            if candles[0, 0] > stored['timestamp'][-1]:
+                added = self._append_in_place(path, stored, candles, timeframe_ms)
+                if added is not None:
+                    return added
+        if stored:
+            previous = np.column_stack([stored['timestamp']] + [stored[name] for name in COLUMNS])
+            # 이전에 채워 넣은 캔들은 실제 데이터가 들어오면 덮어쓰도록 함
+            previous = previous[~stored['filled'].astype(bool)]
+            candles = np.concatenate([previous, candles])
+        if len(candles) == 0:
+            return 0
+        candles = self._dedupe(candles)
+        timestamps, values, filled = self.fill_gaps(
+            candles[:, 0].astype(np.int64), candles[:, 1:], timeframe_ms)
+
+        os.makedirs(path, exist_ok=True)
+        columns = {'timestamp': timestamps, 'filled': filled}
+        columns.update({name: values[:, i] for i, name in enumerate(COLUMNS)})
+        for name, column in columns.items():
+            tmp_path = os.path.join(path, f"{name}.tmp.npy")
+            np.save(tmp_path, np.ascontiguousarray(column))
+            os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+        return len(timestamps) - (len(stored['timestamp']) if stored else 0)
+
+
+class OHLCVDownloader:
+    """
+    Bulk candle download into an OHLCVStore.
+    Because page boundaries are known from the timeframe, every page of a (symbol, timeframe) range is requested
+    concurrently, bounded by a per-exchange semaphore on top of ccxt's rate limiter. Only closed candles after
+    the last stored one are requested, so re-runs download just the new candles.
+    """
+
+    def __init__(self, exchange, store: OHLCVStore = None, page_limit: int = 100, concurrency: int = 8):
+        self.exchange = exchange
+        self.store = store or OHLCVStore()
+        self.page_limit = page_limit
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = 0
+        self.failed = []
+
+    async def _page(self, symbol: str, timeframe: str, since: int):
+        """
+        Returns the candles of one page, or None when the request failed.
+        """
+        async with self.semaphore:
+            self.requests += 1
+            try:
+                return await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=self.page_limit)
+            except ccxt.BaseError as e:
+                self.failed.append((symbol, timeframe, since, str(e)))
+                logging.warning(f"{symbol} {timeframe} page at {since} failed: {str(e)}")
+                return None
+
+    async def download(self, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> int:
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        last = self.store.last_timestamp(self.exchange.id, timeframe, symbol)
+        since = max(start_ms, last + timeframe_ms) if last is not None else start_ms
+        since = since // timeframe_ms * timeframe_ms
+        end_ms = end_ms // timeframe_ms * timeframe_ms
+        if since >= end_ms:
+            return 0
+        step = self.page_limit * timeframe_ms
+        starts = list(range(since, end_ms, step))
+        pages = await asyncio.gather(*(self._page(symbol, timeframe, page_start) for page_start in starts))
+        if None in pages:
+            # 실패한 페이지 이후는 저장하지 않음: 빈 구간이 합성 캔들로 채워지면 다음 실행에서 다시 받지 않기 때문
+            failed_at = pages.index(None)
+            end_ms = starts[failed_at]
+            pages = pages[:failed_at]
+            logging.warning(f"{symbol} {timeframe}: keeping candles before {end_ms}, the rest is retried next run.")
+        candles = np.array([candle[:6] for page in pages for candle in page], dtype=float).reshape(-1, 6)
+        candles = candles[(candles[:, 0] >= since) & (candles[:, 0] + timeframe_ms <= end_ms)]
+        if len(candles) == 0:
+            return 0
+        added = self.store.append(self.exchange.id, timeframe, symbol, candles, timeframe_ms)
+        logging.info(f"{self.exchange.id} {symbol} {timeframe}: {added} new candles.")
+        return added
+
+    async def run(self, symbols: list, timeframes: list, days: float):
+        end_ms = int(time.time() * 1000)
+        start_ms = end_ms - int(days * 24 * 60 * 60 * 1000)
+        started = time.monotonic()
+        added = await asyncio.gather(*(self.download(symbol, timeframe, start_ms, end_ms)
+                                       for symbol in symbols for timeframe in timeframes))
+        logging.info(f"Downloaded {sum(added)} candles for {len(symbols)} symbols x {len(timeframes)} timeframes "
+                     f"in {time.monotonic() - started:.1f}s ({self.requests} requests, {len(self.failed)} failed).")
+        return sum(added)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk OHLCV downloader")
+    parser.add_argument('--exchange', type=str, default='okx', help='ccxt exchange id')
+    parser.add_argument('--symbols', type=str, default='BTC/USDT:USDT,ETH/USDT:USDT',
+                        help='Comma separated symbols')
+    parser.add_argument('--timeframes', type=str, default='1m,5m,1h', help='Comma separated timeframes')
+    parser.add_argument('--days', type=float, default=30, help='History to download for new series')
+    parser.add_argument('--store', type=str, default='./ohlcv', help='Store directory')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent requests per exchange')
+    args = parser.parse_args()
+
+    exchange = getattr(ccxt, args.exchange)({'enableRateLimit': True})
+    try:
+        await exchange.load_markets()
+        downloader = OHLCVDownloader(exchange, OHLCVStore(args.store), concurrency=args.concurrency)
+        await downloader.run(args.symbols.split(','), args.timeframes.split(','), args.days)
+    finally:
+        await exchange.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s:%(message)s')
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+import uuid
+import random
+import logging
+import ccxt.async_support as ccxt
+
+
+class LatencyModel:
+    """
+    Order latency in seconds: a fixed base plus non-negative Gaussian jitter.
+    """
+
+    def __init__(self, base: float = 0.05, jitter: float = 0.02, seed: int = None):
+        self.base = base
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        return max(self.base + self.random.gauss(0.0, self.jitter), 0.0)
+
+
+class FeeModel:
+    def __init__(self, taker: float = 0.0005, maker: float = 0.0002):
+        self.taker = taker
+        self.maker = maker
+
+    def fee(self, cost: float, taker: bool = True) -> float:
+        return cost * (self.taker if taker else self.maker)
+
+
+class PaperClient:
+    """
+    Simulated execution backend with the OKXClient interface used by Trading.
+    Market data (candles, tickers, order books, clock) comes from `market_data`, a live or replaying OKXClient;
+    orders never leave the process. A market order waits out the latency model, then walks the order book at
+    arrival, pays the taker fee and updates a local one-way position and balance per symbol.
+    """
+
+    def __init__(self, market_data, balance: float = 10000.0, quote: str = 'USDT', leverage: float = 1.0,
+                 latency: LatencyModel = None, fees: FeeModel = None, depth: int = 50):
+        self.market_data = market_data
+        self.quote = quote
+        self.leverage = leverage
+        self.latency = latency or LatencyModel()
+        self.fees = fees or FeeModel()
+        self.depth = depth
+        self.initial_balance = balance
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self.orders = {}
+        self.positions = {}
+        self.fills = []
+        self.clock = market_data.clock
+        self.sleep = market_data.sleep
+
+    @property
+    def okx(self):
+        return self.market_data.okx
+
+    async def initialize(self):
+        if not self.market_data.initialized:
+            await self.market_data.initialize()
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None, limit: int = None) -> list:
+        return await self.market_data.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        return await self.market_data.fetch_ticker(symbol)
+
+    async def fetch_time(self) -> int:
+        return await self.market_data.fetch_time()
+
+    async def book_side(self, symbol: str, side: str) -> list:
+        """
+        Levels a market order on `side` would take, best first; falls back to the ticker when no book is available.
+        """
+        try:
+            book = await self.market_data.fetch_order_book(symbol, self.depth)
+            levels = book['asks'] if side == 'buy' else book['bids']
+            if levels:
+                return [(float(level[0]), float(level[1])) for level in levels]
+        except ccxt.BaseError as e:
+            logging.warning(f"Paper fill falls back to ticker, order book unavailable: {str(e)}")
+        ticker = await self.market_data.fetch_ticker(symbol)
+        price = (ticker.get('ask') if side == 'buy' else ticker.get('bid')) or ticker['last']
+        return [(float(price), float('inf'))]
+
+    def contract_size(self, symbol: str) -> float:
+        try:
+            return float(self.okx.market(symbol).get('contractSize') or 1.0)
+        except ccxt.BaseError:
+            return 1.0
+
+    @staticmethod
+    def match(levels: list, amount: float):
+        filled, cost = 0.0, 0.0
+        for price, size in levels:
+            take = min(size, amount - filled)
+            filled += take
+            cost += take * price
+            if filled >= amount:
+                break
+        return filled, cost
+
+    def apply_fill(self, symbol: str, side: str, contracts: float, price: float, contract_size: float):
+        position = self.positions.setdefault(symbol, {'contracts': 0.0, 'entry_price': 0.0})
+        signed = contracts if side == 'buy' else -contracts
+        current = position['contracts']
+        if current == 0 or (current > 0) == (signed > 0):
+            total = abs(current) + contracts
+            position['entry_price'] = (abs(current) * position['entry_price'] + contracts * price) / total
+            position['contracts'] = current + signed
+            return
+        closing = min(abs(current), contracts)
+        direction = 1 if current > 0 else -1
+        self.realized_pnl += (price - position['entry_price']) * closing * contract_size * direction
+        position['contracts'] = current + signed
+        if abs(position['contracts']) < 1e-12:
+            position['contracts'] = 0.0
+            position['entry_price'] = 0.0
+        elif (position['contracts'] > 0) != (current > 0):
+            position['entry_price'] = price
+
+    async def place_order(self, symbol: str, order_type: str, side: str, amount: float, price: float = None, params: dict = {}):
+        if order_type != 'market':
+            logging.error(f"Paper trading only simulates market orders, got {order_type}.")
+            return None
+        try:
+            decided_at = self.clock()
+            decision_levels = await self.book_side(symbol, side)
+            latency = self.latency.sample()
+            await self.sleep(latency)
+            levels = await self.book_side(symbol, side)
+        except ccxt.BaseError as e:
+            logging.error(f"An error occurred while simulating order: {str(e)}")
+            return None
+
+        contract_size = self.contract_size(symbol)
+        if params.get('reduceOnly'):
+            held = self.positions.get(symbol, {}).get('contracts', 0.0)
+            reducible = held if side == 'sell' else -held
+            amount = min(amount, max(reducible, 0.0))
+        filled, cost = self.match(levels, amount)
+        average = cost / filled if filled else None
+        notional = cost * contract_size
+        fee = self.fees.fee(notional)
+        if filled:
+            self.apply_fill(symbol, side, filled, average, contract_size)
+            self.fees_paid += fee
+
+        timestamp = int(self.clock() * 1000)
+        reference = decision_levels[0][0]
+        slippage_bps = ((average - reference) / reference * 1e4 * (1 if side == 'buy' else -1)) if filled else None
+        order = {
+            'id': uuid.uuid4().hex[:16],
+            'symbol': symbol,
+            'type': order_type,
+            'side': side,
+            'amount': amount,
+            'filled': filled,
+            'remaining': amount - filled,
+            'price': average,
+            'average': average,
+            'cost': notional,
+            'status': 'closed' if filled >= amount else ('canceled' if not filled else 'open'),
+            'timestamp': timestamp,
+            'fee': {'cost': fee, 'currency': self.quote},
+            'info': {'paper': True, 'latency': latency, 'decidedAt': decided_at, 'slippageBps': slippage_bps},
+        }
+        self.orders[order['id']] = order
+        self.fills.append({'symbol': symbol, 'side': side, 'filled': filled, 'average': average,
+                           'latency': latency, 'slippage_bps': slippage_bps, 'fee': fee})
+        logging.info(f"Paper {side} {filled}/{amount} {symbol} at {average} "
+                     f"(latency {latency * 1000:.0f}ms, slippage {slippage_bps or 0:.2f}bps)")
+        return order
+
+    async def fetch_order(self, order_id: str, symbol: str) -> dict:
+        order = self.orders.get(order_id)
+        if order is None:
+            raise ccxt.OrderNotFound(f"Paper order {order_id} not found.")
+        return order
+
+    def margin_used(self) -> float:
+        return sum(abs(position['contracts']) * self.contract_size(symbol) * position['entry_price']
+                   for symbol, position in self.positions.items()) / self.leverage
+
+    async def get_balance(self) -> dict:
+        total = self.initial_balance + self.realized_pnl - self.fees_paid
+        used = self.margin_used()
+        free = total - used
+        return {
+            self.quote: {'free': free, 'used': used, 'total': total},
+            'free': {self.quote: free}, 'used': {self.quote: used}, 'total': {self.quote: total},
+        }
+
+    async def fetch_positions(self, symbols: list = None) -> list:
+        positions = []
+        for symbol, position in self.positions.items():
+            if symbols and symbol not in symbols or not position['contracts']:
+                continue
+            positions.append({
+                'symbol': symbol,
+                'side': 'long' if position['contracts'] > 0 else 'short',
+                'contracts': abs(position['contracts']),
+                'contractSize': self.contract_size(symbol),
+                'entryPrice': position['entry_price'],
+                'leverage': self.leverage,
+                'info': {'paper': True},
+            })
+        return positions
+
+    def health_info(self) -> str:
+        fills = [fill for fill in self.fills if fill['filled']]
+        lines = [f"Paper trading: {len(fills)} fills, realized P/L {self.realized_pnl:.4f}, "
+                 f"fees {self.fees_paid:.4f} {self.quote}"]
+        if fills:
+            latency = sum(fill['latency'] for fill in fills) / len(fills)
+            slippage = sum(fill['slippage_bps'] for fill in fills) / len(fills)
+            lines.append(f"Mean latency {latency * 1000:.0f}ms, mean slippage {slippage:.2f}bps")
+        return "\n".join(lines) + "\n" + self.market_data.health_info()
+
+    async def close(self):
+        await self.market_data.close()
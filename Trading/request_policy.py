@@ -0,0 +1,62 @@
+import time
+import asyncio
+
+import common_path  # noqa: F401
+from common.circuit_breaker import CircuitOpenError
+from common.request_policy import RequestPolicyBase
+
+
+class RequestPolicy(RequestPolicyBase):
+    """
+    Retry and hedging policy for idempotent async exchange reads; the losing request of a hedge is cancelled.
+    """
+
+    async def execute(self, key, fn, *args, idempotent=True, retry_on=None, **kwargs):
+        if not idempotent:
+            return await fn(*args, **kwargs)
+        retry_on = retry_on or self.retry_on
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(key, fn, *args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except retry_on:
+                if attempt >= self.max_retries:
+                    raise
+                self._count('retries')
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+
+    async def _timed(self, key, fn, *args, **kwargs):
+        start = time.monotonic()
+        result = await fn(*args, **kwargs)
+        self.latency.observe(key, time.monotonic() - start)
+        return result
+
+    async def _hedged(self, key, fn, *args, **kwargs):
+        threshold = self.hedge_threshold(key)
+        if threshold is None:
+            return await self._timed(key, fn, *args, **kwargs)
+
+        primary = asyncio.ensure_future(self._timed(key, fn, *args, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done or not self.hedge_allowed():
+            return await primary
+
+        hedge = asyncio.ensure_future(self._timed(key, fn, *args, **kwargs))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count('hedges_won')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import argparse
+import numpy as np
+import ccxt.async_support as ccxt
+from strategy import AbstractStrategy, StrategyType, strategy_pool
+from candle_scheduler import CandleCloseScheduler
+
+
+class UniverseScanner:
+    """
+    Ranks every linear swap in the universe by signal strength once per candle close.
+    Closed candles for all symbols are fetched concurrently, stacked into one (symbols x bars) close matrix
+    aligned on candle timestamps, and evaluated in a single `generate_signals` pass.
+    """
+
+    def __init__(self, client, strategy: AbstractStrategy, timeframe: str = '1m', symbols: list = None,
+                 quote: str = 'USDT', top: int = 20, concurrency: int = 16):
+        if not strategy.vectorized:
+            raise ValueError(f"{type(strategy).__name__} has no vectorized signal_strength to scan a universe with.")
+        self.client = client
+        self.strategy = strategy
+        self.timeframe = timeframe
+        self.symbols = symbols
+        self.quote = quote
+        self.top = top
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.scheduler = CandleCloseScheduler(client, timeframe)
+        self.bars = strategy.period
+
+    def universe(self) -> list:
+        if self.symbols:
+            return self.symbols
+        return sorted(
+            symbol for symbol, market in self.client.okx.markets.items()
+            if market.get('swap') and market.get('linear') and market.get('quote') == self.quote
+            and market.get('active', True)
+        )
+
+    async def _fetch(self, symbol: str) -> list:
+        async with self.semaphore:
+            try:
+                return await self.client.fetch_ohlcv(symbol, timeframe=self.timeframe, limit=self.bars + 1)
+            except ccxt.BaseError as e:
+                logging.warning(f"Skipping {symbol}: {str(e)}")
+                return []
+
+    async def price_matrix(self, close_ms: int):
+        """
+        Returns (symbols, matrix) where row i holds the last `bars` closes of symbols[i] ending at `close_ms`;
+        bars missing for a symbol are NaN.
+        """
+        symbols = self.universe()
+        candles = await asyncio.gather(*(self._fetch(symbol) for symbol in symbols))
+        timeframe_ms = self.scheduler.timeframe_ms
+        last_open = close_ms - timeframe_ms
+        matrix = np.full((len(symbols), self.bars), np.nan)
+        for row, ohlcv in enumerate(candles):
+            if not ohlcv:
+                continue
+            data = np.asarray([candle[:5] for candle in ohlcv], dtype=float)
+            columns = self.bars - 1 - (last_open - data[:, 0]) // timeframe_ms
+            valid = (columns >= 0) & (columns < self.bars)
+            matrix[row, columns[valid].astype(int)] = data[valid, 4]
+        return symbols, matrix
+
+    async def scan(self, close_ms: int) -> list:
+        symbols, matrix = await self.price_matrix(close_ms)
+        strength = self.strategy.signal_strength(matrix)
+        signals = self.strategy.signals_from_strength(strength)
+        order = np.argsort(-np.nan_to_num(np.abs(strength), nan=-1.0))
+        ranked = [
+            {'symbol': symbols[i], 'signal': signals[i], 'strength': float(strength[i])}
+            for i in order[:self.top] if not np.isnan(strength[i])
+        ]
+        evaluated = int(np.count_nonzero(~np.isnan(strength)))
+        logging.info(f"Scanned {evaluated}/{len(symbols)} symbols at {close_ms}.")
+        return ranked
+
+    async def run(self, time_limit: int, on_result=None):
+        start_time = self.client.clock()
+        while self.client.clock() - start_time < time_limit:
+            close_ms = await self.scheduler.wait_next_close()
+            ranked = await self.scan(close_ms)
+            latency = self.scheduler.record_signal(close_ms)
+            logging.info(f"Scan finished {latency:.2f}s after candle close.")
+            if on_result:
+                await on_result(close_ms, ranked)
+
+    @staticmethod
+    def format_ranking(ranked: list) -> str:
+        lines = ["Top signals:"]
+        for item in ranked:
+            lines.append(f"{item['symbol']}: {item['signal'].upper()} ({item['strength'] * 100:+.3f}%)")
+        return "\n".join(lines)
+
+
+async def main():
+    from OKXclient import OKXClient
+
+    parser = argparse.ArgumentParser(description="Universe signal scanner")
+    parser.add_argument('--timeframe', type=str, default='5m', help='Candle timeframe')
+    parser.add_argument('--strategy', type=str, default='KaufmanAMA',
+                        help='Strategy to use (e.g., KaufmanAMA, MovingAverageCross)')
+    parser.add_argument('--top', type=int, default=20, help='Number of symbols to report')
+    parser.add_argument('--time_limit', type=int, default=3600, help='Scan duration in seconds')
+    args = parser.parse_args()
+
+    client = OKXClient(require_config=False)
+    await client.initialize()
+    scanner = UniverseScanner(client, strategy_pool(StrategyType(args.strategy)),
+                              timeframe=args.timeframe, top=args.top)
+
+    async def report(close_ms, ranked):
+        print(scanner.format_ranking(ranked))
+
+    try:
+        await scanner.run(args.time_limit, on_result=report)
+    finally:
+        await client.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s:%(message)s')
+    asyncio.run(main())
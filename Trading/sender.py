@@ -2,6 +2,8 @@ import json
 import logging
 from telegram import Bot
 from telegram.error import TelegramError
+import common_path  # noqa: F401
+from common.broadcast import SubscriberRegistry, FanoutDispatcher
 
 
 class TelegramSender:
@@ -14,7 +16,15 @@ class TelegramSender:
         self.token = self.config.get('kamp_alphawave_bot_token')
         self.group_chat_id = self.config.get(
             'alphawave_trading_group_chat_id')
+        if self.group_chat_id is None:
+            logging.error("alphawave_trading_group_chat_id is missing from the Telegram configuration.")
+            raise Exception("Telegram group chat id not configured.")
         self.bot = Bot(token=self.token)
+        self.subscribers = SubscriberRegistry(
+            self.config.get('subscribers_path', 'subscribers_trading.json'), seed=[self.group_chat_id])
+        self.fanout = FanoutDispatcher(self.subscribers)
+        allowed = [self.group_chat_id] + self.config.get('allowed_chat_ids', [])
+        self.allowed_chat_ids = {int(chat_id) for chat_id in allowed}
 
     def load_config(self, file_path: str) -> dict:
         try:
@@ -28,9 +38,17 @@ class TelegramSender:
             logging.error("Error decoding JSON from the configuration file.")
             return None
 
-    async def send_message(self, message: str):
+    async def send_message(self, message: str, chat_id: int = None):
+        """
+        Sends to every subscriber, or only to `chat_id` when replying to a command.
+        """
         try:
-            await self.bot.send_message(chat_id=self.group_chat_id, text=message)
-            logging.info("Message sent to group Telegram chat.")
+            if chat_id is not None:
+                chat_ids = [chat_id]
+            else:
+                # 예전에 등록된 채팅이라도 허용 목록에 없으면 알림을 보내지 않음
+                chat_ids = [subscriber for subscriber in self.subscribers if subscriber in self.allowed_chat_ids]
+            record = await self.fanout.broadcast(self.bot, message, chat_ids=chat_ids)
+            logging.info(f"Message sent to {record['delivered']}/{record['chats']} Telegram chats.")
         except TelegramError as e:
             logging.error(f"Failed to send message to Telegram: {str(e)}")
@@ -0,0 +1,81 @@
+import ssl
+import asyncio
+import logging
+
+import aiohttp
+import certifi
+import common_path  # noqa: F401
+from common.session_pool import ConnectionStats, api_hosts
+
+
+class SessionPool:
+    """
+    Keep-alive aiohttp sessions shared by every async ccxt instance of the same exchange.
+    Each session's connector allows `pool_size` connections per host, and an aiohttp trace counts
+    requests and new connections per host.
+    """
+
+    def __init__(self, keepalive_timeout=60):
+        self.keepalive_timeout = keepalive_timeout
+        self.sessions = {}
+        self.stats = ConnectionStats()
+
+    def _trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.host = params.url.host
+            self.stats.record_request(context.host)
+
+        async def on_connection_create_end(session, context, params):
+            self.stats.record_new_connection(getattr(context, 'host', 'unknown'))
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    def session_for(self, key, pool_size):
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+                limit=pool_size,
+                limit_per_host=pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[self._trace_config()])
+            self.sessions[key] = session
+        return session
+
+    api_hosts = staticmethod(api_hosts)
+
+    async def warm(self, key, exchange, connections=4, timeout=5):
+        session = self.sessions[key]
+        targets = [host for host in self.api_hosts(exchange)
+                   for _ in range(connections)]
+
+        async def touch(url):
+            try:
+                async with session.head(url, timeout=aiohttp.ClientTimeout(total=timeout)):
+                    pass
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+
+        await asyncio.gather(*(touch(url) for url in targets))
+        return len(targets)
+
+    def summary(self):
+        return self.stats.summary()
+
+    async def close(self):
+        for session in self.sessions.values():
+            if not session.closed:
+                await session.close()
+        self.sessions.clear()
+        logging.info("Closed pooled HTTP sessions.")
+
+
+session_pool = SessionPool()
@@ -6,6 +6,9 @@ from typing import Dict, Type
 
 
 class AbstractStrategy(ABC):
+    # True when signal_strength is computed on the whole matrix instead of row by row
+    vectorized = False
+
     def __init__(self, period: int = 10):
         self.period = period
 
@@ -13,8 +16,49 @@ class AbstractStrategy(ABC):
     def generate_signal(self, prices: list) -> str:
         pass
 
+    def subscriptions(self, timeframe: str) -> Dict[str, int]:
+        """
+        Timeframes the strategy reads and how many closed candles of each it needs.
+        """
+        return {timeframe: self.period}
+
+    def signal_strength(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Signed signal strength per row of a (symbols x bars) price matrix; positive is buy, negative is sell,
+        NaN where a row does not have `period` valid bars.
+        The default applies generate_signal row by row and only carries the sign (+1/-1/0);
+        vectorized strategies override it.
+        """
+        window = self._window(prices, self.period)
+        strength = np.full(window.shape[0], np.nan)
+        directions = {'buy': 1.0, 'sell': -1.0}
+        for row in np.flatnonzero(~np.isnan(window).any(axis=1)):
+            strength[row] = directions.get(self.generate_signal(window[row].tolist()), 0.0)
+        return strength
+
+    def generate_signals(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Batch version of generate_signal over a (symbols x bars) price matrix, one 'buy'/'sell'/'hold' per row.
+        """
+        return self.signals_from_strength(self.signal_strength(np.asarray(prices, dtype=float)))
+
+    @staticmethod
+    def signals_from_strength(strength: np.ndarray) -> np.ndarray:
+        signals = np.full(strength.shape, 'hold', dtype=object)
+        signals[strength > 0] = 'buy'
+        signals[strength < 0] = 'sell'
+        return signals
+
+    def _window(self, prices: np.ndarray, bars: int) -> np.ndarray:
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        if prices.shape[1] < bars:
+            return np.full((prices.shape[0], bars), np.nan)
+        return prices[:, -bars:]
+
 
 class KaufmanAMAStrategy(AbstractStrategy):
+    vectorized = True
+
     def __init__(self, period: int = 10, fast_period: int = 2, slow_period: int = 30):
         super().__init__(period)
         self.fast_period = fast_period
@@ -38,6 +82,24 @@ class KaufmanAMAStrategy(AbstractStrategy):
             AMA = AMA + SC * (prices[i] - AMA)
         return AMA
 
+    def calculate_AMA_batch(self, window: np.ndarray) -> np.ndarray:
+        # calculate_AMA과 동일하게 i번째 ER은 윈도우 시작부터 i번째 봉까지로 계산
+        volatility = np.cumsum(np.abs(np.diff(window, axis=1)), axis=1)
+        change = np.abs(window[:, 1:] - window[:, :1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ER = np.where(volatility != 0, change / volatility, 0.0)
+        SC = self.calculate_SC(ER)
+        AMA = window[:, 0].copy()
+        for i in range(1, window.shape[1]):
+            AMA = AMA + SC[:, i - 1] * (window[:, i] - AMA)
+        return AMA
+
+    def signal_strength(self, prices: np.ndarray) -> np.ndarray:
+        window = self._window(prices, self.period)
+        AMA = self.calculate_AMA_batch(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (window[:, -1] - AMA) / AMA
+
     def generate_signal(self, prices: list) -> str:
         if len(prices) < self.period:
             return 'hold'
@@ -52,11 +114,20 @@ class KaufmanAMAStrategy(AbstractStrategy):
 
 
 class MovingAverageCrossStrategy(AbstractStrategy):
+    vectorized = True
+
     def __init__(self, short_window: int = 5, long_window: int = 20):
         super().__init__(period=long_window)
         self.short_window = short_window
         self.long_window = long_window
 
+    def signal_strength(self, prices: np.ndarray) -> np.ndarray:
+        window = self._window(prices, self.long_window)
+        short_ma = window[:, -self.short_window:].mean(axis=1)
+        long_ma = window.mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (short_ma - long_ma) / long_ma
+
     def generate_signal(self, prices: list) -> str:
         if len(prices) < self.long_window:
             return 'hold'
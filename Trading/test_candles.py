@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from candles import aggregate, CandleAggregator, TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME
+
+MINUTE = 60_000
+TIMEFRAMES = {'1m': 60, '5m': 300, '15m': 900}
+
+
+def base_candles(start_minute, count):
+    rows = []
+    for minute in range(start_minute, start_minute + count):
+        rows.append([minute * MINUTE, minute, minute + 0.5, minute - 0.5, minute + 0.25, 1.0])
+    return np.array(rows, dtype=float)
+
+
+def aggregator():
+    client = SimpleNamespace(okx=SimpleNamespace(parse_timeframe=lambda timeframe: TIMEFRAMES[timeframe]))
+    candles = CandleAggregator(client, 'BTC/USDT:USDT')
+    candles.subscribe('5m', 10)
+    return candles
+
+
+def test_aggregate_buckets():
+    out = aggregate(base_candles(0, 10), 5 * MINUTE, 10 * MINUTE)
+    assert out[:, TIMESTAMP].tolist() == [0, 5 * MINUTE]
+    assert out[0, OPEN] == 0 and out[0, CLOSE] == 4.25
+    assert out[0, HIGH] == 4.5 and out[0, LOW] == -0.5
+    assert out[1, VOLUME] == 5.0
+
+
+def test_aggregate_drops_open_bucket():
+    out = aggregate(base_candles(0, 8), 5 * MINUTE, 8 * MINUTE)
+    assert out[:, TIMESTAMP].tolist() == [0]
+    assert len(aggregate(np.empty((0, 6)), 5 * MINUTE, 10 * MINUTE)) == 0
+
+
+def test_extend_skips_partial_first_bucket():
+    candles = aggregator()
+    candles.base = base_candles(2, 13)
+    out = candles._extend('5m', np.empty((0, 6)), 15 * MINUTE)
+    assert out[:, TIMESTAMP].tolist() == [5 * MINUTE, 10 * MINUTE]
+
+
+def test_extend_appends_only_new_buckets():
+    candles = aggregator()
+    candles.base = base_candles(0, 10)
+    first = candles._extend('5m', np.empty((0, 6)), 10 * MINUTE)
+    candles.base = base_candles(0, 20)
+    extended = candles._extend('5m', first, 20 * MINUTE)
+    assert extended[:, TIMESTAMP].tolist() == [0, 5 * MINUTE, 10 * MINUTE, 15 * MINUTE]
+    np.testing.assert_array_equal(extended, aggregate(candles.base, 5 * MINUTE, 20 * MINUTE))
+    assert candles._extend('5m', extended, 20 * MINUTE) is extended
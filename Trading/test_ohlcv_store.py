@@ -0,0 +1,54 @@
+import numpy as np
+
+from ohlcv_store import OHLCVStore
+
+MINUTE = 60_000
+
+
+def candles(minutes):
+    return np.array([[minute * MINUTE, minute, minute + 1, minute - 1, minute + 0.5, 10.0] for minute in minutes],
+                    dtype=float)
+
+
+def test_fill_gaps_repeats_previous_close():
+    data = candles([0, 1, 4])
+    timestamps, values, filled = OHLCVStore.fill_gaps(data[:, 0].astype(np.int64), data[:, 1:], MINUTE)
+    assert timestamps.tolist() == [0, MINUTE, 2 * MINUTE, 3 * MINUTE, 4 * MINUTE]
+    assert filled.tolist() == [False, False, True, True, False]
+    assert values[2].tolist() == [1.5, 1.5, 1.5, 1.5, 0.0]
+    assert values[4].tolist() == data[2, 1:].tolist()
+
+
+def test_fill_gaps_without_gaps():
+    data = candles([0, 1, 2])
+    timestamps, values, filled = OHLCVStore.fill_gaps(data[:, 0].astype(np.int64), data[:, 1:], MINUTE)
+    assert not filled.any()
+    np.testing.assert_array_equal(values, data[:, 1:])
+
+
+def test_append_in_place_and_rewrite(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    assert store.append('okx', '1m', 'BTC/USDT:USDT', candles([0, 1, 3]), MINUTE) == 4
+    # 저장된 마지막 캔들 이후라 제자리 추가
+    assert store.append('okx', '1m', 'BTC/USDT:USDT', candles([5, 6]), MINUTE) == 3
+    stored = store.load('okx', '1m', 'BTC/USDT:USDT')
+    assert stored['timestamp'].tolist() == [minute * MINUTE for minute in range(7)]
+    assert stored['filled'].tolist() == [False, False, True, False, True, False, False]
+    assert stored['timestamp'].dtype == np.int64 and stored['filled'].dtype == bool
+
+    # 채워 넣은 캔들이 실제 데이터로 바뀌면 전체를 다시 씀
+    assert store.append('okx', '1m', 'BTC/USDT:USDT', candles([2]), MINUTE) == 0
+    stored = store.load('okx', '1m', 'BTC/USDT:USDT', mmap=False)
+    assert stored['filled'].tolist() == [False, False, False, False, True, False, False]
+    assert stored['close'][2] == 2.5
+    assert store.last_timestamp('okx', '1m', 'BTC/USDT:USDT') == 6 * MINUTE
+
+
+def test_append_many_in_place(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.append('okx', '1m', 'ETH/USDT:USDT', candles([0]), MINUTE)
+    for minute in range(1, 300):
+        store.append('okx', '1m', 'ETH/USDT:USDT', candles([minute]), MINUTE)
+    stored = store.load('okx', '1m', 'ETH/USDT:USDT', mmap=False)
+    np.testing.assert_array_equal(stored['close'], np.arange(300) + 0.5)
+    assert not stored['filled'].any()
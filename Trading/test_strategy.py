@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from strategy import AbstractStrategy, KaufmanAMAStrategy, MovingAverageCrossStrategy
+
+
+class ThresholdStrategy(AbstractStrategy):
+    def generate_signal(self, prices: list) -> str:
+        if len(prices) < self.period:
+            return 'hold'
+        if prices[-1] > prices[-self.period]:
+            return 'buy'
+        if prices[-1] < prices[-self.period]:
+            return 'sell'
+        return 'hold'
+
+
+def price_matrix(rows=40, bars=30, seed=7):
+    rng = np.random.default_rng(seed)
+    prices = 100 + np.cumsum(rng.normal(0, 1, size=(rows, bars)), axis=1)
+    prices[0, :] = 100.0
+    prices[1, 5] = np.nan
+    return prices
+
+
+@pytest.mark.parametrize('strategy', [
+    KaufmanAMAStrategy(period=10),
+    MovingAverageCrossStrategy(short_window=5, long_window=20),
+    ThresholdStrategy(period=10),
+])
+def test_batch_matches_scalar(strategy):
+    prices = price_matrix()
+    signals = strategy.generate_signals(prices)
+    for row, signal in enumerate(signals):
+        window = prices[row, -strategy.period:]
+        if np.isnan(window).any():
+            continue
+        assert signal == strategy.generate_signal(prices[row].tolist()), row
+
+
+@pytest.mark.parametrize('strategy', [KaufmanAMAStrategy(period=10), ThresholdStrategy(period=10)])
+def test_short_rows_have_no_strength(strategy):
+    prices = price_matrix(bars=30)
+    prices[2, -3] = np.nan
+    strength = strategy.signal_strength(prices)
+    assert np.isnan(strength[2])
+    assert np.isnan(strategy.signal_strength(prices[:, :5])).all()
+    assert strategy.generate_signals(prices[:, :5]).tolist() == ['hold'] * len(prices)
+
+
+def test_fallback_strength_carries_direction():
+    strategy = ThresholdStrategy(period=3)
+    strength = strategy.signal_strength(np.array([[1.0, 2.0, 3.0], [3.0, 2.0, 1.0], [1.0, 2.0, 1.0]]))
+    assert strength.tolist() == [1.0, -1.0, 0.0]
+    assert not strategy.vectorized
+
+
+def test_scanner_requires_vectorized_strategy():
+    from scanner import UniverseScanner
+    with pytest.raises(ValueError):
+        UniverseScanner(client=None, strategy=ThresholdStrategy())
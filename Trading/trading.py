@@ -3,6 +3,9 @@ import logging
 import asyncio
 from strategy import AbstractStrategy, strategy_pool, StrategyType
 from sender import TelegramSender
+from account_state import AccountStateCache
+from candle_scheduler import CandleCloseScheduler
+from candles import CandleAggregator
 
 
 class Trading:
@@ -18,6 +21,9 @@ class Trading:
         stop_loss: float = None,
         signal_interval: float = 60.0,
         telegram_sender=None,
+        account_state: AccountStateCache = None,
+        align_to_candles: bool = True,
+        candles: CandleAggregator = None,
         **strategy_kwargs
     ):
         self.lock = asyncio.Lock()
@@ -33,8 +39,17 @@ class Trading:
         self.strategy = strategy_pool(strategy_type, **strategy_kwargs)
         self.positions = []
         self.running = True
-
-    async def fetch_price_data(self) -> list:
+        # 공유된 스냅샷은 만든 쪽(main)이 시작/정지를 맡음
+        self.owns_account_state = account_state is None
+        self.account_state = account_state or AccountStateCache(
+            client.get_balance, client.fetch_positions, symbols=[symbol])
+        self.align_to_candles = align_to_candles
+        self.candle_scheduler = CandleCloseScheduler(client, timeframe)
+        self.candles = candles or CandleAggregator(client, symbol)
+        for subscribed, history in self.strategy.subscriptions(timeframe).items():
+            self.candles.subscribe(subscribed, history)
+
+    async def fetch_price_data(self, close_ms: int = None) -> list:
         try:
             timeframe = self.timeframe
             valid_timeframes = self.client.okx.timeframes
@@ -42,11 +57,14 @@ class Trading:
                 logging.error(f"Timeframe {timeframe} is not supported.")
                 return []
 
-            ohlcv = await self.client.okx.fetch_ohlcv(
-                self.symbol, timeframe=timeframe, limit=self.strategy.period
-            )
-            prices = [candle[4] for candle in ohlcv]
-            return prices
+            # 1분봉 기준 시리즈에서 마감된 캔들만 집계해서 사용
+            close_ms = close_ms or self.candle_scheduler.exchange_time_ms()
+            await self.candles.update(close_ms)
+            candles = self.candles.candles(timeframe, self.strategy.period)
+            timeframe_ms = self.candle_scheduler.timeframe_ms
+            if close_ms % timeframe_ms == 0 and (len(candles) == 0 or candles[-1, 0] + timeframe_ms != close_ms):
+                logging.warning(f"Candle closing at {close_ms} not available yet.")
+            return candles[:, 4].tolist()
         except ccxt.BaseError as e:
             logging.error(f"Failed to fetch price data: {str(e)}")
             return []
@@ -90,8 +108,8 @@ class Trading:
             )
 
             order_id = order['id']
-            await asyncio.sleep(0.5)
-            detailed_order = await self.client.okx.fetch_order(order_id, self.symbol)
+            await self.client.sleep(0.5)
+            detailed_order = await self.client.fetch_order(order_id, self.symbol)
 
             entry_price = (
                 detailed_order['average']
@@ -109,6 +127,7 @@ class Trading:
                 'timestamp': detailed_order['timestamp']
             }
             self.positions.append(position)
+            self.account_state.on_fill()
 
             if self.telegram_sender:
                 message = (
@@ -151,8 +170,8 @@ class Trading:
             )
 
             order_id = order['id']
-            await asyncio.sleep(0.5)
-            detailed_order = await self.client.okx.fetch_order(order_id, self.symbol)
+            await self.client.sleep(0.5)
+            detailed_order = await self.client.fetch_order(order_id, self.symbol)
 
             exit_price = (
                 detailed_order['average']
@@ -170,6 +189,7 @@ class Trading:
                 profit_loss *= -1
 
             self.positions.remove(position)
+            self.account_state.on_fill()
 
             logging.info(
                 f"Closed position P/L: {profit_loss}, Exit Price: {exit_price}"
@@ -213,22 +233,25 @@ class Trading:
         while self.running:
             if self.positions:
                 try:
-                    ticker = await self.client.okx.fetch_ticker(self.symbol)
+                    ticker = await self.client.fetch_ticker(self.symbol)
                     current_price = ticker['last']
                     await self.check_take_profit_stop_loss(current_price)
                 except ccxt.BaseError as e:
                     logging.error(f"Failed to fetch ticker: {str(e)}")
-            await asyncio.sleep(1)
+            await self.client.sleep(1)
 
-    async def manage_position(self):
+    async def manage_position(self, close_ms: int = None):
         async with self.lock:
-            prices = await self.fetch_price_data()
+            prices = await self.fetch_price_data(close_ms)
             if len(prices) < self.strategy.period:
                 logging.warning("Not enough data to generate a signal.")
                 return
 
             signal = self.strategy.generate_signal(prices)
             current_price = prices[-1]
+            if close_ms is not None:
+                latency = self.candle_scheduler.record_signal(close_ms)
+                logging.info(f"Signal {latency:.2f}s after {self.timeframe} candle close.")
             logging.info(
                 f"Generated signal: {signal}, Current price: {current_price}"
             )
@@ -256,14 +279,22 @@ class Trading:
 
     async def run(self, time_limit: int):
         self.running = True
-        start_time = asyncio.get_event_loop().time()
+        start_time = self.client.clock()
+        if self.owns_account_state:
+            self.account_state.start()
 
         monitor_task = asyncio.create_task(
             self.monitor_stop_loss_take_profit())
 
-        while self.running and (asyncio.get_event_loop().time() - start_time < time_limit):
-            await self.manage_position()
-            await asyncio.sleep(self.signal_interval)
+        while self.running and (self.client.clock() - start_time < time_limit):
+            if self.align_to_candles:
+                close_ms = await self.candle_scheduler.wait_next_close()
+                if not self.running:
+                    break
+                await self.manage_position(close_ms)
+            else:
+                await self.manage_position()
+                await self.client.sleep(self.signal_interval)
 
         logging.info("Trading session ended.")
 
@@ -277,15 +308,19 @@ class Trading:
         except asyncio.CancelledError:
             logging.info(
                 "Stop loss and take profit monitoring task cancelled.")
+        if self.owns_account_state:
+            await self.account_state.stop()
 
     def get_balance_info(self):
-        balance = self.client.get_balance()
-        if balance:
-            usdt_balance = balance.get('USDT', {})
+        usdt_balance = self.account_state.quote_balance()
+        if usdt_balance:
             total = usdt_balance.get('total', 'N/A')
             free = usdt_balance.get('free', 'N/A')
             used = usdt_balance.get('used', 'N/A')
-            return f"Balance:\nTotal: {total}\nFree: {free}\nUsed: {used}"
+            age = self.account_state.age()
+            updated = f"{age:.0f}s ago" if age is not None else "N/A"
+            stale = " (stale)" if self.account_state.is_stale() else ""
+            return f"Balance:\nTotal: {total}\nFree: {free}\nUsed: {used}\nUpdated: {updated}{stale}"
         else:
             return "Failed to retrieve balance."
 
@@ -0,0 +1,104 @@
+import time
+import asyncio
+
+import ccxt.async_support as ccxt
+import common_path  # noqa: F401
+from common.traffic_log import (TrafficLog, RecordedEntries, is_recorded, new_entry, markets_result,
+                                raise_recorded_error)
+
+
+class RecordingExchange:
+    """
+    Proxy around an async ccxt exchange that logs every recorded call with its result or error and timing.
+    """
+
+    def __init__(self, exchange, log: TrafficLog):
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'log', log)
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if not callable(attr) or not is_recorded(name):
+            return attr
+
+        async def recorded(*args, **kwargs):
+            entry = new_entry(self.exchange.id, name, args, kwargs)
+            start = time.monotonic()
+            try:
+                result = await attr(*args, **kwargs)
+            except ccxt.BaseError as e:
+                entry.update(elapsed=time.monotonic() - start,
+                             error={'type': type(e).__name__, 'message': str(e)})
+                self.log.write(entry)
+                raise
+            if name == 'load_markets':
+                result = markets_result(self.exchange)
+            entry.update(elapsed=time.monotonic() - start, result=result)
+            self.log.write(entry)
+            return self.exchange.markets if name == 'load_markets' else result
+        return recorded
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
+
+
+class ReplayExchange:
+    """
+    Serves recorded responses for one async exchange instead of making requests.
+
+    The replay also owns the session clock: `clock()` and `sleep()` replace time.time and asyncio.sleep.
+    With pace='recorded' they run at `speed` times real time and each call takes its recorded latency;
+    with pace='fast' sleeps only advance a virtual clock, so a session replays as fast as the CPU allows.
+    """
+
+    def __init__(self, exchange, path: str, pace: str = 'fast', speed: float = 1.0):
+        entries = RecordedEntries(exchange.id, path, finish_when_exhausted=True)
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'pace', pace)
+        object.__setattr__(self, 'speed', speed)
+        object.__setattr__(self, 'entries', entries)
+        object.__setattr__(self, '_virtual_now', entries.first_ts or time.time())
+        object.__setattr__(self, '_started', (time.time(), self._virtual_now))
+
+    @property
+    def served(self) -> int:
+        return self.entries.served
+
+    def clock(self) -> float:
+        if self.pace == 'fast':
+            return self._virtual_now
+        real_start, virtual_start = self._started
+        return virtual_start + (time.time() - real_start) * self.speed
+
+    async def sleep(self, seconds: float):
+        if self.pace == 'fast':
+            object.__setattr__(self, '_virtual_now', self._virtual_now + max(seconds, 0.0))
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(max(seconds, 0.0) / self.speed)
+
+    def next_entry(self, name: str, args, kwargs) -> dict:
+        return self.entries.next_entry(name, args, kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if not callable(attr) or not is_recorded(name):
+            return attr
+
+        async def replayed(*args, **kwargs):
+            entry = self.next_entry(name, args, kwargs)
+            if self.pace == 'fast':
+                object.__setattr__(self, '_virtual_now', max(
+                    self._virtual_now, entry['ts'] + entry.get('elapsed', 0.0)))
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(entry.get('elapsed', 0.0) / self.speed)
+            raise_recorded_error(entry)
+            if name == 'load_markets':
+                self.exchange.set_markets(entry['result']['markets'], entry['result'].get('currencies'))
+                return self.exchange.markets
+            return entry['result']
+        return replayed
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
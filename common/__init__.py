@@ -0,0 +1,4 @@
+"""
+Exchange- and transport-agnostic helpers shared by the FundRates, Trading and Alphawave scripts.
+Each script directory keeps only its sync or async adapters and imports the shared classes from here.
+"""
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from telegram.error import RetryAfter, Forbidden, BadRequest, NetworkError, TelegramError
+
+
+class SubscriberRegistry:
+    """
+    Chat ids that receive broadcasts, persisted as a JSON list and replaced atomically on every change.
+    `seed` ids (e.g. the configured group chat) are always subscribed and must not be None.
+    """
+
+    def __init__(self, path, seed=()):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as file:
+                self.chat_ids = set(int(chat_id) for chat_id in json.load(file))
+        except (OSError, ValueError):
+            self.chat_ids = set()
+        if any(chat_id is None for chat_id in seed):
+            raise ValueError("Seed chat id is not configured.")
+        seed = {int(chat_id) for chat_id in seed}
+        if not seed <= self.chat_ids:
+            self.chat_ids |= seed
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(sorted(self.chat_ids), file)
+        os.replace(tmp_path, self.path)
+
+    def add(self, chat_id):
+        with self._lock:
+            if int(chat_id) in self.chat_ids:
+                return False
+            self.chat_ids.add(int(chat_id))
+            self._save()
+            return True
+
+    def remove(self, chat_id):
+        with self._lock:
+            if int(chat_id) not in self.chat_ids:
+                return False
+            self.chat_ids.discard(int(chat_id))
+            self._save()
+            return True
+
+    def __iter__(self):
+        return iter(sorted(self.chat_ids))
+
+    def __len__(self):
+        return len(self.chat_ids)
+
+
+class TokenBucket:
+    """
+    Token bucket of `capacity` tokens refilled at `rate` per second. Waiters are served in arrival order,
+    and `pause(seconds)` empties the bucket until a flood-wait from Telegram has passed.
+    """
+
+    def __init__(self, rate, capacity=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+class FanoutDispatcher:
+    """
+    Sends one broadcast to every subscriber in parallel within Telegram's limits: a global bucket
+    (30 msg/s) shared by all chats and a bucket per chat (20 msg/min for groups, 1 msg/s for private chats).
+    Chunks of one message stay in order per chat. A RetryAfter pauses that chat for the requested time before
+    retrying; only when `flood_chats` chats are flood-limited within `flood_window` seconds
+    (a bot-wide limit) is the global bucket paused too. Chats that blocked or removed the bot are unsubscribed.
+    Delivery lag is measured from the start of the broadcast to each chat's last chunk.
+    """
+
+    def __init__(self, registry, global_rate=30.0, group_per_minute=20.0, group_burst=3,
+                 private_rate=1.0, max_retries=3, history=48, flood_chats=3, flood_window=1.0):
+        self.registry = registry
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.group_per_minute = group_per_minute
+        self.group_burst = group_burst
+        self.private_rate = private_rate
+        self.max_retries = max_retries
+        self.chat_buckets = {}
+        self.records = deque(maxlen=history)
+        self.flood_chats = flood_chats
+        self.flood_window = flood_window
+        self.recent_floods = {}
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            # 음수 chat id는 그룹/채널
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_per_minute / 60.0, capacity=self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, capacity=1.0)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _on_flood(self, chat_id, wait):
+        now = time.monotonic()
+        self.recent_floods[chat_id] = now
+        self.recent_floods = {chat: at for chat, at in self.recent_floods.items() if now - at <= self.flood_window}
+        # 여러 채팅이 동시에 제한되면 봇 전체 한도에 걸린 것으로 보고 전역 버킷도 멈춤
+        if len(self.recent_floods) >= self.flood_chats:
+            logging.warning(f"{len(self.recent_floods)} chats flood-limited at once, pausing all sends for {wait:.0f}s.")
+            self.global_bucket.pause(wait)
+
+    @staticmethod
+    def _retry_seconds(error):
+        retry_after = error.retry_after
+        return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else float(retry_after)
+
+    async def _send(self, bot, chat_id, text, stats, **kwargs):
+        chat_bucket = self._chat_bucket(chat_id)
+        for attempt in range(self.max_retries + 1):
+            await chat_bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                return True
+            except RetryAfter as e:
+                wait = self._retry_seconds(e)
+                stats['retry_after'] += 1
+                logging.warning(f"Flood limit for chat {chat_id}, retrying in {wait:.0f}s.")
+                chat_bucket.pause(wait)
+                self._on_flood(chat_id, wait)
+            except (Forbidden, BadRequest) as e:
+                if isinstance(e, Forbidden) or 'chat not found' in str(e).lower():
+                    self.registry.remove(chat_id)
+                    logging.warning(f"Unsubscribed chat {chat_id}: {str(e)}")
+                    return False
+                logging.error(f"Failed to send to chat {chat_id}: {str(e)}")
+                return False
+            except NetworkError as e:
+                logging.warning(f"Network error for chat {chat_id} (attempt {attempt + 1}): {str(e)}")
+                await asyncio.sleep(min(2 ** attempt, 10))
+            except TelegramError as e:
+                logging.error(f"Failed to send to chat {chat_id}: {str(e)}")
+                return False
+        return False
+
+    async def _deliver(self, bot, chat_id, chunks, started, stats, **kwargs):
+        for chunk in chunks:
+            if not await self._send(bot, chat_id, chunk, stats, **kwargs):
+                stats['failed'] += 1
+                return
+        stats['delivered'] += 1
+        stats['lags'].append(time.monotonic() - started)
+
+    async def broadcast(self, bot, text, chunk_size=4000, chat_ids=None, **kwargs):
+        """
+        Sends `text` (split into `chunk_size` pieces) to `chat_ids` or every subscriber; returns the record.
+        """
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [text]
+        chat_ids = list(chat_ids if chat_ids is not None else self.registry)
+        stats = {'delivered': 0, 'failed': 0, 'retry_after': 0, 'lags': []}
+        started = time.monotonic()
+        await asyncio.gather(*(self._deliver(bot, chat_id, chunks, started, stats, **kwargs)
+                               for chat_id in chat_ids))
+        lags = sorted(stats['lags'])
+        record = {
+            'chats': len(chat_ids),
+            'messages': len(chat_ids) * len(chunks),
+            'delivered': stats['delivered'],
+            'failed': stats['failed'],
+            'retry_after': stats['retry_after'],
+            'lag_p50': lags[len(lags) // 2] if lags else 0.0,
+            'lag_max': lags[-1] if lags else 0.0,
+            'duration': time.monotonic() - started,
+        }
+        self.records.append(record)
+        logging.info(
+            f"Broadcast to {record['delivered']}/{record['chats']} chats in {record['duration']:.2f}s "
+            f"(lag p50 {record['lag_p50']:.2f}s, max {record['lag_max']:.2f}s, "
+            f"{record['retry_after']} flood waits).")
+        return record
+
+    def summary(self):
+        if not self.records:
+            return f"Fan-out: {len(self.registry)} subscribers, no broadcasts yet."
+        last = self.records[-1]
+        failed = sum(r['failed'] for r in self.records)
+        flood = sum(r['retry_after'] for r in self.records)
+        max_lag = max(r['lag_max'] for r in self.records)
+        return (
+            f"Fan-out: {len(self.registry)} subscribers\n"
+            f"Last: {last['delivered']}/{last['chats']} chats in {last['duration']:.2f}s, "
+            f"lag p50 {last['lag_p50']:.2f}s / max {last['lag_max']:.2f}s\n"
+            f"Recent: {failed} failed chats, {flood} flood waits, max lag {max_lag:.2f}s"
+        )
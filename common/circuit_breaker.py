@@ -0,0 +1,161 @@
+import time
+import logging
+import threading
+from collections import deque
+
+import ccxt
+
+
+class CircuitOpenError(ccxt.ExchangeNotAvailable):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-exchange circuit breaker.
+    Opens when the error rate or the slow-call rate over the last `window` calls crosses its threshold,
+    rejects calls immediately while open, and after `cooldown` seconds lets `half_open_probes` calls through.
+    Probes that all succeed close the breaker, a failing probe re-opens it with a doubled cooldown.
+    Only `failure_types` count as failures; other exchange errors mean the exchange answered.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, window=50, min_calls=10, error_rate=0.5, slow_call=5.0, slow_rate=0.5,
+                 cooldown=30.0, max_cooldown=600.0, half_open_probes=3, failure_types=(ccxt.NetworkError,)):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_probes = half_open_probes
+        self.failure_types = failure_types
+
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.outcomes = deque(maxlen=window)
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.rejected = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def _transition(self, state):
+        previous, self.state = self.state, state
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        if state != self.HALF_OPEN:
+            self.probes_in_flight = 0
+            self.probe_successes = 0
+        logging.warning(
+            f"Circuit breaker {self.name}: {previous} -> {state} ({self.describe_window()})")
+
+    def describe_window(self):
+        total = len(self.outcomes)
+        if not total:
+            return "no calls"
+        failures = sum(1 for ok, _ in self.outcomes if not ok)
+        slow = sum(1 for _, is_slow in self.outcomes if is_slow)
+        return f"{failures}/{total} failed, {slow}/{total} slow"
+
+    def is_open(self):
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.cooldown
+
+    def probe_budget(self):
+        """
+        How many calls a bulk phase should submit now: None when closed (no limit), 0 while open,
+        and the free probe slots once the cooldown has passed or the breaker is half-open.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return None
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return 0
+                return self.half_open_probes
+            return max(self.half_open_probes - self.probes_in_flight, 0)
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self.probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self.probes_in_flight += 1
+            return True
+
+    def record(self, ok, latency):
+        with self._lock:
+            slow = latency is not None and latency >= self.slow_call
+            if self.state == self.HALF_OPEN:
+                self.probes_in_flight = max(self.probes_in_flight - 1, 0)
+                if not ok or slow:
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._transition(self.OPEN)
+                    return
+                self.probe_successes += 1
+                if self.probe_successes >= self.half_open_probes:
+                    self.cooldown = self.base_cooldown
+                    self.outcomes.clear()
+                    self._transition(self.CLOSED)
+                return
+
+            self.outcomes.append((ok, slow))
+            total = len(self.outcomes)
+            if self.state != self.CLOSED or total < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in self.outcomes if not ok)
+            slow_calls = sum(1 for _, is_slow in self.outcomes if is_slow)
+            if failures / total >= self.error_rate or slow_calls / total >= self.slow_rate:
+                self._transition(self.OPEN)
+
+    def _record_exception(self, e, latency):
+        if isinstance(e, self.failure_types):
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.record(False, latency)
+        else:
+            self.record(True, latency)
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open.")
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._record_exception(e, time.monotonic() - start)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    async def call_async(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open.")
+        start = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._record_exception(e, time.monotonic() - start)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def summary(self):
+        text = f"{self.name}: {self.state} ({self.describe_window()}, rejected {self.rejected})"
+        if self.state == self.OPEN:
+            remaining = max(self.cooldown - (time.monotonic() - self.opened_at), 0)
+            text += f", retry in {remaining:.0f}s"
+        if self.last_error and self.state != self.CLOSED:
+            text += f", last error {self.last_error}"
+        return text
@@ -0,0 +1,91 @@
+import random
+import threading
+from collections import deque
+
+import ccxt
+
+
+class LatencyTracker:
+    """
+    Rolling latency window per request key with a cached percentile, refreshed every `refresh` samples.
+    """
+
+    def __init__(self, window=256, min_samples=20, refresh=16):
+        self.window = window
+        self.min_samples = min_samples
+        self.refresh = refresh
+        self._samples = {}
+        self._cached = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key, latency):
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=self.window))
+            samples.append(latency)
+            cached = self._cached.get(key)
+            if cached is not None:
+                self._cached[key] = (cached[0], cached[1] + 1)
+
+    def percentile(self, key, q):
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            cached = self._cached.get(key)
+            if cached is None or cached[1] >= self.refresh:
+                ordered = sorted(samples)
+                value = ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+                cached = (value, 0)
+                self._cached[key] = cached
+            return cached[0]
+
+
+class RequestPolicyBase:
+    """
+    Settings, counters and decisions shared by the sync and async retry/hedging policies.
+    Failed reads are retried with full-jitter exponential backoff. A read still running after the
+    `hedge_percentile` latency of its key gets one duplicate request, as long as hedges stay within
+    `hedge_budget` of all requests; the first successful response wins.
+    """
+
+    def __init__(self, max_retries=2, base_delay=0.2, max_delay=2.0, hedge_percentile=95, hedge_budget=0.05,
+                 retry_on=(ccxt.NetworkError,)):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.retry_on = retry_on
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.retries = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def hedge_threshold(self, key):
+        """
+        Counts a new request and returns how long to wait before hedging it, or None when it should not be hedged.
+        """
+        with self._lock:
+            self.requests += 1
+            over_budget = self.hedges_sent + 1 > self.hedge_budget * self.requests
+        return None if over_budget else self.latency.percentile(key, self.hedge_percentile)
+
+    def hedge_allowed(self):
+        with self._lock:
+            if self.hedges_sent + 1 > self.hedge_budget * self.requests:
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def summary(self):
+        return (f"requests {self.requests}, retries {self.retries}, "
+                f"hedges sent {self.hedges_sent}, hedges won {self.hedges_won}")
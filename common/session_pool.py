@@ -0,0 +1,48 @@
+import threading
+from urllib.parse import urlparse
+
+
+class ConnectionStats:
+    """
+    Per-host request and new-connection counters; every request that did not open a connection reused one.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.new_connections = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, host):
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+    def record_new_connection(self, host):
+        with self._lock:
+            self.new_connections[host] = self.new_connections.get(host, 0) + 1
+
+    def summary(self):
+        with self._lock:
+            lines = []
+            for host in sorted(self.requests):
+                total = self.requests[host]
+                new = self.new_connections.get(host, 0)
+                lines.append(
+                    f"{host}: {total} requests, {max(total - new, 0)} reused, {new} new connections")
+            return lines
+
+
+def api_hosts(exchange):
+    """
+    Distinct scheme://host API endpoints of a ccxt exchange, used to pre-open connections.
+    """
+    urls = exchange.urls.get('api', {})
+    stack, hosts = [urls], set()
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, str) and value.startswith('http'):
+            parsed = urlparse(value.replace('{hostname}', getattr(exchange, 'hostname', None) or ''))
+            if '{' not in parsed.netloc:
+                hosts.add(f"{parsed.scheme}://{parsed.netloc}")
+    return sorted(hosts)
@@ -0,0 +1,64 @@
+import json
+import asyncio
+
+import pytest
+
+from common import broadcast
+from common.broadcast import SubscriberRegistry, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(broadcast.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(broadcast.asyncio, 'sleep', fake.sleep)
+    return fake
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2.0)
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    asyncio.run(take(2))
+    assert clock.now == 0.0
+    asyncio.run(take(1))
+    assert clock.now == pytest.approx(0.5)
+    asyncio.run(take(2))
+    assert clock.now == pytest.approx(1.5)
+
+
+def test_bucket_pause(clock):
+    bucket = TokenBucket(rate=10.0, capacity=5.0)
+    bucket.pause(3.0)
+    asyncio.run(bucket.acquire())
+    assert clock.now >= 3.0
+    assert clock.now == pytest.approx(3.1)
+
+
+def test_registry_persists_and_seeds(tmp_path):
+    path = str(tmp_path / 'subscribers.json')
+    registry = SubscriberRegistry(path, seed=[-100])
+    assert registry.add(42)
+    assert not registry.add(42)
+    assert json.load(open(path)) == [-100, 42]
+    assert list(SubscriberRegistry(path)) == [-100, 42]
+    assert registry.remove(42) and not registry.remove(42)
+
+
+def test_registry_rejects_missing_seed(tmp_path):
+    with pytest.raises(ValueError):
+        SubscriberRegistry(str(tmp_path / 'subscribers.json'), seed=[None])
@@ -0,0 +1,100 @@
+import asyncio
+
+import ccxt
+import pytest
+
+from common import circuit_breaker
+from common.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def tripped(clock, **kwargs):
+    breaker = CircuitBreaker('okx', min_calls=4, cooldown=10.0, half_open_probes=2, **kwargs)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_opens_on_error_rate(clock):
+    breaker = CircuitBreaker('okx', min_calls=4, error_rate=0.5)
+    for ok in (True, True, True):
+        breaker.record(ok, 0.1)
+    for _ in range(2):
+        breaker.record(False, 0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_opens_on_slow_calls(clock):
+    breaker = CircuitBreaker('okx', min_calls=4, slow_call=1.0, slow_rate=0.5)
+    for latency in (0.1, 0.1, 2.0, 2.0):
+        breaker.record(True, latency)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_probe_budget_follows_state(clock):
+    breaker = tripped(clock)
+    assert breaker.probe_budget() == 0
+    assert not breaker.allow()
+    clock[0] += 10.0
+    assert breaker.probe_budget() == 2
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.probe_budget() == 1
+    assert breaker.allow()
+    assert breaker.probe_budget() == 0
+    assert not breaker.allow()
+
+
+def test_probes_close_breaker(clock):
+    breaker = tripped(clock)
+    clock[0] += 10.0
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.probe_budget() is None
+    assert len(breaker.outcomes) == 0
+
+
+def test_failed_probe_doubles_cooldown(clock):
+    breaker = tripped(clock)
+    clock[0] += 10.0
+    assert breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.cooldown == 20.0
+    clock[0] += 10.0
+    assert breaker.probe_budget() == 0
+
+
+def test_only_failure_types_count(clock):
+    breaker = CircuitBreaker('okx', min_calls=2)
+
+    def rejected():
+        raise ccxt.BadSymbol("unknown symbol")
+
+    for _ in range(3):
+        with pytest.raises(ccxt.BadSymbol):
+            breaker.call(rejected)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_call_rejected_while_open(clock):
+    breaker = tripped(clock)
+
+    async def fetch():
+        return 1
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call_async(fetch))
+    clock[0] += 10.0
+    assert asyncio.run(breaker.call_async(fetch)) == 1
@@ -0,0 +1,140 @@
+import gzip
+import json
+import time
+import zlib
+import threading
+from collections import deque
+
+import ccxt
+
+
+RECORDED_PREFIXES = ('fetch', 'load_markets', 'create_', 'cancel_', 'edit_', 'set_leverage', 'set_position_mode')
+
+
+def is_recorded(name):
+    return name.startswith(RECORDED_PREFIXES)
+
+
+def normalize(value):
+    return json.loads(json.dumps(value, default=str))
+
+
+def request_key(exchange_id, method, args, kwargs):
+    if method == 'load_markets':
+        return json.dumps([exchange_id, method])
+    return json.dumps([exchange_id, method, normalize(args), normalize(kwargs)], sort_keys=True)
+
+
+def new_entry(exchange_id, method, args, kwargs):
+    return {'ts': time.time(), 'exchange': exchange_id, 'method': method,
+            'args': normalize(args), 'kwargs': normalize(kwargs)}
+
+
+def markets_result(exchange):
+    return {'markets': exchange.markets, 'currencies': exchange.currencies}
+
+
+def raise_recorded_error(entry):
+    if 'error' in entry:
+        error_class = getattr(ccxt, entry['error']['type'], ccxt.ExchangeError)
+        raise error_class(entry['error']['message'])
+
+
+class TrafficLog:
+    """
+    Append-only gzip JSON-lines log of exchange requests and responses.
+    Entries are flushed as they are written, so a log cut short by a crash stays readable up to its last complete entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, 'at', encoding='utf-8')
+        self.entries = 0
+        self._lock = threading.Lock()
+
+    def write(self, entry):
+        line = json.dumps(entry, default=str) + '\n'
+        with self._lock:
+            self.file.write(line)
+            self.file.flush()
+            self.entries += 1
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+    @staticmethod
+    def read(path):
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            try:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+            except (EOFError, OSError, zlib.error):
+                return
+
+
+class ReplayMiss(ccxt.ExchangeError):
+    pass
+
+
+class ReplayFinished(Exception):
+    """
+    Raised once every recorded entry has been served and more are requested; deliberately not a ccxt error
+    so it ends the session instead of being handled as a failed request.
+    """
+
+
+class RecordedEntries:
+    """
+    The recorded entries of one exchange, indexed for replay.
+    A call gets the next unserved entry with identical arguments, falling back to the next entry of the same
+    method, so time-dependent arguments still replay in recorded order. With `finish_when_exhausted`, a request
+    after the last entry raises ReplayFinished instead of ReplayMiss.
+    """
+
+    def __init__(self, exchange_id, path, finish_when_exhausted=False):
+        self.exchange_id = exchange_id
+        self.finish_when_exhausted = finish_when_exhausted
+        self.served = 0
+        self.total = 0
+        self.first_ts = None
+        self._by_key = {}
+        self._by_method = {}
+        self._lock = threading.Lock()
+        for entry in TrafficLog.read(path):
+            if entry.get('exchange') != exchange_id:
+                continue
+            entry['used'] = False
+            if self.first_ts is None:
+                self.first_ts = entry['ts']
+            key = request_key(exchange_id, entry['method'], entry['args'], entry['kwargs'])
+            self._by_key.setdefault(key, deque()).append(entry)
+            self._by_method.setdefault(entry['method'], deque()).append(entry)
+            self.total += 1
+
+    @staticmethod
+    def _pop(queue):
+        while queue and queue[0]['used']:
+            queue.popleft()
+        return queue.popleft() if queue else None
+
+    def next_entry(self, name, args, kwargs):
+        key = request_key(self.exchange_id, name, normalize(args), normalize(kwargs))
+        with self._lock:
+            entry = self._pop(self._by_key.get(key, deque()))
+            if entry is None:
+                entry = self._pop(self._by_method.get(name, deque()))
+            if entry is None:
+                if self.finish_when_exhausted and self.served >= self.total:
+                    raise ReplayFinished(f"Replay of {self.total} {self.exchange_id} entries finished.")
+                raise ReplayMiss(f"No recorded {self.exchange_id}.{name} response left to replay.")
+            entry['used'] = True
+            self.served += 1
+            return entry
+
+    def remaining(self):
+        with self._lock:
+            return self.total - self.served